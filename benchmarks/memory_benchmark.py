@@ -0,0 +1,264 @@
+"""
+Peak-memory benchmarks for the text-formatter document functions.
+
+Each benchmark runs a function on generated input files of growing sizes
+and reports the peak memory per input byte, measured with tracemalloc and
+as the peak resident set size (RSS) of a separate process. The run fails
+when a ratio exceeds its configured maximum, so it can be used as a
+regression gate.
+
+Usage:
+python benchmarks/memory_benchmark.py [--sizes 1M,4M,16M]
+    [--max-ratio 12] [--max-ratio process_file=10]
+"""
+
+# --- Imports ---
+import argparse
+import gc
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import textformatter
+from textformatter import textformatter
+from textformatter.textformatter import (
+    BlankLineType,
+    CaseType,
+    NewlineType,
+    TabType,
+    TrimType,
+    TextFormatterConfig,
+    process_file,
+    read_lines_from_file,
+    remove_blank_lines,
+    write_lines_to_file,
+)
+from textformatter.scheduler import parse_size
+
+
+# --- Private Constants ---
+_DEFAULT_SIZES = "1M,4M,16M"
+# Peak bytes of memory per input byte. The tracemalloc ratio only counts
+# Python allocations; the RSS ratio also counts the interpreter and
+# allocator overhead, so it gets more headroom.
+_DEFAULT_MAX_RATIOS = {
+    "process_file": 14.0,
+    "read_lines_from_file": 6.0,
+    "remove_blank_lines": 2.0,
+    "write_lines_to_file": 3.0,
+}
+_RSS_HEADROOM = 1.5
+_SAMPLE_TEXT = (
+    "int\n"
+    "some_function(void) {  \n"
+    "\tint i = 1;\n"
+    "\n"
+    "\n"
+    "        i += 10;   \n"
+    "\treturn i;\n"
+    "}\n"
+    "The Quick Brown Fox Jumps Over The Lazy Dog.\t\n"
+)
+_BENCHMARK_CONFIG = TextFormatterConfig(
+    backup_file=False,
+    blank_line_type=BlankLineType.COLLAPSE,
+    case_type=CaseType.UPPER,
+    newline_type=NewlineType.LF,
+    tab_type=(TabType.TAB_TO_SPACES, 4),
+    trim_type=TrimType.TRAILING,
+)
+
+
+# --- Public Benchmark Functions ---
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Measure the peak memory of the document functions.")
+    parser.add_argument("--sizes", default=_DEFAULT_SIZES,
+                        help="comma-separated input sizes, e.g. 1M,4M,16M")
+    parser.add_argument("--max-ratio", action="append", default=[],
+                        metavar="[NAME=]RATIO",
+                        help="maximum peak bytes per input byte")
+    parser.add_argument("--child", nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        name, input_path, work_dir = args.child
+        print(json.dumps(_measure_rss_child(name, input_path, work_dir)))
+        return
+    sizes = [parse_size(size) for size in args.sizes.split(",")]
+    max_ratios = parse_max_ratios(args.max_ratio)
+    failures = run_benchmarks(sizes, max_ratios)
+    if failures:
+        print(f"\n{len(failures)} benchmark(s) exceeded the maximum ratio:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+
+
+def parse_max_ratios(values: list[str]) -> dict[str, float]:
+    """
+    Parse the maximum ratio options into a maximum ratio per benchmark.
+
+    Parameters:
+    values (list[str]): The options, either "RATIO" for all benchmarks
+        or "NAME=RATIO" for a single benchmark.
+
+    Returns:
+    dict[str, float]: The maximum ratio for each benchmark name.
+    """
+    max_ratios = dict(_DEFAULT_MAX_RATIOS)
+    for value in values:
+        name, _, ratio = value.rpartition("=")
+        if not name:
+            max_ratios = dict.fromkeys(max_ratios, float(ratio))
+        elif name in max_ratios:
+            max_ratios[name] = float(ratio)
+        else:
+            raise ValueError(f"Unknown benchmark: ({name}).")
+    return max_ratios
+
+
+def run_benchmarks(sizes: list[int],
+                   max_ratios: dict[str, float]) -> list[str]:
+    """
+    Run every benchmark at every input size and print the results.
+
+    Parameters:
+    sizes (list[int]): The input sizes in bytes.
+    max_ratios (dict[str, float]): The maximum ratio for each benchmark.
+
+    Returns:
+    list[str]: A description of each result that exceeded its maximum.
+    """
+    failures = []
+    print(f"{'benchmark':<22}{'input':>12}{'tracemalloc':>14}{'ratio':>8}"
+          f"{'peak RSS':>14}{'ratio':>8}")
+    with tempfile.TemporaryDirectory() as work_dir:
+        for size in sizes:
+            input_path = os.path.join(work_dir, f"input-{size}.txt")
+            _generate_input_file(input_path, size)
+            input_size = os.path.getsize(input_path)
+            for name, max_ratio in max_ratios.items():
+                traced_peak = _measure_tracemalloc(name, input_path,
+                                                   work_dir)
+                rss_peak = _measure_rss(name, input_path, work_dir)
+                traced_ratio = traced_peak / input_size
+                rss_ratio = rss_peak / input_size
+                print(f"{name:<22}{input_size:>12,}{traced_peak:>14,}"
+                      f"{traced_ratio:>8.2f}{rss_peak:>14,}{rss_ratio:>8.2f}")
+                if traced_ratio > max_ratio:
+                    failures.append(f"{name} at {input_size:,} bytes:"
+                                    f" tracemalloc ratio {traced_ratio:.2f}"
+                                    f" > {max_ratio:.2f}")
+                if rss_ratio > max_ratio * _RSS_HEADROOM:
+                    failures.append(f"{name} at {input_size:,} bytes:"
+                                    f" RSS ratio {rss_ratio:.2f}"
+                                    f" > {max_ratio * _RSS_HEADROOM:.2f}")
+    return failures
+
+
+# --- Private Helper Functions ---
+
+def _generate_input_file(file_path: str, size: int) -> None:
+    repeat = size // len(_SAMPLE_TEXT) + 1
+    with open(file_path, "w", newline="") as f:
+        f.write((_SAMPLE_TEXT * repeat)[:size])
+
+
+def _prepare(name: str, input_path: str, work_dir: str) -> tuple:
+    # Build the arguments outside the measured section.
+    if name == "process_file":
+        file_path = os.path.join(work_dir, "process_file.txt")
+        shutil.copy(input_path, file_path)
+        return (process_file, file_path, _BENCHMARK_CONFIG)
+    if name == "read_lines_from_file":
+        return (read_lines_from_file, input_path)
+    if name == "remove_blank_lines":
+        return (remove_blank_lines, read_lines_from_file(input_path),
+                BlankLineType.COLLAPSE)
+    if name == "write_lines_to_file":
+        return (write_lines_to_file, os.path.join(work_dir, "write.txt"),
+                read_lines_from_file(input_path), NewlineType.LF)
+    raise ValueError(f"Unknown benchmark: ({name}).")
+
+
+def _measure_tracemalloc(name: str, input_path: str, work_dir: str) -> int:
+    function, *arguments = _prepare(name, input_path, work_dir)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        function(*arguments)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _measure_rss(name: str, input_path: str, work_dir: str) -> int:
+    result = subprocess.run(
+        [sys.executable, __file__, "--child", name, input_path, work_dir],
+        capture_output=True, text=True, check=True,
+    )
+    data = json.loads(result.stdout)
+    return max(0, data["peak"] - data["baseline"])
+
+
+def _measure_rss_child(name: str, input_path: str,
+                       work_dir: str) -> dict[str, int]:
+    function, *arguments = _prepare(name, input_path, work_dir)
+    gc.collect()
+    baseline = _read_rss()
+    # On Linux the peak RSS can be reset, which leaves the setup out of
+    # the peak. Elsewhere the peak includes it.
+    _reset_peak_rss()
+    function(*arguments)
+    return {"baseline": baseline, "peak": _read_peak_rss()}
+
+
+def _read_proc_status(key: str) -> int | None:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(f"{key}:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _read_rss() -> int:
+    rss = _read_proc_status("VmRSS")
+    if rss is not None:
+        return rss
+    return _read_peak_rss()
+
+
+def _read_peak_rss() -> int:
+    peak = _read_proc_status("VmHWM")
+    if peak is not None:
+        return peak
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _reset_peak_rss() -> bool:
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+if __name__ == "__main__":
+    main()
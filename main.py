@@ -1,26 +1,129 @@
 import argparse
+import codecs
 import os
 import sys
+import time
 
 from pathlib import Path
 
 import textformatter
 from textformatter import configfile
 from textformatter import textformatter
+from textformatter.audit import (
+    AuditSummary,
+    audit_file,
+)
+from textformatter.backupstore import (
+    BackupStore,
+)
 from textformatter.configfile import (
     read_config_file,
 )
+from textformatter.explain import (
+    explain_config,
+)
+from textformatter.fanout import (
+    Variant,
+    process_file_variants,
+)
+from textformatter.journal import (
+    Journal,
+)
+from textformatter.metrics import (
+    Metrics,
+)
+from textformatter.progress import (
+    Progress,
+)
+from textformatter.resultcache import (
+    ResultCache,
+)
+from textformatter.scheduler import (
+    parse_size,
+    schedule_files,
+)
 from textformatter.textformatter import (
+    ConfigError,
     TextFormatterConfig,
     process_file,
+    process_file_with_metrics,
+)
+from textformatter.unifieddiff import (
+    diff_file,
 )
 
 
 def main() -> None:
+    if sys.argv[1:2] == ["undo"]:
+        undo(sys.argv[2:])
+        return
     parser = argparse.ArgumentParser(usage="%(prog)s <config file> <input files>")
     parser.add_argument("config", nargs=1)
     parser.add_argument("files", nargs="+")
+    parser.add_argument("--diff", action="store_true",
+                        help="print a unified diff instead of changing files")
+    parser.add_argument("--audit", action="store_true",
+                        help="print whitespace statistics instead of"
+                             " changing files")
+    parser.add_argument("--encoding",
+                        help="encoding of the input files, e.g. utf-16 or"
+                             " latin-1; default is to detect a byte order"
+                             " mark, UTF-16, UTF-32 or UTF-8")
+    parser.add_argument("--explain", action="store_true",
+                        help="print the stages that would run and an"
+                             " estimated cost instead of changing files")
+    parser.add_argument("--count-lines", action="store_true",
+                        help="count the lines of the whole files instead"
+                             " of estimating them, and keep their line"
+                             " indexes in --cache-dir; requires --explain")
+    parser.add_argument("--output-dir",
+                        help="write formatted copies to this directory"
+                             " instead of changing files")
+    parser.add_argument("--variant", nargs=2, action="append", default=[],
+                        metavar=("CONFIG", "OUTPUT_DIR"),
+                        help="also write copies formatted with another"
+                             " configuration; requires --output-dir")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="number of worker processes (default 1)")
+    parser.add_argument("--max-inflight-bytes", type=parse_size,
+                        help="limit the total size of the files being"
+                             " processed at the same time, e.g. 512M")
+    parser.add_argument("--journal",
+                        help="record completed files in this journal file")
+    parser.add_argument("--resume", action="store_true",
+                        help="skip the files completed in the journal;"
+                             " requires --journal")
+    parser.add_argument("--cache-dir",
+                        help="reuse formatting results of identical file"
+                             " contents from this directory")
+    parser.add_argument("--cache-max-bytes", type=parse_size,
+                        help="evict the least recently used results when"
+                             " the cache grows over this size, e.g. 1G;"
+                             " requires --cache-dir")
+    parser.add_argument("--metrics-file",
+                        help="write OpenMetrics counters and histograms of"
+                             " the run to this file")
+    parser.add_argument("--metrics-interval", type=float,
+                        help="also write the metrics file every N seconds"
+                             " during the run; requires --metrics-file")
+    parser.add_argument("--progress", action="store_true",
+                        help="show live progress on stderr")
     args = parser.parse_args()
+    if args.variant and not args.output_dir:
+        print("--variant requires --output-dir.")
+        sys.exit(1)
+    if args.resume and not args.journal:
+        print("--resume requires --journal.")
+        sys.exit(1)
+    if args.metrics_interval and not args.metrics_file:
+        print("--metrics-interval requires --metrics-file.")
+        sys.exit(1)
+    if args.cache_max_bytes and not args.cache_dir:
+        print("--cache-max-bytes requires --cache-dir.")
+        sys.exit(1)
+    if args.count_lines and not args.explain:
+        print("--count-lines requires --explain.")
+        sys.exit(1)
     config_file = Path(args.config[0]).resolve()
     if not os.path.exists(config_file):
         print("Configuration file does not exist.")
@@ -32,9 +135,155 @@ def main() -> None:
     if len(files) == 0:
         print("No input files provided.")
         sys.exit(1)
+    try:
+        config = read_config_file(config_file, strict=True)
+    except ConfigError as e:
+        print(e)
+        sys.exit(1)
+    if args.encoding == "auto":
+        config.encoding = None
+    elif args.encoding:
+        try:
+            codecs.lookup(args.encoding)
+        except LookupError:
+            print(f"Unknown encoding: {args.encoding}.")
+            sys.exit(1)
+        config.encoding = args.encoding
+    if args.explain:
+        cache = None
+        if args.cache_dir:
+            cache = ResultCache(args.cache_dir, args.cache_max_bytes)
+        print(explain_config(config, files, cache, args.count_lines))
+        return
+    if args.output_dir:
+        variants = [Variant(config, args.output_dir)]
+        for variant_config_file, output_dir in args.variant:
+            if not os.path.exists(variant_config_file):
+                print("Configuration file does not exist.")
+                sys.exit(1)
+            try:
+                variant_config = read_config_file(variant_config_file,
+                                                  strict=True)
+            except ConfigError as e:
+                print(e)
+                sys.exit(1)
+            variants.append(Variant(variant_config, output_dir))
+        for file in files:
+            process_file_variants(file, variants)
+        return
+    if args.audit:
+        audit(files, config.encoding, args.jobs)
+        return
+    if args.diff:
+        for file in files:
+            sys.stdout.write(diff_file(file, config))
+        return
+    metrics = None
+    task = process_file
+    if args.metrics_file:
+        metrics = Metrics()
+        task = process_file_with_metrics
+    journal = None
+    if args.journal:
+        journal = Journal(args.journal)
+        if args.resume:
+            completed = journal.load_completed()
+            num_files = len(files)
+            files = [file for file in files if file not in completed]
+            if metrics is not None:
+                metrics.files_skipped = num_files - len(files)
+        elif os.path.exists(args.journal):
+            os.remove(args.journal)
+    progress = None
+    if args.progress:
+        progress = Progress(len(files),
+                            sum(os.path.getsize(file) for file in files))
+    backup_run = None
+    if config.backup_file and config.backup_dir:
+        backup_run = BackupStore(config.backup_dir,
+                                 config.backup_compress).start_run()
+    cache = None
+    if args.cache_dir:
+        cache = ResultCache(args.cache_dir, args.cache_max_bytes)
+    failed = False
+    next_metrics_time = None
+    if args.metrics_interval:
+        next_metrics_time = time.monotonic() + args.metrics_interval
+    try:
+        for result in schedule_files(
+                files, task, (config, backup_run, cache),
+                max_workers=args.jobs,
+                max_inflight_bytes=args.max_inflight_bytes):
+            if result.error is not None:
+                print(f"{result.file_path}: {result.error}", file=sys.stderr)
+                failed = True
+            elif journal is not None:
+                journal.record(result.file_path)
+            if progress is not None:
+                progress.update(result.file_path, result.size,
+                                result.seconds)
+            if metrics is None:
+                continue
+            if result.error is not None:
+                metrics.files_failed += 1
+            else:
+                metrics.merge(result.value[1])
+            if next_metrics_time and time.monotonic() >= next_metrics_time:
+                metrics.write(args.metrics_file)
+                next_metrics_time = time.monotonic() + args.metrics_interval
+    finally:
+        if journal is not None:
+            journal.close()
+        if metrics is not None:
+            metrics.write(args.metrics_file)
+    if progress is not None:
+        progress.finish()
+    if cache is not None and cache.max_bytes is not None:
+        cache.evict()
+    if backup_run is not None and backup_run.has_backups():
+        print(f"Backup run: {backup_run.run_id}")
+    if failed:
+        sys.exit(1)
+
+
+def audit(files: list[str], encoding: str | None, jobs: int) -> None:
+    summary = AuditSummary()
+    failed = False
+    for result in schedule_files(files, audit_file, (encoding,),
+                                 max_workers=jobs):
+        if result.error is not None:
+            print(f"{result.file_path}: {result.error}", file=sys.stderr)
+            failed = True
+            continue
+        print(result.value.format())
+        summary.add(result.value)
+    print(summary.format())
+    if failed:
+        sys.exit(1)
+
+
+def undo(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(
+        usage="%(prog)s undo <config file> <run id>")
+    parser.add_argument("config", nargs=1)
+    parser.add_argument("run_id", nargs=1)
+    args = parser.parse_args(argv)
+    config_file = Path(args.config[0]).resolve()
+    if not os.path.exists(config_file):
+        print("Configuration file does not exist.")
+        sys.exit(1)
     config = read_config_file(config_file)
-    for file in files:
-        process_file(file, config)
+    if not config.backup_dir:
+        print("No backup directory configured.")
+        sys.exit(1)
+    store = BackupStore(config.backup_dir, config.backup_compress)
+    try:
+        restored = store.restore_run(args.run_id[0])
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
+    for file in restored:
+        print(f"Restored: {file}")
 
 
 if __name__ == "__main__":
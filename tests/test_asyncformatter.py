@@ -0,0 +1,146 @@
+# --- Imports ---
+import asyncio
+import os
+import threading
+import time
+import unittest
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import textformatter
+from textformatter import asyncformatter
+from textformatter.asyncformatter import (
+    # Async formatting functions
+    process_files,
+)
+from textformatter.textformatter import (
+    CaseType,
+    StageKind,
+    TextFormatterConfig,
+    Transform,
+    register_transform,
+    unregister_transform,
+    write_formatted_file,
+)
+
+
+# --- Constants ---
+TESTS_DIR: Path = Path(__file__).parent
+DATA_DIR: Path = TESTS_DIR / "data"
+OUTPUTS_DIR: Path = TESTS_DIR / "outputs"
+
+
+# --- Test Helper Classes ---
+
+class _SlowWriteExecutor(ThreadPoolExecutor):
+    """Counts the files read and not yet written, with slow writes."""
+
+    def __init__(self, max_workers: int):
+        super().__init__(max_workers=max_workers)
+        self.lock = threading.Lock()
+        self.num_held = 0
+        self.max_held = 0
+
+    def submit(self, fn, /, *args, **kwargs):
+        if fn is asyncformatter._read_file:
+            with self.lock:
+                self.num_held += 1
+                self.max_held = max(self.max_held, self.num_held)
+        elif fn is write_formatted_file:
+            return super().submit(self._write, fn, *args, **kwargs)
+        return super().submit(fn, *args, **kwargs)
+
+    def _write(self, fn, *args, **kwargs):
+        time.sleep(0.01)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self.lock:
+                self.num_held -= 1
+
+
+# --- Test Classes for Async Formatting Functions ---
+
+class TestProcessFiles(unittest.TestCase):
+    def setUp(self):
+        self.files = []
+        for i, text in enumerate(["Line 1\n", "LINE 2", "line 3"]):
+            file_path = OUTPUTS_DIR / f"test_async_{i}.txt"
+            with open(file_path, "w", newline="") as f:
+                f.write(text)
+            self.files.append(file_path)
+        self.config = TextFormatterConfig(backup_file=False,
+                                          case_type=CaseType.UPPER)
+
+    def test_process_files(self):
+        results = asyncio.run(process_files(self.files, self.config,
+                                            concurrency=2))
+        self.assertListEqual([result.file_path for result in results],
+                             [str(file_path) for file_path in self.files])
+        self.assertListEqual([result.value for result in results],
+                             [True, False, True])
+        for file_path in self.files:
+            with open(file_path) as f:
+                content = f.read()
+            self.assertEqual(content, content.upper())
+
+    def test_custom_executors_and_errors(self):
+        missing = OUTPUTS_DIR / "test_async_missing.txt"
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = asyncio.run(process_files(
+                [missing] + self.files, self.config,
+                io_executor=executor, cpu_executor=executor,
+            ))
+        self.assertTrue(isinstance(results[0].error, ValueError))
+        self.assertTrue(all(result.error is None for result in results[1:]))
+        with open(self.files[2]) as f:
+            self.assertEqual(f.read(), "LINE 3")
+
+    def test_slow_writes_bound_memory(self):
+        files = []
+        for i in range(20):
+            file_path = OUTPUTS_DIR / f"test_async_slow_{i}.txt"
+            with open(file_path, "w", newline="") as f:
+                f.write("line\n")
+            self.addCleanup(os.remove, file_path)
+            files.append(file_path)
+        with (_SlowWriteExecutor(max_workers=8) as io_executor,
+              ThreadPoolExecutor(max_workers=2) as cpu_executor):
+            results = asyncio.run(process_files(
+                files, self.config, concurrency=2, io_executor=io_executor,
+                cpu_executor=cpu_executor,
+            ))
+        self.assertTrue(all(result.value for result in results))
+        self.assertLessEqual(io_executor.max_held, 4)
+
+    def test_plugin_not_in_workers(self):
+        register_transform(Transform(
+            name="test-async-suffix", config_key=("custom", "suffix"),
+            order=15, kind=StageKind.PER_LINE, parse=str, dump=str,
+            build=lambda suffix: lambda line: line + suffix,
+        ))
+        self.addCleanup(unregister_transform, "test-async-suffix")
+        self.config.options["test-async-suffix"] = ";"
+        # The worker processes only import the built-in transforms.
+        results = asyncio.run(process_files(self.files[:1], self.config))
+        self.assertTrue(isinstance(results[0].error, ValueError))
+        with open(self.files[0]) as f:
+            self.assertEqual(f.read(), "Line 1\n")
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            results = asyncio.run(process_files(
+                self.files[:1], self.config, cpu_executor=executor))
+        self.assertIsNone(results[0].error)
+        with open(self.files[0]) as f:
+            self.assertEqual(f.read(), "LINE 1;")
+
+    def test_invalid_concurrency(self):
+        try:
+            asyncio.run(process_files(self.files, self.config,
+                                      concurrency=0))
+        except ValueError:
+            pass
+        except Exception:
+            self.fail("Unexpected exception raised")
+        else:
+            self.fail("ValueError not raised")
@@ -0,0 +1,154 @@
+# --- Imports ---
+import codecs
+import os
+import pickle
+import unittest
+
+from pathlib import Path
+
+import textformatter
+from textformatter import audit
+from textformatter.audit import (
+    # Classes
+    AuditSummary,
+    FileAudit,
+    # Audit functions
+    audit_file,
+)
+from textformatter.textformatter import (
+    NewlineType,
+)
+
+
+# --- Constants ---
+TESTS_DIR: Path = Path(__file__).parent
+OUTPUTS_DIR: Path = TESTS_DIR / "outputs"
+
+
+# --- Helper Functions ---
+
+def write_output_file(name: str, data: bytes) -> str:
+    file_path = str(OUTPUTS_DIR / name)
+    with open(file_path, "wb") as f:
+        f.write(data)
+    return file_path
+
+
+# --- Test Classes for Audit Functions ---
+
+class TestAuditFile(unittest.TestCase):
+    def setUp(self):
+        os.makedirs(OUTPUTS_DIR, exist_ok=True)
+
+    def test_statistics(self):
+        file_path = write_output_file("audit.txt", (
+            b"int main() {  \r\n"
+            b"\treturn 0;\n"
+            b"\n"
+            b"  \n"
+            b"\n"
+            b"\n"
+            b"    x = 1;\n"
+            b"\t  y = 2;\r"
+            b"}"
+        ))
+        self.addCleanup(os.remove, file_path)
+        a = audit_file(file_path)
+        self.assertEqual(a.encoding, "ascii")
+        self.assertFalse(a.has_bom)
+        self.assertEqual(a.num_lines, 9)
+        self.assertDictEqual(a.newline_counts, {
+            NewlineType.LF: 6, NewlineType.CRLF: 1, NewlineType.CR: 1,
+        })
+        self.assertEqual(a.trailing_whitespace_lines, 2)
+        self.assertEqual(a.tab_indented_lines, 1)
+        self.assertEqual(a.space_indented_lines, 1)
+        self.assertEqual(a.mixed_indented_lines, 1)
+        self.assertEqual(a.longest_line, 14)
+        self.assertEqual(a.longest_line_number, 1)
+        # The whitespace-only line splits the blank lines into two runs.
+        self.assertEqual(a.blank_line_runs, 1)
+        self.assertEqual(a.longest_blank_run, 2)
+
+    def test_encodings(self):
+        cases = [
+            (codecs.BOM_UTF8 + "café\n".encode("utf-8"), "utf-8", True),
+            ("café\n".encode("utf-8"), "utf-8", False),
+            ("café\n".encode("utf-16"), "utf-16-le", True),
+        ]
+        for i, (data, encoding, has_bom) in enumerate(cases):
+            with self.subTest(encoding=encoding, has_bom=has_bom):
+                file_path = write_output_file(f"audit-encoding-{i}.txt",
+                                              data)
+                self.addCleanup(os.remove, file_path)
+                a = audit_file(file_path)
+                self.assertEqual(a.encoding, encoding)
+                self.assertEqual(a.has_bom, has_bom)
+                self.assertEqual(a.longest_line, 4)
+
+    def test_picklable(self):
+        file_path = write_output_file("audit-pickle.txt", b"a\n")
+        self.addCleanup(os.remove, file_path)
+        a = pickle.loads(pickle.dumps(audit_file(file_path)))
+        self.assertEqual(a.num_lines, 1)
+
+    def test_decoding_error(self):
+        file_path = write_output_file("audit-invalid.txt",
+                                      b"a\n" * 50000 + b"caf\xe9\n")
+        self.addCleanup(os.remove, file_path)
+        with self.assertRaisesRegex(UnicodeDecodeError, "byte offset 100003"):
+            audit_file(file_path)
+        self.assertEqual(audit_file(file_path, "latin-1").num_lines, 50001)
+        # A sample that is not UTF-8 is not taken as another encoding.
+        file_path = write_output_file("audit-latin1.txt", b"caf\xe9\n")
+        self.addCleanup(os.remove, file_path)
+        with self.assertRaisesRegex(UnicodeDecodeError, "audit-latin1"):
+            audit_file(file_path)
+        self.assertEqual(audit_file(file_path, "latin-1").encoding,
+                         "iso8859-1")
+
+    def test_lines_across_chunks(self):
+        lines = list(audit._iter_lines(["a\r", "\nb\r", "c", "\r"]))
+        self.assertListEqual(lines, ["a\r\n", "b\r", "c\r"])
+        lines = list(audit._iter_lines(["a\r", "", "\n", "\r\r", "b"]))
+        self.assertListEqual(lines, ["a\r\n", "\r", "\r", "b"])
+
+    def test_long_unterminated_line(self):
+        # The line spans several chunks of the decoder.
+        file_path = write_output_file("audit-long-line.txt",
+                                      b"a\n" + b"x" * 3000000)
+        self.addCleanup(os.remove, file_path)
+        a = audit_file(file_path)
+        self.assertEqual(a.num_lines, 2)
+        self.assertEqual(a.longest_line, 3000000)
+        self.assertEqual(a.longest_line_number, 2)
+        lines = list(audit._iter_lines(["x" * 1000] * 1000))
+        self.assertListEqual(lines, ["x" * 1000000])
+
+
+class TestAuditSummary(unittest.TestCase):
+    def test_add(self):
+        a = FileAudit("a.txt")
+        a.encoding = "ascii"
+        a.newline_counts[NewlineType.LF] = 3
+        a.newline_counts[NewlineType.CRLF] = 1
+        a.longest_line = 10
+        a.longest_blank_run = 2
+        b = FileAudit("b.txt")
+        b.encoding = "ascii"
+        b.has_bom = True
+        b.newline_counts[NewlineType.LF] = 2
+        b.longest_line = 20
+        b.trailing_whitespace_lines = 4
+        summary = AuditSummary()
+        summary.add(a)
+        summary.add(b)
+        self.assertEqual(summary.num_files, 2)
+        self.assertEqual(summary.encodings["ascii"], 2)
+        self.assertEqual(summary.bom_files, 1)
+        self.assertEqual(summary.newline_files[NewlineType.LF], 2)
+        self.assertEqual(summary.mixed_newline_files, 1)
+        self.assertEqual(summary.longest_line, 20)
+        self.assertEqual(summary.longest_line_file, "b.txt")
+        self.assertEqual(summary.longest_blank_run, 2)
+        self.assertIn("Files: 2", summary.format())
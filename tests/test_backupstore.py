@@ -0,0 +1,96 @@
+# --- Imports ---
+import os
+import shutil
+import unittest
+
+from pathlib import Path
+
+import textformatter
+from textformatter import backupstore
+from textformatter.backupstore import (
+    # Classes
+    BackupRun,
+    BackupStore,
+)
+
+
+# --- Constants ---
+TESTS_DIR: Path = Path(__file__).parent
+DATA_DIR: Path = TESTS_DIR / "data"
+OUTPUTS_DIR: Path = TESTS_DIR / "outputs"
+
+
+# --- Test Classes for BackupStore ---
+
+class TestBackupStore(unittest.TestCase):
+    def setUp(self):
+        self.store_dir = OUTPUTS_DIR / "backup_store"
+        _delete_dir(self.store_dir)
+
+    def test_put_get(self):
+        store = BackupStore(self.store_dir)
+        digest = store.put(b"Line 1\nLine 2")
+        self.assertEqual(len(digest), 64)
+        self.assertEqual(store.get(digest), b"Line 1\nLine 2")
+
+    def test_put_deduplicates(self):
+        store = BackupStore(self.store_dir)
+        digest1 = store.put(b"Same text")
+        digest2 = store.put(b"Same text")
+        self.assertEqual(digest1, digest2)
+        objects = list((self.store_dir / "objects").rglob("*"))
+        self.assertEqual(len([p for p in objects if p.is_file()]), 1)
+
+    def test_put_compressed(self):
+        store = BackupStore(self.store_dir, compress=True)
+        data = b"Repeated text\n" * 100
+        digest = store.put(data)
+        self.assertEqual(store.get(digest), data)
+        self.assertEqual(BackupStore(self.store_dir).get(digest), data)
+
+    def test_get_missing(self):
+        store = BackupStore(self.store_dir)
+        try:
+            store.get("0" * 64)
+        except ValueError:
+            pass
+        except Exception:
+            self.fail("Unexpected exception raised")
+        else:
+            self.fail("ValueError not raised")
+
+    def test_restore_run(self):
+        file_path = OUTPUTS_DIR / "test_restore_run.txt"
+        with open(file_path, "wb") as f:
+            f.write(b"Original")
+        store = BackupStore(self.store_dir)
+        run = store.start_run()
+        self.assertFalse(run.has_backups())
+        run.backup_file(file_path, b"Original")
+        run.backup_file(file_path, b"Changed once")
+        self.assertTrue(run.has_backups())
+        with open(file_path, "wb") as f:
+            f.write(b"Changed twice")
+        self.assertListEqual(store.list_runs(), [run.run_id])
+        restored = store.restore_run(run.run_id)
+        self.assertListEqual(restored, [str(file_path.resolve())])
+        with open(file_path, "rb") as f:
+            self.assertEqual(f.read(), b"Original")
+
+    def test_restore_missing_run(self):
+        store = BackupStore(self.store_dir)
+        try:
+            store.restore_run("missing")
+        except ValueError:
+            pass
+        except Exception:
+            self.fail("Unexpected exception raised")
+        else:
+            self.fail("ValueError not raised")
+
+
+# --- Helper Functions ---
+
+def _delete_dir(dir_path: str) -> None:
+    if os.path.exists(dir_path):
+        shutil.rmtree(dir_path)
@@ -0,0 +1,79 @@
+# --- Imports ---
+import unittest
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+import textformatter
+from textformatter import batch
+from textformatter.batch import (
+    # Batch formatting functions
+    format_batch,
+)
+from textformatter.textformatter import (
+    BlankLineType,
+    CaseType,
+    NewlineType,
+    TabType,
+    TrimType,
+    TextFormatterConfig,
+)
+
+
+# --- Constants ---
+CONFIG = TextFormatterConfig(
+    blank_line_type=BlankLineType.REMOVE,
+    case_type=CaseType.UPPER,
+    newline_type=NewlineType.CRLF,
+    tab_type=(TabType.TAB_TO_SPACES, 2),
+    trim_type=TrimType.ALL,
+)
+
+
+# --- Test Classes for Batch Formatting Functions ---
+
+class TestFormatBatch(unittest.TestCase):
+    def test_same_length(self):
+        values = ["  a\tb ", "", "  ", "c"]
+        self.assertListEqual(format_batch(values, CONFIG),
+                             ["A  B", "", "", "C"])
+
+    def test_values_with_newlines(self):
+        values = [" a\nb ", "c\r\n"]
+        self.assertListEqual(format_batch(values, CONFIG),
+                             ["A\nB", "C"])
+
+    def test_title_case(self):
+        config = TextFormatterConfig(case_type=CaseType.TITLE)
+        self.assertListEqual(format_batch(("don't stop",), config),
+                             ["Don't Stop"])
+
+    def test_empty(self):
+        self.assertListEqual(format_batch([], CONFIG), [])
+        self.assertListEqual(format_batch(["a "], TextFormatterConfig()),
+                             ["a "])
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_numpy_array(self):
+        values = np.array(["  a\tb ", "", "don't ", "c"])
+        result = format_batch(values, CONFIG)
+        self.assertIsInstance(result, np.ndarray)
+        self.assertListEqual(result.tolist(), ["A  B", "", "DON'T", "C"])
+        config = TextFormatterConfig(case_type=CaseType.TITLE,
+                                     tab_type=(TabType.UNEXPAND, 2))
+        result = format_batch(np.array(["    don't"]), config)
+        self.assertListEqual(result.tolist(), ["\t\tDon't"])
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_numpy_non_ascii_case(self):
+        config = TextFormatterConfig(case_type=CaseType.UPPER)
+        values = ["stra\u00dfe", "caf\u00e9", "abc"]
+        for array in (np.array(values), np.array(values, dtype=object)):
+            with self.subTest(dtype=array.dtype):
+                self.assertListEqual(format_batch(array, config).tolist(),
+                                     ["STRASSE", "CAF\u00c9", "ABC"])
+        config = TextFormatterConfig(case_type=CaseType.LOWER)
+        result = format_batch(np.array(["\u0130X"]), config)
+        self.assertListEqual(result.tolist(), ["\u0130x".lower()])
@@ -16,6 +16,7 @@ from textformatter.textformatter import (
    # Classes
     BlankLineType,
     CaseType,
+    ConfigError,
     NewlineType,
     TabType,
     TrimType,
@@ -41,6 +42,17 @@ class TestReadConfig(unittest.TestCase):
         self.assertEqual(config_data.blank_line_type, BlankLineType.REMOVE)
         self.assertEqual(config_data.tab_type, (TabType.TAB_TO_SPACES, 4))
 
+    def test_read_config_file_strict(self):
+        config_data = read_config_file(DATA_DIR / "test_read_config.yaml",
+                                       strict=True)
+        self.assertEqual(config_data.tab_type, (TabType.TAB_TO_SPACES, 4))
+        file_path = OUTPUTS_DIR / "test_read_config_strict.yaml"
+        with open(file_path, "w") as f:
+            f.write("whitespace:\n  tab: [tab-to-space, 4]\n")
+        self.addCleanup(_delete_file, file_path)
+        with self.assertRaises(ConfigError):
+            read_config_file(file_path, strict=True)
+
 class TestWriteConfig(unittest.TestCase):
     def test_write_config_file(self):
         file_path = OUTPUTS_DIR / "test_write_config.yaml"
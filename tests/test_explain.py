@@ -0,0 +1,108 @@
+# --- Imports ---
+import os
+import shutil
+import unittest
+
+from pathlib import Path
+
+import textformatter
+from textformatter import explain
+from textformatter.explain import (
+    # Plan functions
+    explain_config,
+)
+from textformatter.resultcache import (
+    ResultCache,
+)
+from textformatter.textformatter import (
+    BlankLineType,
+    CaseType,
+    NewlineType,
+    TrimType,
+    TextFormatterConfig,
+)
+
+
+# --- Constants ---
+TESTS_DIR: Path = Path(__file__).parent
+DATA_DIR: Path = TESTS_DIR / "data"
+OUTPUTS_DIR: Path = TESTS_DIR / "outputs"
+
+
+# --- Test Classes for Plan Functions ---
+
+class TestExplainConfig(unittest.TestCase):
+    def test_stages(self):
+        config = TextFormatterConfig(
+            blank_line_type=BlankLineType.COLLAPSE,
+            case_type=CaseType.TITLE,
+            newline_type=NewlineType.CRLF,
+            trim_type=TrimType.TRAILING,
+        )
+        lines = explain_config(config).splitlines()
+        self.assertListEqual(lines[:5], [
+            "Stages:",
+            "  1. per-line: trim=trailing",
+            "  2. whole-buffer (bytes): letter-case=title",
+            "  3. per-line (stateful): blank-lines=collapse",
+            "Output: newline=\\r\\n",
+        ])
+        self.assertFalse(any(line.startswith("Estimated cost")
+                             for line in lines))
+
+    def test_estimated_cost(self):
+        config = TextFormatterConfig(trim_type=TrimType.ALL)
+        files = [str(DATA_DIR / "read_file_linux.txt"),
+                 str(DATA_DIR / "read_file_windows.txt")]
+        text = explain_config(config, files)
+        total_bytes = sum(os.path.getsize(f) for f in files)
+        self.assertIn(f"for 2 file(s), {total_bytes:,} bytes", text)
+        self.assertIn("  stage 1: ", text)
+
+    def test_line_count(self):
+        cache_dir = OUTPUTS_DIR / "explain_cache"
+        if os.path.exists(cache_dir):
+            shutil.rmtree(cache_dir)
+        self.addCleanup(shutil.rmtree, cache_dir)
+        file_path = OUTPUTS_DIR / "explain_lines.txt"
+        with open(file_path, "wb") as f:
+            f.write(b"Line 1\r\nLine 2\nLine 3")
+        self.addCleanup(os.remove, file_path)
+        cache = ResultCache(cache_dir)
+        config = TextFormatterConfig()
+        text = explain_config(config, [str(file_path)], cache)
+        self.assertIn("Lines: 3\n", text)
+        self.assertFalse(os.path.exists(cache.line_index_dir))
+        text = explain_config(config, [str(file_path)], cache,
+                              count_lines=True)
+        self.assertIn("Lines: 3 (mixed newlines: 1 file(s))", text)
+        self.assertEqual(len(os.listdir(cache.line_index_dir)), 1)
+
+    def test_estimated_line_count(self):
+        file_path = OUTPUTS_DIR / "explain_estimated_lines.txt"
+        with open(file_path, "wb") as f:
+            f.write(b"0123456789abcdef\n" * 200000)
+        self.addCleanup(os.remove, file_path)
+        text = explain_config(TextFormatterConfig(), [str(file_path)])
+        self.assertIn("Lines: about 200,000 (estimated from a sample of", text)
+
+    def test_estimated_cost_encodings(self):
+        # A UTF-16 file larger than the sample, and a UTF-8 one.
+        files = []
+        for name, data in [
+                ("explain_utf16.txt",
+                 "Caf\u00e9  \r\n".encode("utf-16") * 150000),
+                ("explain_utf8.txt", "Caf\u00e9  \n".encode() * 10)]:
+            file_path = OUTPUTS_DIR / name
+            with open(file_path, "wb") as f:
+                f.write(data)
+            self.addCleanup(os.remove, file_path)
+            files.append(str(file_path))
+        config = TextFormatterConfig(trim_type=TrimType.ALL)
+        for sample_files in (files, files[::-1]):
+            with self.subTest(files=sample_files):
+                text = explain_config(config, sample_files,
+                                      count_lines=True)
+                self.assertIn("Estimated cost: ", text)
+                self.assertIn("not counted: 1 file(s)", text)
+
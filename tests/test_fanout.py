@@ -0,0 +1,107 @@
+# --- Imports ---
+import os
+import shutil
+import unittest
+
+from pathlib import Path
+
+import textformatter
+from textformatter import fanout
+from textformatter.fanout import (
+    # Classes
+    Variant,
+    # Fan-out functions
+    format_lines_variants,
+    process_file_variants,
+)
+from textformatter.textformatter import (
+    BlankLineType,
+    CaseType,
+    NewlineType,
+    StageKind,
+    TabType,
+    TrimType,
+    TextFormatterConfig,
+    Transform,
+    format_lines,
+    register_transform,
+    unregister_transform,
+)
+
+
+# --- Constants ---
+TESTS_DIR: Path = Path(__file__).parent
+DATA_DIR: Path = TESTS_DIR / "data"
+OUTPUTS_DIR: Path = TESTS_DIR / "outputs"
+
+
+# --- Test Classes for Fan-Out Functions ---
+
+class TestFormatLinesVariants(unittest.TestCase):
+    def test_shared_prefix(self):
+        calls = []
+        register_transform(Transform(
+            name="test-count", config_key=("test-count",), order=5,
+            kind=StageKind.PER_LINE, parse=str, dump=str,
+            build=lambda value: lambda line: calls.append(line) or line,
+        ))
+        self.addCleanup(unregister_transform, "test-count")
+        configs = [
+            TextFormatterConfig(trim_type=TrimType.ALL,
+                                case_type=CaseType.UPPER,
+                                newline_type=NewlineType.CRLF),
+            TextFormatterConfig(trim_type=TrimType.ALL,
+                                blank_line_type=BlankLineType.REMOVE),
+            TextFormatterConfig(trim_type=TrimType.ALL,
+                                case_type=CaseType.UPPER,
+                                tab_type=(TabType.TAB_TO_SPACES, 2)),
+            TextFormatterConfig(),
+        ]
+        for config in configs[:3]:
+            config.options["test-count"] = "on"
+        lines = [" a\tb ", "", "c"]
+        results = format_lines_variants(lines, configs)
+        for config, result in zip(configs, results):
+            self.assertListEqual(result, format_lines(lines, config))
+        calls.clear()
+        format_lines_variants(lines, configs)
+        self.assertEqual(len(calls), len(lines))
+
+    def test_no_configs(self):
+        self.assertListEqual(format_lines_variants(["a"], []), [])
+
+
+class TestProcessFileVariants(unittest.TestCase):
+    def test_process_file_variants(self):
+        output_dir = OUTPUTS_DIR / "variants"
+        if os.path.exists(output_dir):
+            shutil.rmtree(output_dir)
+        input_path = DATA_DIR / "test_process_file1.txt"
+        variants = [
+            Variant(TextFormatterConfig(trim_type=TrimType.TRAILING,
+                                        newline_type=NewlineType.CRLF),
+                    output_dir / "crlf"),
+            Variant(TextFormatterConfig(case_type=CaseType.UPPER),
+                    output_dir / "upper"),
+        ]
+        output_paths = process_file_variants(input_path, variants, TESTS_DIR)
+        self.assertListEqual(output_paths, [
+            str(output_dir / "crlf" / "data" / "test_process_file1.txt"),
+            str(output_dir / "upper" / "data" / "test_process_file1.txt"),
+        ])
+        with open(output_paths[0], "rb") as f:
+            self.assertTrue(f.read().startswith(b"int\r\nsome_function"
+                                                b"(void) {\r\n"))
+        with open(output_paths[1], "rb") as f:
+            self.assertTrue(f.read().startswith(b"INT\nSOME_FUNCTION"))
+
+    def test_outside_base_dir(self):
+        try:
+            process_file_variants(DATA_DIR / "test_process_file1.txt", [],
+                                  OUTPUTS_DIR)
+        except ValueError:
+            pass
+        except Exception:
+            self.fail("Unexpected exception raised")
+        else:
+            self.fail("ValueError not raised")
@@ -0,0 +1,54 @@
+# --- Imports ---
+import os
+import shutil
+import unittest
+
+from pathlib import Path
+
+import textformatter
+from textformatter.fileutil import (
+    # File functions
+    write_file_atomic,
+)
+
+
+# --- Constants ---
+TESTS_DIR: Path = Path(__file__).parent
+DATA_DIR: Path = TESTS_DIR / "data"
+OUTPUTS_DIR: Path = TESTS_DIR / "outputs"
+
+
+# --- Test Classes for File Functions ---
+
+class TestWriteFileAtomic(unittest.TestCase):
+    def setUp(self):
+        self.dir_path = OUTPUTS_DIR / "write_file_atomic"
+        _delete_dir(self.dir_path)
+        self.addCleanup(_delete_dir, self.dir_path)
+
+    def test_write(self):
+        file_path = self.dir_path / "file.txt"
+        write_file_atomic(file_path, b"First")
+        os.chmod(file_path, 0o640)
+        write_file_atomic(file_path, b"Second")
+        with open(file_path, "rb") as f:
+            self.assertEqual(f.read(), b"Second")
+        self.assertEqual(os.stat(file_path).st_mode & 0o777, 0o640)
+        self.assertListEqual(os.listdir(self.dir_path), ["file.txt"])
+
+    def test_new_file_mode(self):
+        os.makedirs(self.dir_path)
+        expected_path = self.dir_path / "expected.txt"
+        with open(expected_path, "wb"):
+            pass
+        file_path = self.dir_path / "file.txt"
+        write_file_atomic(file_path, b"Data")
+        self.assertEqual(os.stat(file_path).st_mode & 0o777,
+                         os.stat(expected_path).st_mode & 0o777)
+
+
+# --- Helper Functions ---
+
+def _delete_dir(dir_path: str) -> None:
+    if os.path.exists(dir_path):
+        shutil.rmtree(dir_path)
@@ -0,0 +1,55 @@
+# --- Imports ---
+import os
+import unittest
+
+from pathlib import Path
+
+import textformatter
+from textformatter import journal
+from textformatter.journal import (
+    # Classes
+    Journal,
+)
+
+
+# --- Constants ---
+TESTS_DIR: Path = Path(__file__).parent
+DATA_DIR: Path = TESTS_DIR / "data"
+OUTPUTS_DIR: Path = TESTS_DIR / "outputs"
+
+
+# --- Test Classes for Journal ---
+
+class TestJournal(unittest.TestCase):
+    def setUp(self):
+        self.file_path = OUTPUTS_DIR / "test_journal.log"
+        if os.path.exists(self.file_path):
+            os.remove(self.file_path)
+
+    def test_empty(self):
+        self.assertEqual(Journal(self.file_path).load_completed(), set())
+
+    def test_record_and_load(self):
+        with Journal(self.file_path, sync_every=2) as j:
+            j.record("a.txt")
+            j.record("b.txt")
+            j.record("c.txt")
+        completed = Journal(self.file_path).load_completed()
+        self.assertEqual(completed, {os.path.abspath("a.txt"),
+                                     os.path.abspath("b.txt"),
+                                     os.path.abspath("c.txt")})
+
+    def test_batched_sync(self):
+        j = Journal(self.file_path, sync_every=3, sync_interval=3600)
+        j.record("a.txt")
+        j.record("b.txt")
+        self.assertEqual(os.path.getsize(self.file_path), 0)
+        j.record("c.txt")
+        self.assertTrue(os.path.getsize(self.file_path) > 0)
+        j.close()
+
+    def test_ignore_cut_off_line(self):
+        with open(self.file_path, "w") as f:
+            f.write("/data/a.txt\n/data/b.t")
+        self.assertEqual(Journal(self.file_path).load_completed(),
+                         {"/data/a.txt"})
@@ -0,0 +1,95 @@
+# --- Imports ---
+import os
+import pickle
+import unittest
+
+from pathlib import Path
+
+import textformatter
+from textformatter import metrics
+from textformatter.metrics import (
+    # Classes
+    Metrics,
+)
+from textformatter.textformatter import (
+    CaseType,
+    TrimType,
+    TextFormatterConfig,
+    process_file_with_metrics,
+)
+
+
+# --- Constants ---
+TESTS_DIR: Path = Path(__file__).parent
+OUTPUTS_DIR: Path = TESTS_DIR / "outputs"
+
+
+# --- Test Classes for Metrics ---
+
+class TestMetrics(unittest.TestCase):
+    def test_merge(self):
+        m1 = Metrics()
+        m1.files_processed = 2
+        m1.bytes_read = 100
+        m1.add_stage_time("trim", 0.5)
+        m1.observe_file_time(0.002)
+        m2 = pickle.loads(pickle.dumps(m1))
+        m2.files_failed = 1
+        m2.add_stage_time("letter-case", 0.25)
+        m2.observe_file_time(100.0)
+        m1.merge(m2)
+        self.assertEqual(m1.files_processed, 4)
+        self.assertEqual(m1.files_failed, 1)
+        self.assertEqual(m1.bytes_read, 200)
+        self.assertDictEqual(m1.stage_seconds,
+                             {"trim": 1.0, "letter-case": 0.25})
+        self.assertEqual(sum(m1.file_seconds_counts), 3)
+        self.assertEqual(m1.file_seconds_counts[-1], 1)
+
+    def test_to_openmetrics(self):
+        m = Metrics()
+        m.files_changed = 3
+        m.add_stage_time("trim+\"tab\"", 1.5)
+        m.observe_file_time(0.001)
+        m.observe_file_time(0.2)
+        lines = m.to_openmetrics().splitlines()
+        self.assertIn("# TYPE textformatter_files_changed counter", lines)
+        self.assertIn("textformatter_files_changed_total 3", lines)
+        self.assertIn('textformatter_stage_seconds_total'
+                      '{stage="trim+\\"tab\\""} 1.5', lines)
+        self.assertIn('textformatter_file_seconds_bucket{le="0.001"} 1',
+                      lines)
+        self.assertIn('textformatter_file_seconds_bucket{le="0.5"} 2',
+                      lines)
+        self.assertIn('textformatter_file_seconds_bucket{le="+Inf"} 2',
+                      lines)
+        self.assertIn("textformatter_file_seconds_count 2", lines)
+        self.assertEqual(lines[-1], "# EOF")
+
+    def test_write(self):
+        file_path = OUTPUTS_DIR / "metrics.txt"
+        os.makedirs(OUTPUTS_DIR, exist_ok=True)
+        self.addCleanup(os.remove, file_path)
+        Metrics().write(file_path)
+        with open(file_path) as f:
+            self.assertTrue(f.read().endswith("# EOF\n"))
+
+    def test_process_file_with_metrics(self):
+        file_path = OUTPUTS_DIR / "metrics_process_file.txt"
+        os.makedirs(OUTPUTS_DIR, exist_ok=True)
+        self.addCleanup(os.remove, file_path)
+        with open(file_path, "wb") as f:
+            f.write(b"Line 1  \nLine 2")
+        config = TextFormatterConfig(backup_file=False,
+                                     case_type=CaseType.UPPER,
+                                     trim_type=TrimType.TRAILING)
+        is_changed, m = process_file_with_metrics(file_path, config)
+        self.assertTrue(is_changed)
+        self.assertEqual(m.files_processed, 1)
+        self.assertEqual(m.files_changed, 1)
+        self.assertEqual(m.bytes_read, 15)
+        self.assertEqual(m.bytes_written, 13)
+        self.assertEqual(set(m.stage_seconds), {"read", "decode", "trim",
+                                                "letter-case", "encode",
+                                                "write"})
+        self.assertEqual(sum(m.file_seconds_counts), 1)
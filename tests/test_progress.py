@@ -0,0 +1,41 @@
+# --- Imports ---
+import io
+import unittest
+
+import textformatter
+from textformatter import progress
+from textformatter.progress import (
+    # Classes
+    Progress,
+)
+
+
+# --- Test Classes for Progress ---
+
+class TestProgress(unittest.TestCase):
+    def test_slowest_files(self):
+        p = Progress(4, 400, stream=io.StringIO(), num_slowest=2)
+        p.update("a.txt", 100, 0.5)
+        p.update("b.txt", 100, 2.0)
+        p.update("c.txt", 100, 0.1)
+        p.update("d.txt", 100, 1.0)
+        self.assertListEqual(p.slowest_files, [(2.0, "b.txt"),
+                                               (1.0, "d.txt")])
+        self.assertEqual(p.files_done, 4)
+        self.assertEqual(p.bytes_done, 400)
+
+    def test_format_status(self):
+        p = Progress(10, 10 * 1024 * 1024, stream=io.StringIO())
+        p.update("a.txt", 1024 * 1024, 0.1)
+        status = p.format_status(p._start_time + 1.0)
+        self.assertEqual(status,
+                         "1/10 files  1.0 files/s  1.00 MB/s  ETA 0:00:09")
+
+    def test_throttled_output(self):
+        stream = io.StringIO()
+        p = Progress(1000, 1000, stream=stream, interval=3600)
+        for i in range(1000):
+            p.update(f"{i}.txt", 1, 0.0)
+        self.assertEqual(stream.getvalue(), "")
+        p.finish()
+        self.assertTrue(stream.getvalue().startswith("1000/1000 files"))
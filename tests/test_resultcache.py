@@ -0,0 +1,95 @@
+# --- Imports ---
+import os
+import shutil
+import time
+import unittest
+
+from pathlib import Path
+
+import textformatter
+from textformatter import resultcache
+from textformatter.resultcache import (
+    # Classes
+    ResultCache,
+)
+from textformatter.textformatter import (
+    TrimType,
+    TextFormatterConfig,
+    process_file,
+)
+
+
+# --- Constants ---
+TESTS_DIR: Path = Path(__file__).parent
+OUTPUTS_DIR: Path = TESTS_DIR / "outputs"
+
+
+# --- Test Classes for ResultCache ---
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = OUTPUTS_DIR / "result_cache"
+        _delete_dir(self.cache_dir)
+        self.addCleanup(_delete_dir, self.cache_dir)
+
+    def test_make_key(self):
+        cache = ResultCache(self.cache_dir)
+        config1 = TextFormatterConfig(trim_type=TrimType.ALL)
+        config2 = TextFormatterConfig(trim_type=TrimType.TRAILING)
+        key = cache.make_key(b"text", config1)
+        self.assertEqual(key, cache.make_key(b"text", config1))
+        self.assertNotEqual(key, cache.make_key(b"text ", config1))
+        self.assertNotEqual(key, cache.make_key(b"text", config2))
+
+    def test_put_get(self):
+        cache = ResultCache(self.cache_dir)
+        self.assertEqual(cache.get("a" * 64), (False, None))
+        cache.put("a" * 64, b"formatted")
+        cache.put("b" * 64, b"")
+        cache.put("c" * 64, None)
+        self.assertEqual(cache.get("a" * 64), (True, b"formatted"))
+        self.assertEqual(cache.get("b" * 64), (True, b""))
+        self.assertEqual(cache.get("c" * 64), (True, None))
+
+    def test_evict_least_recently_used(self):
+        cache = ResultCache(self.cache_dir)
+        for i, key in enumerate(["a" * 64, "b" * 64, "c" * 64]):
+            cache.put(key, b"x" * 99)
+            object_path = cache._object_path(key)
+            os.utime(object_path, (time.time() - 100 + i,) * 2)
+        cache.get("a" * 64)
+        cache = ResultCache(self.cache_dir, max_bytes=250)
+        self.assertEqual(cache.evict(), 1)
+        self.assertTrue(cache.get("a" * 64)[0])
+        self.assertFalse(cache.get("b" * 64)[0])
+        self.assertTrue(cache.get("c" * 64)[0])
+
+    def test_invalid_size(self):
+        with self.assertRaises(ValueError):
+            ResultCache(self.cache_dir, max_bytes=0)
+
+    def test_process_file(self):
+        config = TextFormatterConfig(backup_file=False,
+                                     trim_type=TrimType.TRAILING)
+        cache = ResultCache(self.cache_dir)
+        file_paths = [OUTPUTS_DIR / f"result_cache_{i}.txt" for i in range(2)]
+        for file_path in file_paths:
+            file_path.write_bytes(b"Line 1  \nLine 2\n")
+            self.addCleanup(os.remove, file_path)
+        self.assertTrue(process_file(str(file_paths[0]), config,
+                                     cache=cache))
+        key = cache.make_key(b"Line 1  \nLine 2\n", config)
+        # A cached result is used as is.
+        cache.put(key, b"Cached\n")
+        self.assertTrue(process_file(str(file_paths[1]), config,
+                                     cache=cache))
+        self.assertEqual(file_paths[0].read_bytes(), b"Line 1\nLine 2")
+        self.assertEqual(file_paths[1].read_bytes(), b"Cached\n")
+        self.assertEqual(len(os.listdir(self.cache_dir / "objects")), 1)
+
+
+# --- Helper Functions ---
+
+def _delete_dir(dir_path: Path) -> None:
+    if os.path.exists(dir_path):
+        shutil.rmtree(dir_path)
@@ -0,0 +1,125 @@
+# --- Imports ---
+import os
+import threading
+import time
+import unittest
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import textformatter
+from textformatter import scheduler
+from textformatter.scheduler import (
+    # Classes
+    FileResult,
+    # Scheduling functions
+    parse_size,
+    schedule_files,
+)
+from textformatter.textformatter import (
+    TrimType,
+    TextFormatterConfig,
+    process_file,
+)
+
+
+# --- Constants ---
+TESTS_DIR: Path = Path(__file__).parent
+DATA_DIR: Path = TESTS_DIR / "data"
+OUTPUTS_DIR: Path = TESTS_DIR / "outputs"
+
+
+# --- Test Classes for Scheduling Functions ---
+
+class TestScheduleFiles(unittest.TestCase):
+    def setUp(self):
+        self.files = []
+        for i, size in enumerate([10, 100, 5, 1000, 50]):
+            file_path = OUTPUTS_DIR / f"test_schedule_{i}.txt"
+            with open(file_path, "w") as f:
+                f.write("x" * (size - 1) + " ")
+            self.files.append(str(file_path))
+
+    def test_sequential(self):
+        results = list(schedule_files(self.files, os.path.getsize,
+                                      max_workers=1))
+        self.assertListEqual([result.size for result in results],
+                             [1000, 100, 50, 10, 5])
+        for result in results:
+            self.assertEqual(result.value, result.size)
+            self.assertTrue(result.error is None)
+
+    def test_budget(self):
+        lock = threading.Lock()
+        inflight = []
+        snapshots = []
+
+        def task(file_path):
+            size = os.path.getsize(file_path)
+            with lock:
+                inflight.append(size)
+                snapshots.append(list(inflight))
+            time.sleep(0.01)
+            with lock:
+                inflight.remove(size)
+            return size
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(schedule_files(self.files, task, max_workers=4,
+                                          max_inflight_bytes=120,
+                                          executor=executor))
+        self.assertEqual(sorted(result.value for result in results),
+                         [5, 10, 50, 100, 1000])
+        for snapshot in snapshots:
+            if 1000 in snapshot:
+                self.assertListEqual(snapshot, [1000])
+            else:
+                self.assertTrue(sum(snapshot) <= 120)
+
+    def test_process_pool(self):
+        config = TextFormatterConfig(backup_file=False,
+                                     trim_type=TrimType.TRAILING)
+        results = list(schedule_files(self.files, process_file, (config,),
+                                      max_workers=2,
+                                      max_inflight_bytes=200))
+        self.assertEqual(len(results), len(self.files))
+        for result in results:
+            self.assertTrue(result.error is None)
+            self.assertTrue(result.value)
+        with open(self.files[0]) as f:
+            self.assertFalse(f.read().endswith(" "))
+
+    def test_error(self):
+        results = list(schedule_files([OUTPUTS_DIR / "missing.txt"],
+                                      process_file, (TextFormatterConfig(),),
+                                      max_workers=1))
+        self.assertTrue(isinstance(results[0].error, ValueError))
+
+    def test_invalid_budget(self):
+        try:
+            list(schedule_files(self.files, os.path.getsize,
+                                max_inflight_bytes=0))
+        except ValueError:
+            pass
+        except Exception:
+            self.fail("Unexpected exception raised")
+        else:
+            self.fail("ValueError not raised")
+
+
+class TestParseSize(unittest.TestCase):
+    def test_parse_size(self):
+        self.assertEqual(parse_size("100"), 100)
+        self.assertEqual(parse_size("2K"), 2048)
+        self.assertEqual(parse_size("1.5m"), 1572864)
+        self.assertEqual(parse_size("1G"), 1024 ** 3)
+
+    def test_invalid(self):
+        try:
+            parse_size("lots")
+        except ValueError:
+            pass
+        except Exception:
+            self.fail("Unexpected exception raised")
+        else:
+            self.fail("ValueError not raised")
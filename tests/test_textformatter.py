@@ -1,4 +1,5 @@
 # --- Imports ---
+import codecs
 import os
 import shutil
 import unittest
@@ -8,38 +9,70 @@ from pathlib import Path
 import textformatter
 from textformatter import configfile
 from textformatter import textformatter
+from textformatter.backupstore import (
+    BackupStore,
+)
 from textformatter.configfile import (
     read_config_file,
 )
+from textformatter.resultcache import (
+    ResultCache,
+)
 from textformatter.textformatter import (
     # Constants
+    _BACKUP_COMPRESS,
+    _BACKUP_DIR,
     _BACKUP_FILE,
     _BLANK_LINES,
+    _ENCODING,
     _LETTER_CASE,
     _NEWLINE,
+    _REGEX_REPLACE,
     _TAB,
     _TRIM,
     _WHITESPACE,
+    _WRITE_MODE,
     # Classes
     BlankLineType,
+    ConfigError,
     CaseType,
     NewlineType,
     TabType,
     TrimType,
+    WriteMode,
     TextFormatterConfig,
+    StageKind,
+    Transform,
+    LineIndex,
+    # Transform registry functions
+    register_transform,
+    unregister_transform,
+    get_transforms,
+    compile_pipeline,
     # Document formatting functions
     process_file,
+    format_lines,
+    align_formatted_lines,
+    format_file_data,
+    write_file_data,
+    detect_encoding,
+    decode_file_data,
+    encode_file_text,
     split_text_to_lines,
     join_lines_to_text,
     read_lines_from_file,
+    read_line_range,
     write_lines_to_file,
     remove_blank_lines,
     # Line whitespace formatting functions
     replace_spaces_with_tab,
     replace_tab_with_spaces,
+    expand_tabs,
+    unexpand_indentation,
     trim_line,
     # Line text formatting functions
     convert_case,
+    convert_case_lines,
 )
 
 
@@ -99,6 +132,8 @@ class TestTextFormatterConfigFromDict(unittest.TestCase):
     def test_dict(self):
         config_dict = {
             _BACKUP_FILE: "false",
+            _BACKUP_DIR: "backups",
+            _BACKUP_COMPRESS: True,
             _NEWLINE: "\\n",
             _LETTER_CASE: "upper",
             _WHITESPACE: {
@@ -110,11 +145,71 @@ class TestTextFormatterConfigFromDict(unittest.TestCase):
         config = TextFormatterConfig.from_dict(config_dict)
         self.assertTrue(config is not None)
         self.assertEqual(config.backup_file, False)
+        self.assertEqual(config.backup_dir, "backups")
+        self.assertEqual(config.backup_compress, True)
         self.assertEqual(config.blank_line_type, BlankLineType.COLLAPSE)
         self.assertEqual(config.case_type, CaseType.UPPER)
         self.assertEqual(config.newline_type, NewlineType.LF)
         self.assertEqual(config.tab_type, (TabType.TAB_TO_SPACES, 4))
         self.assertEqual(config.trim_type, TrimType.ALL)
+        self.assertIsNone(config.encoding)
+
+    def test_encoding(self):
+        config = TextFormatterConfig.from_dict({_ENCODING: "utf-16"})
+        self.assertEqual(config.encoding, "utf-16")
+        self.assertEqual(config.to_dict().get(_ENCODING), "utf-16")
+        config = TextFormatterConfig.from_dict({_ENCODING: "auto"})
+        self.assertIsNone(config.encoding)
+        self.assertNotIn(_ENCODING, config.to_dict())
+
+class TestTextFormatterConfigStrict(unittest.TestCase):
+    def test_lenient(self):
+        config = TextFormatterConfig.from_dict({
+            _WHITESPACE: {_TAB: ["tab-to-space", 4], "trimm": "all"},
+            _LETTER_CASE: "upper",
+        })
+        self.assertIsNone(config.tab_type)
+        self.assertEqual(config.case_type, CaseType.UPPER)
+
+    def test_every_error(self):
+        config_dict = {
+            _BACKUP_FILE: "maybe",
+            _ENCODING: "no-such-encoding",
+            _WRITE_MODE: "fast",
+            _LETTER_CASE: "upper",
+            _WHITESPACE: {
+                _TAB: ["tab-to-space", 4],
+                _TRIM: "all",
+                "trimm": "all",
+            },
+            "colour": "blue",
+        }
+        with self.assertRaises(ConfigError) as context:
+            TextFormatterConfig.from_dict(config_dict, strict=True)
+        errors = context.exception.errors
+        self.assertEqual(len(errors), 6)
+        self.assertTrue(errors[0].startswith(_BACKUP_FILE))
+        self.assertTrue(any(error.startswith(f"{_WHITESPACE}.{_TAB}:")
+                            for error in errors))
+        self.assertIn(f"{_WHITESPACE}.trimm: unknown key.", errors)
+        self.assertIn("colour: unknown key.", errors)
+        self.assertIsInstance(context.exception, ValueError)
+
+    def test_built_value(self):
+        with self.assertRaises(ConfigError):
+            TextFormatterConfig.from_dict(
+                {_WHITESPACE: {_TAB: ["tab-to-spaces", -1]}}, strict=True)
+        with self.assertRaises(ConfigError):
+            TextFormatterConfig.from_dict({_WHITESPACE: {_TAB: ["expand"]}},
+                                          strict=True)
+
+    def test_valid(self):
+        config = TextFormatterConfig.from_dict({
+            _ENCODING: "auto",
+            _WHITESPACE: {_TAB: ["expand", 8], _TRIM: "all"},
+        }, strict=True)
+        self.assertEqual(config.tab_type, (TabType.EXPAND, 8))
+
 
 class TestTextFormatterConfigToDict(unittest.TestCase):
     def test_dict(self):
@@ -137,6 +232,195 @@ class TestTextFormatterConfigToDict(unittest.TestCase):
         self.assertEqual(whitespace_dict.get(_TRIM), "trailing")
 
 
+# --- Test Classes for LineIndex ---
+
+class TestLineIndex(unittest.TestCase):
+    def test_from_bytes(self):
+        index = LineIndex.from_bytes(b"Line 1\nLine 2\n\nLine 4")
+        self.assertListEqual(list(index.offsets), [0, 7, 14, 15, 21])
+        self.assertEqual(index.num_lines, 4)
+        self.assertEqual(index.newline_types, {NewlineType.LF})
+        self.assertFalse(index.is_mixed)
+
+    def test_mixed_newlines(self):
+        data = b"Line A\r\nLine B\rLine C\n\r\n"
+        index = LineIndex.from_bytes(data)
+        self.assertEqual(index.num_lines,
+                         len(split_text_to_lines(data.decode())))
+        self.assertListEqual(list(index.offsets), [0, 8, 15, 22, 24])
+        self.assertEqual(index.newline_counts, {NewlineType.LF: 1,
+                                                NewlineType.CRLF: 2,
+                                                NewlineType.CR: 1})
+        self.assertTrue(index.is_mixed)
+
+    def test_empty(self):
+        index = LineIndex.from_bytes(b"")
+        self.assertEqual(index.num_lines, 0)
+        self.assertEqual(index.split(4), [])
+
+    def test_build_and_read_range(self):
+        file_path = DATA_DIR / "read_file_windows.txt"
+        index = LineIndex.build(file_path)
+        lines = read_lines_from_file(file_path)
+        self.assertEqual(index.num_lines, len(lines))
+        self.assertEqual(index.newline_types, {NewlineType.CRLF})
+        self.assertListEqual(read_line_range(file_path, index, 1, 4),
+                             lines[1:4])
+        self.assertListEqual(read_line_range(file_path, index, 3, 100),
+                             lines[3:])
+
+    def test_split(self):
+        index = LineIndex.from_bytes(b"a\n" * 10)
+        self.assertListEqual(index.split(3), [(0, 3), (3, 7), (7, 10)])
+        self.assertEqual(len(index.split(20)), 10)
+
+    def test_load_or_build(self):
+        index_dir = OUTPUTS_DIR / "line_index"
+        if os.path.exists(index_dir):
+            shutil.rmtree(index_dir)
+        file_path = OUTPUTS_DIR / "test_line_index.txt"
+        with open(file_path, "wb") as f:
+            f.write(b"Line 1\r\nLine 2\n")
+        index = LineIndex.load_or_build(file_path, index_dir)
+        self.assertEqual(len(os.listdir(index_dir)), 1)
+        saved_path = index_dir / os.listdir(index_dir)[0]
+        saved_index = LineIndex.load(saved_path)
+        self.assertListEqual(list(saved_index.offsets), list(index.offsets))
+        self.assertEqual(saved_index.newline_counts, index.newline_counts)
+        with open(file_path, "wb") as f:
+            f.write(b"Line 1\nLine 2\nLine 3")
+        index = LineIndex.load_or_build(file_path, index_dir)
+        self.assertEqual(index.num_lines, 3)
+
+    def test_load_or_build_cache(self):
+        cache_dir = OUTPUTS_DIR / "line_index_cache"
+        if os.path.exists(cache_dir):
+            shutil.rmtree(cache_dir)
+        self.addCleanup(shutil.rmtree, cache_dir)
+        file_path = OUTPUTS_DIR / "test_line_index.txt"
+        with open(file_path, "wb") as f:
+            f.write(b"Line 1\nLine 2\n")
+        cache = ResultCache(cache_dir)
+        index = LineIndex.load_or_build(file_path, cache=cache)
+        self.assertEqual(index.num_lines, 2)
+        self.assertEqual(len(os.listdir(cache.line_index_dir)), 1)
+
+
+# --- Test Classes for Transform Registry Functions ---
+
+class TestTransformRegistry(unittest.TestCase):
+    def tearDown(self):
+        for name in ("test-suffix", "test-drop"):
+            if name in [t.name for t in get_transforms()]:
+                unregister_transform(name)
+
+    def test_builtin_order(self):
+        names = [t.name for t in get_transforms()]
+        self.assertListEqual(names, [_TRIM, _TAB, _REGEX_REPLACE,
+                                     _LETTER_CASE, _BLANK_LINES, _NEWLINE])
+
+    def test_register_duplicate(self):
+        try:
+            register_transform(Transform(
+                name=_TRIM, config_key=("x",), order=1,
+                kind=StageKind.PER_LINE, parse=str, dump=str, build=str,
+            ))
+        except ValueError:
+            pass
+        except Exception:
+            self.fail("Unexpected exception raised")
+        else:
+            self.fail("ValueError not raised")
+
+    def test_custom_transforms(self):
+        register_transform(Transform(
+            name="test-suffix", config_key=("custom", "suffix"), order=15,
+            kind=StageKind.PER_LINE, parse=str, dump=str,
+            build=lambda suffix: lambda line: line + suffix,
+        ))
+        register_transform(Transform(
+            name="test-drop", config_key=("custom", "drop"), order=35,
+            kind=StageKind.STATEFUL, parse=str, dump=str,
+            build=lambda text: lambda: lambda line: (
+                None if line == text else line),
+        ))
+        config = TextFormatterConfig.from_dict({
+            _LETTER_CASE: "upper",
+            _WHITESPACE: {_TRIM: "all", _BLANK_LINES: "remove"},
+            "custom": {"suffix": ";", "drop": "B;"},
+        })
+        self.assertEqual(config.options, {"test-suffix": ";",
+                                          "test-drop": "B;"})
+        self.assertEqual(config.to_dict()["custom"],
+                         {"suffix": ";", "drop": "B;"})
+        pipeline = compile_pipeline(config)
+        self.assertListEqual([stage.kind for stage in pipeline.stages],
+                             [StageKind.PER_LINE, StageKind.WHOLE_BUFFER,
+                              StageKind.PER_LINE])
+        self.assertListEqual(
+            [t.name for t in pipeline.stages[2].transforms],
+            ["test-drop", _BLANK_LINES])
+        lines = [" a ", "b", "", "c"]
+        self.assertListEqual(pipeline.run_aligned(lines),
+                             ["A;", None, ";", "C;"])
+
+    def test_fused_stages_after_removal(self):
+        config = TextFormatterConfig(
+            blank_line_type=BlankLineType.COLLAPSE,
+            options={_REGEX_REPLACE: (("a", "b"),)},
+        )
+        register_transform(Transform(
+            name="test-suffix", config_key=("custom", "suffix"), order=50,
+            kind=StageKind.PER_LINE, parse=str, dump=str,
+            build=lambda suffix: lambda line: line + suffix,
+        ))
+        config.options["test-suffix"] = "!"
+        lines = ["a", "", "", "a"]
+        self.assertListEqual(compile_pipeline(config).run_aligned(lines),
+                             ["b!", "!", None, "b!"])
+
+    def test_invalid_tab_values(self):
+        for tab_type, num_spaces in [(TabType.TAB_TO_SPACES, -1),
+                                     (TabType.SPACES_TO_TAB, 0),
+                                     (TabType.EXPAND, -1),
+                                     (TabType.UNEXPAND, 0)]:
+            with self.subTest(tab_type=tab_type):
+                config = TextFormatterConfig(
+                    tab_type=(tab_type, num_spaces))
+                # The value is checked once, when the pipeline is built.
+                with self.assertRaisesRegex(ValueError, r"\(-?\d\)"):
+                    compile_pipeline(config)
+        config = TextFormatterConfig(tab_type=(TabType.UNEXPAND, 4),
+                                     trim_type=TrimType.TRAILING)
+        self.assertListEqual(
+            compile_pipeline(config).run_aligned(["        a  ", "  b"]),
+            ["\t\ta", "  b"])
+
+    def test_unregistered_option(self):
+        config = TextFormatterConfig(options={"test-missing": "x"})
+        with self.assertRaisesRegex(ValueError, "test-missing"):
+            compile_pipeline(config)
+        with self.assertRaises(ValueError):
+            format_file_data(b"a", config)
+
+
+class TestRegexReplace(unittest.TestCase):
+    def test_from_dict(self):
+        config = TextFormatterConfig.from_dict({
+            _REGEX_REPLACE: [["foo", "bar"], [r"\s+$", ""]],
+        })
+        self.assertEqual(config.options[_REGEX_REPLACE],
+                         (("foo", "bar"), (r"\s+$", "")))
+        self.assertListEqual(format_lines(["foo  ", "a foo"], config),
+                             ["bar", "a bar"])
+
+    def test_invalid_pattern(self):
+        config = TextFormatterConfig.from_dict({
+            _REGEX_REPLACE: [["(", "x"]],
+        })
+        self.assertFalse(_REGEX_REPLACE in config.options)
+
+
 # --- Test Classes for Document Formatting Functions ---
 
 class TestProcessFile(unittest.TestCase):
@@ -156,6 +440,235 @@ class TestProcessFile(unittest.TestCase):
                 "int\nsome_function(void) {\n    int i = 1;\n    i += 10;\n    return i;\n}")
         self.assertTrue(os.path.exists(backup_file_path))
 
+    def test_process_unchanged_file(self):
+        file_path = OUTPUTS_DIR / "test_process_unchanged_file.txt"
+        backup_file_path = OUTPUTS_DIR / "test_process_unchanged_file.txt.bak"
+        _delete_file(backup_file_path)
+        with open(file_path, "w", newline="") as f:
+            f.write("Line 1\nLine 2")
+        config = TextFormatterConfig(trim_type=TrimType.ALL)
+        self.assertFalse(process_file(file_path, config))
+        self.assertFalse(os.path.exists(backup_file_path))
+
+    def test_process_file_backup_dir(self):
+        store_dir = OUTPUTS_DIR / "process_file_backup_store"
+        if os.path.exists(store_dir):
+            shutil.rmtree(store_dir)
+        file_path = OUTPUTS_DIR / "test_process_file_backup_dir.txt"
+        backup_file_path = OUTPUTS_DIR / "test_process_file_backup_dir.txt.bak"
+        _delete_file(backup_file_path)
+        with open(file_path, "w", newline="") as f:
+            f.write("Line 1  \nLine 2")
+        config = TextFormatterConfig(backup_dir=str(store_dir),
+                                     trim_type=TrimType.ALL)
+        store = BackupStore(store_dir)
+        run = store.start_run()
+        self.assertTrue(process_file(file_path, config, run))
+        self.assertFalse(os.path.exists(backup_file_path))
+        self.assertEqual(_read_file_content(file_path), "Line 1\nLine 2")
+        store.restore_run(run.run_id)
+        self.assertEqual(_read_file_content(file_path, NewlineType.LF),
+                         "Line 1  \nLine 2")
+        with self.assertRaises(ValueError):
+            process_file(file_path, config)
+        config.backup_file = False
+        run = store.start_run()
+        self.assertTrue(process_file(file_path, config, run))
+        self.assertFalse(run.has_backups())
+
+    def test_process_file_encoding_errors(self):
+        file_path = OUTPUTS_DIR / "test_process_file_encoding.txt"
+        self.addCleanup(_delete_file, file_path)
+        config = TextFormatterConfig(case_type=CaseType.UPPER)
+        # GBK is not UTF-8, so it is not taken as another encoding.
+        data = "\u4f60\u597d world".encode("gbk")
+        with open(file_path, "wb") as f:
+            f.write(data)
+        with self.assertRaisesRegex(UnicodeDecodeError,
+                                    "byte offset 0 of .*encoding"):
+            process_file(file_path, config)
+        with open(file_path, "rb") as f:
+            self.assertEqual(f.read(), data)
+        # The upper case of "\u00b5" and "\u00ff" is not in Latin-1.
+        data = "\u00b5m \u00ff".encode("latin-1")
+        with open(file_path, "wb") as f:
+            f.write(data)
+        config.encoding = "latin-1"
+        with self.assertRaisesRegex(UnicodeEncodeError,
+                                    "character offset 0 of .*encoding"):
+            process_file(file_path, config)
+        with open(file_path, "rb") as f:
+            self.assertEqual(f.read(), data)
+
+
+class TestFormatFileData(unittest.TestCase):
+    def test_keep_encoding_and_bom(self):
+        config = TextFormatterConfig(trim_type=TrimType.TRAILING)
+        cases = [
+            ("utf-8", codecs.BOM_UTF8),
+            ("utf-16-le", codecs.BOM_UTF16_LE),
+            ("utf-16-be", codecs.BOM_UTF16_BE),
+            ("utf-32-le", codecs.BOM_UTF32_LE),
+        ]
+        for encoding, bom in cases:
+            for prefix in (b"", bom):
+                with self.subTest(encoding=encoding, bom=prefix):
+                    data = prefix + "Caf\u00e9  \nb".encode(encoding)
+                    self.assertEqual(format_file_data(data, config),
+                                     prefix + "Caf\u00e9\nb".encode(encoding))
+
+    def test_latin1(self):
+        config = TextFormatterConfig(case_type=CaseType.UPPER)
+        with self.assertRaisesRegex(UnicodeDecodeError, "byte offset 3"):
+            format_file_data(b"caf\xe9", config)
+        data = b"x" * 100000 + b"caf\xe9"
+        with self.assertRaisesRegex(UnicodeDecodeError,
+                                    "byte offset 100003"):
+            format_file_data(data, config)
+        config = TextFormatterConfig(encoding="latin-1",
+                                     case_type=CaseType.UPPER)
+        self.assertEqual(format_file_data(data, config),
+                         b"X" * 100000 + b"CAF\xc9")
+
+    def test_large_contents(self):
+        # Multi-byte characters cross the boundaries of the chunks.
+        config = TextFormatterConfig(case_type=CaseType.UPPER)
+        for encoding in ("utf-8", "utf-16-le"):
+            with self.subTest(encoding=encoding):
+                data = "caf\u00e9\n".encode(encoding) * 300001
+                text = "\n".join(["CAF\u00c9"] * 300001)
+                self.assertEqual(format_file_data(data, config),
+                                 text.encode(encoding))
+
+    def test_explicit_encoding(self):
+        config = TextFormatterConfig(encoding="cp1252",
+                                     case_type=CaseType.UPPER)
+        self.assertEqual(format_file_data(b"\x80 a", config), b"\x80 A")
+        config = TextFormatterConfig(encoding="ascii")
+        with self.assertRaises(ValueError):
+            format_file_data(b"caf\xc3\xa9", config)
+
+
+class TestWriteFileData(unittest.TestCase):
+    def setUp(self):
+        self.file_path = OUTPUTS_DIR / "write_file_data.txt"
+        self.addCleanup(_delete_file, self.file_path)
+
+    def _write(self, data: bytes, new_data: bytes,
+               write_mode: WriteMode) -> bool:
+        with open(self.file_path, "wb") as f:
+            f.write(data)
+        os.chmod(self.file_path, 0o640)
+        inode = os.stat(self.file_path).st_ino
+        write_file_data(self.file_path, data, new_data, write_mode)
+        with open(self.file_path, "rb") as f:
+            self.assertEqual(f.read(), new_data)
+        self.assertEqual(os.stat(self.file_path).st_mode & 0o777, 0o640)
+        return os.stat(self.file_path).st_ino == inode
+
+    def test_in_place_tail(self):
+        data = b"Line\n" * 100000 + b"\n\n\n"
+        self.assertTrue(self._write(data, data[:-2], WriteMode.IN_PLACE))
+        self.assertTrue(self._write(data, data + b"More",
+                                    WriteMode.IN_PLACE))
+
+    def test_in_place_same_length(self):
+        data = b"a  b\n" * 100000
+        new_data = bytearray(data)
+        new_data[7] = ord("B")
+        new_data[-3] = ord("B")
+        self.assertTrue(self._write(data, bytes(new_data),
+                                    WriteMode.IN_PLACE))
+
+    def test_in_place_early_change(self):
+        data = b"Line  \n" * 1000
+        self.assertFalse(self._write(data, data.replace(b"  ", b""),
+                                     WriteMode.IN_PLACE))
+
+    def test_atomic(self):
+        self.assertFalse(self._write(b"a ", b"a", WriteMode.ATOMIC))
+        self.assertFalse(any(name.startswith(".tmp-")
+                             for name in os.listdir(OUTPUTS_DIR)))
+
+    def test_rewrite(self):
+        self.assertTrue(self._write(b"a ", b"a", None))
+
+    def test_config(self):
+        config = TextFormatterConfig.from_dict({_WRITE_MODE: "in-place"})
+        self.assertEqual(config.write_mode, WriteMode.IN_PLACE)
+        self.assertEqual(config.to_dict().get(_WRITE_MODE), "in-place")
+
+
+class TestDetectEncoding(unittest.TestCase):
+    def test_bom(self):
+        self.assertEqual(detect_encoding(codecs.BOM_UTF8 + b"a"),
+                         ("utf-8", codecs.BOM_UTF8))
+        self.assertEqual(detect_encoding(codecs.BOM_UTF16_BE + b"\0a"),
+                         ("utf-16-be", codecs.BOM_UTF16_BE))
+        self.assertEqual(
+            detect_encoding(codecs.BOM_UTF32_LE + b"a\0\0\0"),
+            ("utf-32-le", codecs.BOM_UTF32_LE))
+
+    def test_sample(self):
+        self.assertEqual(detect_encoding(b"abc"), ("utf-8", b""))
+        self.assertEqual(detect_encoding("caf\u00e9".encode()),
+                         ("utf-8", b""))
+        with self.assertRaisesRegex(UnicodeDecodeError, "byte offset 3"):
+            detect_encoding(b"caf\xe9")
+        with self.assertRaises(UnicodeDecodeError):
+            detect_encoding("\u4f60\u597d".encode("gbk"))
+        self.assertEqual(detect_encoding("abc".encode("utf-16-le")),
+                         ("utf-16-le", b""))
+        self.assertEqual(detect_encoding("abc".encode("utf-16-be")),
+                         ("utf-16-be", b""))
+
+    def test_explicit_encoding(self):
+        self.assertEqual(detect_encoding(b"abc", "utf-8-sig"),
+                         ("utf-8", codecs.BOM_UTF8))
+        self.assertEqual(detect_encoding(codecs.BOM_UTF8 + b"a", "UTF8"),
+                         ("utf-8", codecs.BOM_UTF8))
+        self.assertEqual(detect_encoding(b"a\0", "utf-16"),
+                         ("utf-16-le", b""))
+        self.assertEqual(detect_encoding(codecs.BOM_UTF16_BE, "utf-16"),
+                         ("utf-16-be", codecs.BOM_UTF16_BE))
+        self.assertEqual(detect_encoding(b"\xe9", "latin1"),
+                         ("iso8859-1", b""))
+
+    def test_decode_encode(self):
+        data = codecs.BOM_UTF16_LE + "Line 1\n".encode("utf-16-le")
+        text, encoding, bom = decode_file_data(data)
+        self.assertEqual(text, "Line 1\n")
+        self.assertEqual(encode_file_text(text, encoding, bom), data)
+
+
+class TestFormatLines(unittest.TestCase):
+    def test_format_lines(self):
+        config = TextFormatterConfig(
+            blank_line_type=BlankLineType.COLLAPSE,
+            case_type=CaseType.UPPER,
+            trim_type=TrimType.ALL,
+        )
+        lines = ["  Line 1 ", "", " ", "", "line 5"]
+        self.assertListEqual(format_lines(lines, config),
+                             ["LINE 1", "", "LINE 5"])
+
+
+class TestAlignFormattedLines(unittest.TestCase):
+    def test_remove(self):
+        config = TextFormatterConfig(
+            blank_line_type=BlankLineType.REMOVE,
+            trim_type=TrimType.TRAILING,
+        )
+        lines = ["Line 1 ", "", "\t", "Line 4"]
+        self.assertListEqual(align_formatted_lines(lines, config),
+                             ["Line 1", None, None, "Line 4"])
+
+    def test_collapse(self):
+        config = TextFormatterConfig(blank_line_type=BlankLineType.COLLAPSE)
+        lines = ["", "", "Line 3", "", "", ""]
+        self.assertListEqual(align_formatted_lines(lines, config),
+                             ["", None, "Line 3", "", None, None])
+
 
 class TestSplitTextToLines(unittest.TestCase):
     def test_standard_text(self):
@@ -278,6 +791,35 @@ class TestReadLinesFromFile(unittest.TestCase):
         self.assertEqual(len(lines), 5)
         self.assertTrue(lines[3].endswith("accumsan et."))
 
+    def test_read_encoded_file(self):
+        file_path = OUTPUTS_DIR / "read_file_encoded.txt"
+        self.addCleanup(_delete_file, file_path)
+        for data in [codecs.BOM_UTF8 + "Caf\u00e9\r\nb".encode(),
+                     codecs.BOM_UTF16_BE + "Caf\u00e9\r\nb".encode(
+                         "utf-16-be"),
+                     "x\u00e9\n".encode() * 800000
+                     + "Caf\u00e9\r\nb".encode()]:
+            with open(file_path, "wb") as f:
+                f.write(data)
+            lines = read_lines_from_file(file_path)
+            self.assertEqual(lines[-2:], ["Caf\u00e9", "b"])
+
+    def test_read_invalid_encoding(self):
+        file_path = OUTPUTS_DIR / "read_file_invalid.txt"
+        self.addCleanup(_delete_file, file_path)
+        with open(file_path, "wb") as f:
+            f.write(b"caf\xe9")
+        with self.assertRaises(ValueError):
+            read_lines_from_file(file_path, "utf-8")
+        # The sample looks like UTF-8, so the error is only found later.
+        with open(file_path, "wb") as f:
+            f.write(b"x\n" * 100000 + b"caf\xe9")
+        with self.assertRaisesRegex(UnicodeDecodeError,
+                                    "at byte offset 200003 of "):
+            read_lines_from_file(file_path)
+        self.assertEqual(read_lines_from_file(file_path, "latin-1")[-1],
+                         "caf\u00e9")
+
 
 class TestWriteLinesToFile(unittest.TestCase):
     def test_write_linux_file(self):
@@ -487,6 +1029,49 @@ class TestReplaceTabWithSpaces(unittest.TestCase):
         else:
             self.fail("ValueError not raised")
 
+    def test_negative_number_message(self):
+        with self.assertRaisesRegex(ValueError, "non-negative"):
+            replace_tab_with_spaces("\tAn example", -1)
+
+
+class TestExpandTabs(unittest.TestCase):
+    def test_tab_stops(self):
+        line = "\tab\tc \td"
+        new_line = expand_tabs(line, 4)
+        self.assertEqual(new_line, "    ab  c   d")
+
+    def test_negative_number(self):
+        with self.assertRaises(ValueError):
+            expand_tabs("\tAn example", -1)
+
+
+class TestUnexpandIndentation(unittest.TestCase):
+    def test_indentation(self):
+        line = "  \t      x = \"a    b\"  "
+        new_line = unexpand_indentation(line, 4)
+        self.assertEqual(new_line, "\t\t  x = \"a    b\"  ")
+
+    def test_no_indentation(self):
+        line = "x    = 1"
+        self.assertIs(unexpand_indentation(line, 4), line)
+
+    def test_blank_line(self):
+        line = "         "
+        new_line = unexpand_indentation(line, 4)
+        self.assertEqual(new_line, "\t\t ")
+
+    def test_transform(self):
+        config = TextFormatterConfig(tab_type=(TabType.UNEXPAND, 4))
+        lines = format_lines(["        a\tb", "\t  c"], config)
+        self.assertListEqual(lines, ["\t\ta\tb", "\t  c"])
+        config = TextFormatterConfig(tab_type=(TabType.EXPAND, 4))
+        lines = format_lines(["  \ta\tb"], config)
+        self.assertListEqual(lines, ["    a   b"])
+
+    def test_zero_number(self):
+        with self.assertRaises(ValueError):
+            unexpand_indentation("    An example", 0)
+
 
 class TestTrimLine(unittest.TestCase):
     def test_default(self):
@@ -538,6 +1123,46 @@ class TestConvertCase(unittest.TestCase):
         new_line = convert_case(line, CaseType.UPPER)
         self.assertEqual(new_line, "")
 
+    def test_titlecase(self):
+        line = "hello WORLD, don't panic 1st"
+        new_line = convert_case(line, CaseType.TITLE)
+        self.assertEqual(new_line, "Hello World, Don't Panic 1St")
+
+    def test_titlecase_unicode(self):
+        line = "\u00e9cole stra\u00dfe l\u2019\u00e9t\u00e9"
+        new_line = convert_case(line, CaseType.TITLE)
+        self.assertEqual(new_line,
+                         "\u00c9cole Stra\u00dfe L\u2019\u00e9t\u00e9")
+
+    def test_uppercase_special(self):
+        line = "stra\u00dfe"
+        new_line = convert_case(line, CaseType.UPPER)
+        self.assertEqual(new_line, "STRASSE")
+
+    def test_casefold(self):
+        self.assertEqual(convert_case("Hello", CaseType.CASEFOLD), "hello")
+        self.assertEqual(convert_case("Stra\u00dfe", CaseType.CASEFOLD),
+                         "strasse")
+
+
+class TestConvertCaseLines(unittest.TestCase):
+    def test_default(self):
+        lines = ["Hello", "World"]
+        self.assertListEqual(convert_case_lines(lines), lines)
+
+    def test_titlecase(self):
+        lines = ["hello world", "", "it's", "\u00e9t\u00e9"]
+        self.assertListEqual(convert_case_lines(lines, CaseType.TITLE),
+                             ["Hello World", "", "It's", "\u00c9t\u00e9"])
+
+    def test_uppercase(self):
+        lines = ["a", "b"]
+        self.assertListEqual(convert_case_lines(lines, CaseType.UPPER),
+                             ["A", "B"])
+
+    def test_empty_list(self):
+        self.assertListEqual(convert_case_lines([], CaseType.LOWER), [])
+
 
 # --- Helper Functions ---
 
@@ -0,0 +1,141 @@
+# --- Imports ---
+import difflib
+import os
+import shutil
+import unittest
+
+from pathlib import Path
+
+import textformatter
+from textformatter import unifieddiff
+from textformatter.textformatter import (
+    # Classes
+    BlankLineType,
+    CaseType,
+    NewlineType,
+    TabType,
+    TrimType,
+    TextFormatterConfig,
+)
+from textformatter.unifieddiff import (
+    # Unified diff functions
+    diff_file,
+    unified_diff_aligned,
+)
+
+
+# --- Constants ---
+TESTS_DIR: Path = Path(__file__).parent
+DATA_DIR: Path = TESTS_DIR / "data"
+OUTPUTS_DIR: Path = TESTS_DIR / "outputs"
+
+
+# --- Test Classes for Unified Diff Functions ---
+
+class TestUnifiedDiffAligned(unittest.TestCase):
+    def test_no_changes(self):
+        lines = ["Line 1", "Line 2"]
+        diff = list(unified_diff_aligned(lines, lines, "a", "b"))
+        self.assertListEqual(diff, [])
+
+    def test_matches_difflib_for_changed_lines(self):
+        old_lines = [f"Line {i} " for i in range(1, 21)]
+        new_lines = list(old_lines)
+        new_lines[1] = "Line 2"
+        new_lines[2] = "Line 3"
+        new_lines[15] = "Line 16"
+        diff = list(unified_diff_aligned(old_lines, new_lines, "a", "b"))
+        expected = list(difflib.unified_diff(old_lines, new_lines, "a", "b",
+                                             lineterm=""))
+        self.assertListEqual(diff, [f"{line}\n" for line in expected])
+
+    def test_removed_lines(self):
+        old_lines = ["Line 1", "", "", "Line 4", "", "Line 6"]
+        aligned_lines = ["Line 1", "", None, "Line 4", "", "Line 6"]
+        diff = "".join(unified_diff_aligned(old_lines, aligned_lines,
+                                            "a", "b", context=1))
+        self.assertEqual(diff,
+            "--- a\n+++ b\n@@ -2,3 +2,2 @@\n \n-\n Line 4\n")
+
+    def test_new_line_numbers_after_removal(self):
+        old_lines = ["", "", "", "x", "y", "z", "w", "v", "Tail "]
+        aligned_lines = ["", None, None, "x", "y", "z", "w", "v", "Tail"]
+        diff = "".join(unified_diff_aligned(old_lines, aligned_lines,
+                                            "a", "b", context=0))
+        self.assertEqual(diff,
+            "--- a\n+++ b\n@@ -2,2 +1,0 @@\n-\n-\n"
+            "@@ -9 +7 @@\n-Tail \n+Tail\n")
+
+    def test_mismatched_lengths(self):
+        try:
+            list(unified_diff_aligned(["a", "b"], ["a"], "a", "b"))
+        except ValueError:
+            pass
+        except Exception:
+            self.fail("Unexpected exception raised")
+        else:
+            self.fail("ValueError not raised")
+
+
+class TestDiffFile(unittest.TestCase):
+    def test_diff_file(self):
+        file_path = OUTPUTS_DIR / "test_diff_file.txt"
+        shutil.copy(DATA_DIR / "test_process_file1.txt", file_path)
+        original_content = _read_file_bytes(file_path)
+        config = TextFormatterConfig(
+            backup_file=False,
+            newline_type=NewlineType.LF,
+            tab_type=(TabType.TAB_TO_SPACES, 4),
+            trim_type=TrimType.TRAILING,
+        )
+        diff = diff_file(file_path, config)
+        self.assertEqual(_read_file_bytes(file_path), original_content)
+        self.assertTrue(diff.startswith(
+            f"Line endings of {file_path}: \\r\\n -> \\n\n"
+            f"--- {file_path}\n"))
+        self.assertTrue("-some_function(void) {  \n" in diff)
+        self.assertTrue("+some_function(void) {\n" in diff)
+        self.assertTrue("+    int i = 1;\n" in diff)
+        self.assertTrue(" int\n" in diff)
+        self.assertFalse(os.path.exists(f"{file_path}.bak"))
+
+    def test_diff_file_single_line_output(self):
+        file_path = OUTPUTS_DIR / "test_diff_file_single_line.txt"
+        with open(file_path, "w") as f:
+            f.write("Line 1\nLine 2\n")
+        config = TextFormatterConfig(newline_type=NewlineType.SPACE)
+        diff = diff_file(file_path, config)
+        self.assertTrue(diff.endswith(
+            "@@ -1,2 +1 @@\n-Line 1\n-Line 2\n+Line 1 Line 2\n"
+            "\\ No newline at end of file\n"))
+
+    def test_diff_file_newlines(self):
+        file_path = OUTPUTS_DIR / "test_diff_file_newlines.txt"
+        self.addCleanup(os.remove, file_path)
+        cases = [
+            (b"Line 1\n", TextFormatterConfig(),
+             "@@ -1 +1 @@\n-Line 1\n+Line 1\n"
+             "\\ No newline at end of file\n"),
+            (b"Line 1 \nLine 2", TextFormatterConfig(trim_type=TrimType.ALL),
+             "@@ -1,2 +1,2 @@\n-Line 1 \n+Line 1\n Line 2\n"
+             "\\ No newline at end of file\n"),
+            (b"Line 1\n\n", TextFormatterConfig(),
+             "@@ -1,2 +1 @@\n Line 1\n-\n"),
+            (b"Line 1\r\nLine 2", TextFormatterConfig(),
+             f"Line endings of {file_path}: \\r\\n -> \\n\n"),
+            (b"Line 1\nLine 2", TextFormatterConfig(), ""),
+        ]
+        for data, config, expected in cases:
+            with self.subTest(data=data):
+                with open(file_path, "wb") as f:
+                    f.write(data)
+                diff = diff_file(file_path, config)
+                self.assertEqual(diff.replace(
+                    f"--- {file_path}\n+++ {file_path}\n", ""), expected)
+
+
+# --- Helper Functions ---
+
+def _read_file_bytes(file_path: str) -> bytes:
+    with open(file_path, "rb") as f:
+        return f.read()
@@ -0,0 +1,151 @@
+# --- Imports ---
+import asyncio
+import multiprocessing
+import os
+import time
+
+from collections.abc import Sequence
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+
+import textformatter
+from textformatter import textformatter
+from textformatter.backupstore import BackupRun
+from textformatter.scheduler import FileResult
+from textformatter.textformatter import (
+    TextFormatterConfig,
+    format_file_data,
+    write_formatted_file,
+)
+
+
+# --- Private Constants ---
+_DEFAULT_CONCURRENCY = 8
+# Forking a process with a running event loop and executor threads can
+# deadlock the child, so worker processes start from a clean server
+# process, or from scratch where there is none.
+_START_METHODS = ("forkserver", "spawn")
+
+
+# --- Public Async Formatting Functions ---
+
+async def process_files(paths: Sequence[str], config: TextFormatterConfig,
+                        *, concurrency: int = _DEFAULT_CONCURRENCY,
+                        backup_run: BackupRun = None,
+                        io_executor: Executor = None,
+                        cpu_executor: Executor = None) -> list[FileResult]:
+    """
+    Format text files in place without blocking the event loop.
+
+    Up to "concurrency" files are read and formatted at the same time,
+    and up to as many formatted files are written. A formatted file
+    waits for a write slot before it gives up its read slot, so writing
+    the finished files overlaps with reading and formatting the next
+    ones, and at most twice "concurrency" files are held in memory.
+    Reads and writes run on a thread pool and the formatting runs in a
+    bounded CPU executor. A slow file only holds its own slots.
+
+    Parameters:
+    paths (Sequence[str]): The files to format.
+    config (TextFormatterConfig): The text-formatter configuration object.
+    concurrency (int): The maximum number of files being read and
+        formatted, and of files being written. Default value is 8.
+    backup_run (BackupRun): The backup run to record the original
+        contents in, which all the files share. It is required if the
+        backups go to a configured backup directory. Default value is
+        None.
+    io_executor (Executor): The executor for file reads and writes.
+        Default value is None, which means a thread pool with one thread
+        per read and write slot.
+    cpu_executor (Executor): The executor for formatting. Default value
+        is None, which means a process pool with up to one process per
+        CPU, started without forking the calling process. Its processes
+        only have the transforms registered on import, so plugin
+        transforms need an executor whose initializer imports them.
+        Otherwise the files using them fail with a ValueError.
+
+    Returns:
+    list[FileResult]: The result of each file, in the order of paths.
+        The value of a result is True if the file was changed.
+    """
+    if concurrency < 1:
+        raise ValueError("The concurrency must be a positive integer:"
+                         f" ({concurrency}).")
+    if config.backup_file and config.backup_dir and backup_run is None:
+        raise ValueError("A backup run is required to back up to the"
+                         f" backup directory: ({config.backup_dir}).")
+    owned_executors = []
+    if io_executor is None:
+        io_executor = ThreadPoolExecutor(max_workers=2 * concurrency)
+        owned_executors.append(io_executor)
+    if cpu_executor is None:
+        start_method = next(method for method in _START_METHODS if method
+                            in multiprocessing.get_all_start_methods())
+        cpu_executor = ProcessPoolExecutor(
+            max_workers=min(concurrency, os.cpu_count() or 1),
+            mp_context=multiprocessing.get_context(start_method))
+        owned_executors.append(cpu_executor)
+    semaphore = asyncio.Semaphore(concurrency)
+    write_semaphore = asyncio.Semaphore(concurrency)
+    try:
+        return await asyncio.gather(*(
+            _process_file(str(path), config, backup_run, semaphore,
+                          write_semaphore, io_executor, cpu_executor)
+            for path in paths
+        ))
+    finally:
+        for executor in owned_executors:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# --- Private Helper Functions ---
+
+async def _process_file(file_path: str, config: TextFormatterConfig,
+                        backup_run: BackupRun | None,
+                        semaphore: asyncio.Semaphore,
+                        write_semaphore: asyncio.Semaphore,
+                        io_executor: Executor,
+                        cpu_executor: Executor) -> FileResult:
+    loop = asyncio.get_running_loop()
+    start_time = time.perf_counter()
+    size = 0
+    try:
+        await semaphore.acquire()
+        try:
+            start_time = time.perf_counter()
+            data = await loop.run_in_executor(io_executor, _read_file,
+                                              file_path)
+            size = len(data)
+            new_data = await loop.run_in_executor(cpu_executor,
+                                                  format_file_data, data,
+                                                  config)
+            if new_data is not None:
+                # The write slot is taken before the read slot is given
+                # up, so a file holds one of them from its read to its
+                # write, and formatted contents cannot pile up in memory
+                # while the writes fall behind.
+                await write_semaphore.acquire()
+        finally:
+            semaphore.release()
+        if new_data is not None:
+            try:
+                await loop.run_in_executor(io_executor, write_formatted_file,
+                                           file_path, data, new_data, config,
+                                           backup_run)
+            finally:
+                write_semaphore.release()
+    except Exception as e:
+        return FileResult(file_path, size, error=e,
+                          seconds=time.perf_counter() - start_time)
+    return FileResult(file_path, size, new_data is not None,
+                      seconds=time.perf_counter() - start_time)
+
+
+def _read_file(file_path: str) -> bytes:
+    if not os.path.exists(file_path):
+        raise ValueError("Input file does not exist.")
+    with open(file_path, "rb") as f:
+        return f.read()
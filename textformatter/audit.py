@@ -0,0 +1,258 @@
+# --- Imports ---
+import re
+
+from collections import Counter
+from collections.abc import Iterable, Iterator
+
+import textformatter
+from textformatter import textformatter
+from textformatter.textformatter import (
+    NewlineType,
+    TrimType,
+    iter_file_text,
+    split_indentation,
+    trim_line,
+)
+
+
+# --- Private Constants ---
+# A line with its newline characters, split like universal newlines.
+_NEWLINE_PATTERN = re.compile(r"\r\n?|\n")
+_NEWLINE_TYPES = (NewlineType.LF, NewlineType.CRLF, NewlineType.CR)
+
+
+# --- Classes ---
+
+class FileAudit:
+    """
+    Whitespace statistics of a single file.
+    """
+
+    def __init__(self, file_path: str) -> None:
+        self.file_path = str(file_path)
+        self.encoding = None
+        self.has_bom = False
+        self.newline_counts = dict.fromkeys(_NEWLINE_TYPES, 0)
+        self.num_lines = 0
+        self.trailing_whitespace_lines = 0
+        self.tab_indented_lines = 0
+        self.space_indented_lines = 0
+        self.mixed_indented_lines = 0
+        self.longest_line = 0
+        self.longest_line_number = 0
+        self.blank_line_runs = 0
+        self.longest_blank_run = 0
+
+    @property
+    def newline_types(self) -> list[NewlineType]:
+        return [t for t in _NEWLINE_TYPES if self.newline_counts[t]]
+
+    def format(self) -> str:
+        """
+        Return the statistics as a single line of text.
+
+        Returns:
+        str: The formatted statistics.
+        """
+        encoding = self.encoding + (" with BOM" if self.has_bom else "")
+        newlines = " ".join(f"{t.to_text()}={self.newline_counts[t]}"
+                            for t in self.newline_types) or "none"
+        if len(self.newline_types) > 1:
+            newlines += " (mixed)"
+        return (f"{self.file_path}: {encoding}; newlines {newlines};"
+                f" {self.num_lines} lines;"
+                f" trailing whitespace {self.trailing_whitespace_lines};"
+                f" indent tabs {self.tab_indented_lines}"
+                f" spaces {self.space_indented_lines}"
+                f" mixed {self.mixed_indented_lines};"
+                f" longest line {self.longest_line}"
+                f" (line {self.longest_line_number});"
+                f" blank runs {self.blank_line_runs}"
+                f" (longest {self.longest_blank_run})")
+
+
+class AuditSummary:
+    """
+    Whitespace statistics aggregated over several files. Audits can be
+    added in any order, e.g. as parallel workers complete them.
+    """
+
+    def __init__(self) -> None:
+        self.num_files = 0
+        self.encodings = Counter()
+        self.bom_files = 0
+        self.newline_files = Counter()
+        self.mixed_newline_files = 0
+        self.num_lines = 0
+        self.trailing_whitespace_lines = 0
+        self.tab_indented_lines = 0
+        self.space_indented_lines = 0
+        self.mixed_indented_lines = 0
+        self.longest_line = 0
+        self.longest_line_file = None
+        self.blank_line_runs = 0
+        self.longest_blank_run = 0
+
+    def add(self, file_audit: FileAudit) -> None:
+        """
+        Add the statistics of a file.
+
+        Parameters:
+        file_audit (FileAudit): The statistics of the file.
+
+        Returns:
+        None
+        """
+        self.num_files += 1
+        self.encodings[file_audit.encoding] += 1
+        self.bom_files += file_audit.has_bom
+        newline_types = file_audit.newline_types
+        for newline_type in newline_types:
+            self.newline_files[newline_type] += 1
+        self.mixed_newline_files += len(newline_types) > 1
+        self.num_lines += file_audit.num_lines
+        self.trailing_whitespace_lines += file_audit.trailing_whitespace_lines
+        self.tab_indented_lines += file_audit.tab_indented_lines
+        self.space_indented_lines += file_audit.space_indented_lines
+        self.mixed_indented_lines += file_audit.mixed_indented_lines
+        if file_audit.longest_line > self.longest_line:
+            self.longest_line = file_audit.longest_line
+            self.longest_line_file = file_audit.file_path
+        self.blank_line_runs += file_audit.blank_line_runs
+        self.longest_blank_run = max(self.longest_blank_run,
+                                     file_audit.longest_blank_run)
+
+    def format(self) -> str:
+        """
+        Return the aggregated statistics as text.
+
+        Returns:
+        str: The formatted statistics.
+        """
+        encodings = ", ".join(f"{encoding}={count}" for encoding, count
+                              in sorted(self.encodings.items()))
+        newlines = ", ".join(f"{t.to_text()}={self.newline_files[t]}"
+                             for t in _NEWLINE_TYPES
+                             if self.newline_files[t])
+        return "\n".join([
+            f"Files: {self.num_files}",
+            f"Encodings: {encodings or 'none'} (with BOM: {self.bom_files})",
+            f"Files by newline: {newlines or 'none'}"
+            f" (mixed: {self.mixed_newline_files})",
+            f"Lines: {self.num_lines}",
+            f"Lines with trailing whitespace:"
+            f" {self.trailing_whitespace_lines}",
+            f"Indented lines: tabs {self.tab_indented_lines},"
+            f" spaces {self.space_indented_lines},"
+            f" mixed {self.mixed_indented_lines}",
+            f"Longest line: {self.longest_line}"
+            + (f" ({self.longest_line_file})"
+               if self.longest_line_file else ""),
+            f"Blank line runs: {self.blank_line_runs}"
+            f" (longest {self.longest_blank_run})",
+        ])
+
+
+# --- Public Audit Functions ---
+
+def audit_file(file_path: str, encoding: str = None) -> FileAudit:
+    """
+    Collect the whitespace statistics of a file in a single streaming
+    pass, without modifying it.
+
+    The encoding is detected like for formatting, and reported as
+    "ascii" if every line of a UTF-8 file is ASCII. A decoding error is
+    raised, like for formatting.
+
+    Parameters:
+    file_path (str): The file to audit.
+    encoding (str): The encoding of the file. Default value is None,
+        which means to detect it.
+
+    Returns:
+    FileAudit: The statistics of the file.
+    """
+    detected_encoding, bom, chunks = iter_file_text(file_path, encoding)
+    file_audit = FileAudit(file_path)
+    file_audit.has_bom = bool(bom)
+    newline_counts = file_audit.newline_counts
+    is_ascii = detected_encoding == "utf-8" and not bom
+    blank_run = 0
+    line_number = 0
+    for line in _iter_lines(chunks):
+        line_number += 1
+        newline_type = NewlineType.from_line_ending(line)
+        if newline_type is not None:
+            newline_counts[newline_type] += 1
+            line = line[:-len(newline_type.value)]
+        if is_ascii:
+            is_ascii = line.isascii()
+        if len(line) > file_audit.longest_line:
+            file_audit.longest_line = len(line)
+            file_audit.longest_line_number = line_number
+        if not line:
+            blank_run += 1
+            continue
+        if blank_run:
+            _end_blank_run(file_audit, blank_run)
+            blank_run = 0
+        trimmed_line = trim_line(line, TrimType.TRAILING)
+        if len(trimmed_line) != len(line):
+            file_audit.trailing_whitespace_lines += 1
+        indentation, _ = split_indentation(trimmed_line)
+        if indentation:
+            has_tab = "\t" in indentation
+            has_space = " " in indentation
+            if has_tab and has_space:
+                file_audit.mixed_indented_lines += 1
+            elif has_tab:
+                file_audit.tab_indented_lines += 1
+            elif has_space:
+                file_audit.space_indented_lines += 1
+    if blank_run:
+        _end_blank_run(file_audit, blank_run)
+    file_audit.num_lines = line_number
+    file_audit.encoding = "ascii" if is_ascii else detected_encoding
+    return file_audit
+
+
+# --- Private Helper Functions ---
+
+def _iter_lines(chunks: Iterable[str]) -> Iterator[str]:
+    # The pieces of the unterminated line, which can span many chunks,
+    # are only joined once it ends.
+    parts = []
+    for chunk in chunks:
+        if not chunk:
+            continue
+        start = 0
+        if parts and parts[-1].endswith("\r"):
+            # The CR ended the last chunk, and this chunk may start with
+            # the LF of a CR LF.
+            start = 1 if chunk.startswith("\n") else 0
+            yield "".join(parts) + chunk[:start]
+            parts = []
+        for match in _NEWLINE_PATTERN.finditer(chunk, start):
+            end = match.end()
+            if end == len(chunk) and match.group() == "\r":
+                break
+            if parts:
+                yield "".join(parts) + chunk[start:end]
+                parts = []
+            else:
+                yield chunk[start:end]
+            start = end
+        if start < len(chunk):
+            parts.append(chunk[start:])
+    if parts:
+        yield "".join(parts)
+
+
+def _end_blank_run(file_audit: FileAudit, blank_run: int) -> None:
+    # Only runs that BlankLineType.COLLAPSE would shorten are counted.
+    # Like it, only empty lines are blank, so a whitespace-only line
+    # ends a run.
+    if blank_run > 1:
+        file_audit.blank_line_runs += 1
+    file_audit.longest_blank_run = max(file_audit.longest_blank_run,
+                                       blank_run)
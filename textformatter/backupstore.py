@@ -0,0 +1,176 @@
+# --- Imports ---
+import gzip
+import hashlib
+import json
+import os
+import time
+
+from textformatter.fileutil import write_file_atomic
+
+
+# --- Private Constants ---
+_COMPRESSED_SUFFIX = ".gz"
+_MANIFEST_SUFFIX = ".jsonl"
+_OBJECTS_DIR = "objects"
+_RUNS_DIR = "runs"
+_PATH = "path"
+_SHA256 = "sha256"
+
+
+# --- Classes ---
+
+class BackupStore:
+    """
+    A backup store that keeps file contents keyed by their SHA-256 hash,
+    so identical contents are stored only once. Each run records the
+    files it backed up in a manifest, which can be used to restore them.
+    """
+
+    def __init__(self, root_dir: str, compress: bool = False) -> None:
+        self.root_dir = str(root_dir)
+        self.compress = compress
+
+    def put(self, data: bytes) -> str:
+        """
+        Store the data unless the same contents are already stored.
+
+        Parameters:
+        data (bytes): The file contents to store.
+
+        Returns:
+        str: The SHA-256 hex digest of the data.
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        if self._find_object(digest) is not None:
+            return digest
+        object_path = self._object_path(digest)
+        if self.compress:
+            object_path += _COMPRESSED_SUFFIX
+            data = gzip.compress(data)
+        write_file_atomic(object_path, data)
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        """
+        Return the stored contents with the specified hash.
+
+        Parameters:
+        digest (str): The SHA-256 hex digest of the contents.
+
+        Returns:
+        bytes: The stored contents.
+        """
+        object_path = self._find_object(digest)
+        if object_path is None:
+            raise ValueError(f"Backup object does not exist: ({digest}).")
+        with open(object_path, "rb") as f:
+            data = f.read()
+        if object_path.endswith(_COMPRESSED_SUFFIX):
+            data = gzip.decompress(data)
+        return data
+
+    def start_run(self) -> "BackupRun":
+        """
+        Start a new backup run with a unique run ID.
+
+        Returns:
+        BackupRun: The backup run.
+        """
+        run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.urandom(3).hex()}"
+        return BackupRun(self, run_id)
+
+    def list_runs(self) -> list[str]:
+        """
+        Return the IDs of the recorded runs, oldest first.
+
+        Returns:
+        list[str]: The list of run IDs.
+        """
+        runs_dir = os.path.join(self.root_dir, _RUNS_DIR)
+        if not os.path.isdir(runs_dir):
+            return []
+        return sorted(name.removesuffix(_MANIFEST_SUFFIX)
+                      for name in os.listdir(runs_dir)
+                      if name.endswith(_MANIFEST_SUFFIX))
+
+    def restore_run(self, run_id: str) -> list[str]:
+        """
+        Restore the files backed up by a run to their contents before the
+        run.
+
+        Parameters:
+        run_id (str): The ID of the run to undo.
+
+        Returns:
+        list[str]: The list of restored files.
+        """
+        manifest_path = self._manifest_path(run_id)
+        if not os.path.exists(manifest_path):
+            raise ValueError(f"Backup run does not exist: ({run_id}).")
+        # Only the first entry of a file holds its contents before the run.
+        digests = {}
+        with open(manifest_path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                digests.setdefault(entry[_PATH], entry[_SHA256])
+        for file_path, digest in digests.items():
+            write_file_atomic(file_path, self.get(digest))
+        return list(digests)
+
+    def _find_object(self, digest: str) -> str | None:
+        object_path = self._object_path(digest)
+        for path in (object_path, object_path + _COMPRESSED_SUFFIX):
+            if os.path.exists(path):
+                return path
+        return None
+
+    def _manifest_path(self, run_id: str) -> str:
+        return os.path.join(self.root_dir, _RUNS_DIR,
+                            f"{run_id}{_MANIFEST_SUFFIX}")
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.root_dir, _OBJECTS_DIR, digest[:2], digest)
+
+
+class BackupRun:
+    """
+    A single run of backups into a backup store.
+    """
+
+    def __init__(self, store: BackupStore, run_id: str) -> None:
+        self.store = store
+        self.run_id = run_id
+
+    def backup_file(self, file_path: str, data: bytes) -> str:
+        """
+        Store the contents of a file and record it in the run manifest.
+
+        Parameters:
+        file_path (str): The file being backed up.
+        data (bytes): The contents of the file before formatting.
+
+        Returns:
+        str: The SHA-256 hex digest of the contents.
+        """
+        digest = self.store.put(data)
+        entry = json.dumps({_PATH: os.path.abspath(file_path),
+                            _SHA256: digest})
+        manifest_path = self.store._manifest_path(self.run_id)
+        os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+        # Small appends are atomic, so runs in several processes can share
+        # the same manifest.
+        with open(manifest_path, "a") as f:
+            f.write(f"{entry}\n")
+        return digest
+
+    def has_backups(self) -> bool:
+        """
+        Return whether any file has been backed up by the run, in any
+        process.
+
+        Returns:
+        bool: True if the run has a manifest, False otherwise.
+        """
+        return os.path.exists(self.store._manifest_path(self.run_id))
@@ -0,0 +1,142 @@
+# --- Imports ---
+from collections.abc import Callable, Sequence
+from typing import Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+import textformatter
+from textformatter import textformatter
+from textformatter.textformatter import (
+    CaseType,
+    StageKind,
+    TabType,
+    TextFormatterConfig,
+    Transform,
+    TrimType,
+    compile_transforms,
+    get_enabled_transforms,
+)
+
+
+# --- Private Constants ---
+_LETTER_CASE = "letter-case"
+_TAB = "tab"
+_TRIM = "trim"
+# Removing lines or changing the newline characters has no meaning for a
+# batch of separate values.
+_BATCH_KINDS = (StageKind.PER_LINE, StageKind.WHOLE_BUFFER)
+
+
+# --- Public Batch Formatting Functions ---
+
+def format_batch(values: Sequence[str],
+                 config: TextFormatterConfig) -> Sequence[str]:
+    """
+    Format a batch of separate strings, such as a column of CSV fields,
+    with the line transforms of the configuration and return a batch of
+    the same length.
+
+    Blank-line removal and newline conversion do not apply to a batch.
+    The strings are joined into one buffer for whole-buffer transforms
+    unless any of them contains a newline character. A NumPy array is
+    formatted with the vectorized NumPy string functions where there is
+    one for the transform, and the result is a NumPy array. NumPy
+    converts the case of each character on its own, so case conversion
+    is only vectorized for ASCII arrays.
+
+    Parameters:
+    values (Sequence[str]): The strings to format.
+    config (TextFormatterConfig): The text-formatter configuration object.
+
+    Returns:
+    Sequence[str]: The formatted strings, as a list, or as a NumPy array
+        if the values are one.
+    """
+    transform_values = [(transform, value) for transform, value
+                        in get_enabled_transforms(config)
+                        if transform.kind in _BATCH_KINDS]
+    if np is not None and isinstance(values, np.ndarray):
+        return _format_array(values, transform_values)
+    values = list(values)
+    if not values or not transform_values:
+        return values
+    if not any("\n" in value for value in values):
+        return compile_transforms(transform_values).run(values)
+    # Joining would split the values with newline characters, so every
+    # transform runs on each value instead.
+    for transform, value in transform_values:
+        values = list(map(transform.build(value), values))
+    return values
+
+
+# --- Private Helper Functions ---
+
+def _format_array(array: "np.ndarray",
+                  transform_values: list[Tuple[Transform, object]]
+                  ) -> "np.ndarray":
+    # NumPy 2 has the string functions in np.strings, older versions
+    # only in np.char.
+    strings = getattr(np, "strings", None) or np.char
+    for transform, value in transform_values:
+        function = transform.build(value)
+        vectorized_function = None
+        if transform.name != _LETTER_CASE or _is_ascii(array):
+            vectorized_function = _get_vectorized_function(strings,
+                                                           transform, value)
+        if vectorized_function is not None:
+            array = vectorized_function(array)
+        else:
+            array = _map_array(array, function)
+    return array
+
+
+def _get_vectorized_function(strings: object, transform: Transform,
+                             value: object) -> Callable | None:
+    if transform.name == _TRIM:
+        return {
+            TrimType.LEADING: strings.lstrip,
+            TrimType.TRAILING: strings.rstrip,
+            TrimType.ALL: strings.strip,
+        }.get(value)
+    if transform.name == _TAB:
+        tab_type, num_spaces = value
+        spaces = " " * num_spaces
+        if tab_type == TabType.TAB_TO_SPACES:
+            return lambda array: strings.replace(array, "\t", spaces)
+        if tab_type == TabType.SPACES_TO_TAB:
+            return lambda array: strings.replace(array, spaces, "\t")
+        if tab_type == TabType.EXPAND:
+            return lambda array: strings.expandtabs(array, num_spaces)
+        return None
+    if transform.name == _LETTER_CASE:
+        # Title case fixes letters after apostrophes, and NumPy has no
+        # case folding, so both run on each value. Some non-ASCII
+        # characters, such as "\u00df", change length in upper or lower
+        # case, which NumPy does not do.
+        return {
+            CaseType.LOWER: strings.lower,
+            CaseType.UPPER: strings.upper,
+        }.get(value)
+    return None
+
+
+def _is_ascii(array: "np.ndarray") -> bool:
+    # Other string types have no fixed-width code points to check, so
+    # they are not taken as ASCII.
+    if array.dtype.kind != "U":
+        return False
+    if not array.size:
+        return True
+    return int(np.ascontiguousarray(array).view(np.uint32).max()) < 128
+
+
+def _map_array(array: "np.ndarray", function: Callable) -> "np.ndarray":
+    if not array.size:
+        return array.copy()
+    result = [function(value) for value in array.ravel().tolist()]
+    # Fixed-width strings get a new width that fits the results.
+    dtype = None if array.dtype.kind == "U" else array.dtype
+    return np.array(result, dtype=dtype).reshape(array.shape)
@@ -8,19 +8,22 @@ from textformatter.textformatter import TextFormatterConfig
 
 # --- Public Configuration File Reading/Writing Functions ---
 
-def read_config_file(file_path: str) -> TextFormatterConfig:
+def read_config_file(file_path: str,
+                     strict: bool = False) -> TextFormatterConfig:
     """
     Read a YAML configuration file and return the configuration data.
 
     Parameters:
     file_path (str): The file to read.
+    strict (bool): Whether to raise a ConfigError for unknown keys and
+        invalid values instead of ignoring them. Default value is False.
 
     Returns:
     TextFormatterConfig: The text-formatter configuration object.
     """
     with open(file_path) as f:
         data = yaml.safe_load(f)
-    config_data = TextFormatterConfig.from_dict(data)
+    config_data = TextFormatterConfig.from_dict(data, strict)
     return config_data
 
 
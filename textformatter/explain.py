@@ -0,0 +1,228 @@
+# --- Imports ---
+import codecs
+import json
+import os
+import time
+
+from collections.abc import Sequence
+from typing import Tuple
+
+import textformatter
+from textformatter import textformatter
+from textformatter.resultcache import ResultCache
+from textformatter.textformatter import (
+    CaseType,
+    LineIndex,
+    Pipeline,
+    PipelineStage,
+    StageKind,
+    TextFormatterConfig,
+    Transform,
+    WriteMode,
+    compile_pipeline,
+    detect_file_encoding,
+    encode_file_text,
+    join_lines_to_text,
+    split_text_to_lines,
+)
+
+
+# --- Private Constants ---
+_DEFAULT_OUTPUT = "newline=\\n (default)"
+_LETTER_CASE = "letter-case"
+# The estimate is extrapolated from timing the pipeline on this many
+# bytes from the start of the input files.
+_SAMPLE_SIZE = 1 << 20
+
+
+# --- Public Plan Functions ---
+
+def explain_config(config: TextFormatterConfig,
+                   files: Sequence[str] = (),
+                   cache: ResultCache = None,
+                   count_lines: bool = False) -> str:
+    """
+    Describe how files will be formatted with a configuration: the
+    stages that will run, in order, the engine of each stage, and the
+    number of lines and an estimated cost for the files.
+
+    The cost is estimated by timing each stage on a sample from the
+    start of the files and scaling it to their total size, so it
+    includes the speed of this machine. The sample of each file is
+    decoded with its own encoding and ends on a line boundary.
+
+    The number of lines is estimated from the same sample, unless
+    count_lines is True. Then the lines are counted with the line index
+    of each file, which reads the whole files unless their indexes are
+    saved in the result cache by an earlier run.
+
+    Parameters:
+    config (TextFormatterConfig): The text-formatter configuration object.
+    files (Sequence[str]): The files to format. Default value is none,
+        which means no estimate.
+    cache (ResultCache): The result cache to load and save line indexes
+        in. Default value is None.
+    count_lines (bool): Whether to count the lines of the whole files
+        instead of estimating them. Default value is False.
+
+    Returns:
+    str: The description of the execution plan.
+    """
+    pipeline = compile_pipeline(config)
+    samples = _read_samples(files, config.encoding)
+    is_ascii = all(text.isascii() for text, _, _, _ in samples)
+    result = ["Stages:"]
+    if not pipeline.stages:
+        result.append("  none")
+    for i, stage in enumerate(pipeline.stages, 1):
+        transforms = ", ".join(_format_transform(transform, config)
+                               for transform in stage.transforms)
+        result.append(f"  {i}. {_get_engine(stage, config, is_ascii)}:"
+                      f" {transforms}")
+    output = ", ".join(_format_transform(transform, config)
+                       for transform in pipeline.output_transforms)
+    result.append(f"Output: {output or _DEFAULT_OUTPUT}")
+    result.append(f"Encoding: {config.encoding or 'auto'}")
+    result.append("Write mode:"
+                  f" {(config.write_mode or WriteMode.REWRITE).value}")
+    if config.backup_dir:
+        result.append(f"Backup: store in {config.backup_dir}")
+    elif config.backup_file:
+        result.append("Backup: .bak files")
+    else:
+        result.append("Backup: none")
+    if files and count_lines:
+        result.append(_count_lines(files, config.encoding, cache))
+    if any(size for _, _, _, size in samples):
+        if not count_lines:
+            result.append(_estimate_lines(files, samples))
+        result.extend(_estimate_cost(pipeline, files, samples))
+    return "\n".join(result)
+
+
+# --- Private Helper Functions ---
+
+def _count_lines(files: Sequence[str], encoding: str | None,
+                 cache: ResultCache | None) -> str:
+    num_lines = 0
+    mixed_files = 0
+    skipped_files = 0
+    for file_path in files:
+        detected_encoding, _ = detect_file_encoding(file_path, encoding)
+        # A line index finds the newline bytes, so it only works where
+        # newlines are encoded as in ASCII.
+        if "\r\n".encode(detected_encoding) != b"\r\n":
+            skipped_files += 1
+            continue
+        line_index = LineIndex.load_or_build(file_path, cache=cache)
+        num_lines += line_index.num_lines
+        mixed_files += line_index.is_mixed
+    result = f"Lines: {num_lines:,} (mixed newlines: {mixed_files} file(s))"
+    if skipped_files:
+        result += (f"; not counted: {skipped_files} file(s) in encodings"
+                   " without ASCII newlines")
+    return result
+
+
+def _estimate_cost(pipeline: Pipeline, files: Sequence[str],
+                   samples: list[Tuple[str, str, bytes, int]]) -> list[str]:
+    total_bytes = sum(os.path.getsize(f) for f in files)
+    sample_bytes = sum(size for _, _, _, size in samples)
+    scale = total_bytes / sample_bytes
+    # The first run generates the fused line functions.
+    pipeline.run_aligned(split_text_to_lines(samples[0][0])[:1])
+    timings = [0.0] * len(pipeline.stages)
+    seconds = 0.0
+    # Each sample is a separate document, like each file.
+    for text, encoding, bom, _ in samples:
+        start_time = time.perf_counter()
+        lines = split_text_to_lines(text)
+        has_removed = False
+        for i, stage in enumerate(pipeline.stages):
+            stage_start_time = time.perf_counter()
+            lines = stage.run(lines, has_removed)
+            timings[i] += time.perf_counter() - stage_start_time
+            if stage.may_remove_lines and not has_removed:
+                has_removed = None in lines
+        lines = [line for line in lines if line is not None]
+        encode_file_text(join_lines_to_text(lines), encoding, bom)
+        seconds += time.perf_counter() - start_time
+    result = [f"Estimated cost: {_format_seconds(seconds * scale)} for"
+              f" {len(files)} file(s), {total_bytes:,} bytes"
+              f" (from a sample of {sample_bytes:,} bytes)"]
+    for i, stage_seconds in enumerate(timings, 1):
+        result.append(f"  stage {i}: {_format_seconds(stage_seconds * scale)}")
+    result.append("  split, join and encode:"
+                  f" {_format_seconds((seconds - sum(timings)) * scale)}")
+    return result
+
+
+def _estimate_lines(files: Sequence[str],
+                    samples: list[Tuple[str, str, bytes, int]]) -> str:
+    total_bytes = sum(os.path.getsize(f) for f in files)
+    sample_bytes = sum(size for _, _, _, size in samples)
+    num_lines = sum(len(split_text_to_lines(text))
+                    for text, _, _, _ in samples)
+    if sample_bytes == total_bytes:
+        return f"Lines: {num_lines:,}"
+    num_lines = round(num_lines * total_bytes / sample_bytes)
+    return (f"Lines: about {num_lines:,} (estimated from a sample of"
+            f" {sample_bytes:,} bytes)")
+
+
+def _format_seconds(seconds: float) -> str:
+    if seconds < 1.0:
+        return f"{seconds * 1000:.2f} ms"
+    return f"{seconds:.2f} s"
+
+
+def _format_transform(transform: Transform,
+                      config: TextFormatterConfig) -> str:
+    value = transform.dump(transform.get_value(config))
+    if not isinstance(value, str):
+        value = json.dumps(value)
+    return f"{transform.name}={value}"
+
+
+def _get_engine(stage: PipelineStage, config: TextFormatterConfig,
+                is_ascii: bool) -> str:
+    if stage.kind == StageKind.WHOLE_BUFFER:
+        for transform in stage.transforms:
+            # Title case of ASCII text runs on bytes.
+            if (transform.name == _LETTER_CASE and is_ascii
+                    and transform.get_value(config) == CaseType.TITLE):
+                return "whole-buffer (bytes)"
+        return "whole-buffer"
+    if stage.may_remove_lines:
+        return "per-line (stateful)"
+    return "per-line"
+
+
+def _read_samples(files: Sequence[str],
+                  encoding: str | None) -> list[Tuple[str, str, bytes, int]]:
+    # Read and decode whole lines from the start of each file until the
+    # sample is full. Each sample has its text, encoding, byte order mark
+    # and size in bytes.
+    samples = []
+    remaining = _SAMPLE_SIZE
+    for file_path in files:
+        if remaining <= 0:
+            break
+        detected_encoding, bom = detect_file_encoding(file_path, encoding)
+        with open(file_path, "rb") as f:
+            f.seek(len(bom))
+            data = f.read(remaining)
+            is_complete = len(data) < remaining or not f.read(1)
+        # A partial character at the end of an incomplete sample stays in
+        # the decoder.
+        decoder = codecs.getincrementaldecoder(detected_encoding)()
+        text = decoder.decode(data, is_complete)
+        size = len(bom) + len(data)
+        if not is_complete:
+            end = max(text.rfind("\n"), text.rfind("\r")) + 1
+            if end:
+                text = text[:end]
+                size = len(bom) + len(text.encode(detected_encoding))
+        samples.append((text, detected_encoding, bom, size))
+        remaining -= size
+    return samples
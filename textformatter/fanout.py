@@ -0,0 +1,146 @@
+# --- Imports ---
+import os
+
+from collections.abc import Sequence
+from typing import Tuple
+
+import textformatter
+from textformatter import textformatter
+from textformatter.textformatter import (
+    NewlineType,
+    StageKind,
+    TextFormatterConfig,
+    Transform,
+    compile_transforms,
+    decode_file_data,
+    encode_file_text,
+    get_enabled_transforms,
+    join_lines_to_text,
+    split_text_to_lines,
+)
+
+
+# --- Classes ---
+
+class Variant:
+    """
+    A configuration and the directory its formatted files are written to.
+    """
+
+    def __init__(self, config: TextFormatterConfig, output_dir: str) -> None:
+        self.config = config
+        self.output_dir = str(output_dir)
+
+
+# --- Public Fan-Out Functions ---
+
+def process_file_variants(file_path: str, variants: Sequence[Variant],
+                          base_dir: str = ".") -> list[str]:
+    """
+    Read a file once and write a formatted copy of it for each variant.
+
+    The copy keeps the path of the file relative to the base directory
+    under the output directory of the variant, and the encoding and
+    byte order mark of the file. The input file is not modified, and its
+    encoding is taken from the configuration of the first variant.
+
+    Parameters:
+    file_path (str): The file to format.
+    variants (Sequence[Variant]): The configurations and output
+        directories.
+    base_dir (str): The directory that input paths are relative to.
+        Default value is the current directory.
+
+    Returns:
+    list[str]: The output file of each variant.
+    """
+    if not os.path.exists(file_path):
+        raise ValueError("Input file does not exist.")
+    relative_path = os.path.relpath(os.path.abspath(file_path),
+                                    os.path.abspath(base_dir))
+    if relative_path.startswith(os.pardir):
+        raise ValueError("Input file is not inside the base directory.")
+    encoding = variants[0].config.encoding if variants else None
+    with open(file_path, "rb") as f:
+        text, encoding, bom = decode_file_data(f.read(), encoding)
+    lines = split_text_to_lines(text)
+    configs = [variant.config for variant in variants]
+    output_paths = []
+    for variant, new_lines in zip(variants,
+                                  format_lines_variants(lines, configs)):
+        newline_type = variant.config.newline_type or NewlineType.LF
+        text = join_lines_to_text(new_lines, newline_type)
+        output_path = os.path.join(variant.output_dir, relative_path)
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        with open(output_path, "wb") as f:
+            f.write(encode_file_text(text, encoding, bom))
+        output_paths.append(output_path)
+    return output_paths
+
+
+def format_lines_variants(
+        lines: Sequence[str],
+        configs: Sequence[TextFormatterConfig]) -> list[list[str]]:
+    """
+    Format the same lines of text with several configurations.
+
+    Transforms at the start of the pipelines that have the same values
+    in several configurations run only once, and their result is shared
+    by those configurations.
+
+    Parameters:
+    lines (Sequence[str]): The list of text lines to format.
+    configs (Sequence[TextFormatterConfig]): The configurations.
+
+    Returns:
+    list[list[str]]: The formatted text lines for each configuration.
+    """
+    transform_values = []
+    for config in configs:
+        transform_values.append([
+            (transform, value)
+            for transform, value in get_enabled_transforms(config)
+            if transform.kind != StageKind.OUTPUT
+        ])
+    results = [None] * len(configs)
+    if not configs:
+        return results
+    _format_shared(list(lines), list(range(len(configs))), transform_values,
+                   0, results)
+    return results
+
+
+# --- Private Helper Functions ---
+
+def _format_shared(lines: list[str], indexes: list[int],
+                   transform_values: list[list[Tuple[Transform, object]]],
+                   position: int, results: list) -> None:
+    # Run the prefix shared by every configuration in indexes, then split
+    # the configurations by their next transform and recurse.
+    common = transform_values[indexes[0]][position:]
+    for i in indexes[1:]:
+        remaining = transform_values[i][position:]
+        length = 0
+        while (length < min(len(common), len(remaining))
+               and _transform_key(common[length])
+               == _transform_key(remaining[length])):
+            length += 1
+        common = common[:length]
+    if common:
+        lines = compile_transforms(common).run(lines)
+        position += len(common)
+    groups = {}
+    for i in indexes:
+        if position == len(transform_values[i]):
+            results[i] = list(lines)
+        else:
+            key = _transform_key(transform_values[i][position])
+            groups.setdefault(key, []).append(i)
+    for group_indexes in groups.values():
+        _format_shared(lines, group_indexes, transform_values, position,
+                       results)
+
+
+def _transform_key(transform_value: Tuple[Transform, object]) -> tuple:
+    transform, value = transform_value
+    return (transform.name, repr(transform.dump(value)))
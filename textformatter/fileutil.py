@@ -0,0 +1,61 @@
+# --- Imports ---
+import os
+import shutil
+
+from typing import Tuple
+
+
+# --- Private Constants ---
+_TEMP_PREFIX = ".tmp-"
+# Creating a file with these permissions lets the umask remove the bits
+# it does not allow, like open() does.
+_NEW_FILE_MODE = 0o666
+_TEMP_FLAGS = (os.O_WRONLY | os.O_CREAT | os.O_EXCL
+               | getattr(os, "O_BINARY", 0))
+
+
+# --- Public File Functions ---
+
+def write_file_atomic(file_path: str, data: bytes) -> None:
+    """
+    Write data to a file atomically, so a reader never sees a partial
+    file. The data is written to a temporary file in the same directory,
+    which then replaces the file. The file keeps its permissions, and a
+    new file gets the same permissions as one created by open().
+
+    Parameters:
+    file_path (str): The file to write to. Its directory is created if
+        needed.
+    data (bytes): The data to write.
+
+    Returns:
+    None
+    """
+    dir_path = os.path.dirname(os.path.abspath(file_path))
+    os.makedirs(dir_path, exist_ok=True)
+    fd, temp_path = _create_temp_file(dir_path)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        if os.path.exists(file_path):
+            shutil.copymode(file_path, temp_path)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+# --- Private Helper Functions ---
+
+def _create_temp_file(dir_path: str) -> Tuple[int, str]:
+    # Unlike tempfile.mkstemp(), which always uses mode 0600, the umask
+    # decides the permissions.
+    while True:
+        temp_path = os.path.join(dir_path,
+                                 _TEMP_PREFIX + os.urandom(8).hex())
+        try:
+            return (os.open(temp_path, _TEMP_FLAGS, _NEW_FILE_MODE),
+                    temp_path)
+        except FileExistsError:
+            continue
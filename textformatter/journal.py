@@ -0,0 +1,106 @@
+# --- Imports ---
+import os
+import time
+
+from typing import Self
+
+
+# --- Private Constants ---
+_DEFAULT_SYNC_EVERY = 256
+_DEFAULT_SYNC_INTERVAL = 1.0
+
+
+# --- Classes ---
+
+class Journal:
+    """
+    An append-only journal of the files a batch run has completed, so an
+    interrupted run can be resumed without redoing them.
+
+    Entries are written as they complete but only synced to disk in
+    batches, every "sync_every" entries or "sync_interval" seconds,
+    whichever comes first. After a crash at most one batch is lost, and
+    those files are simply processed again.
+
+    Parameters:
+    file_path (str): The journal file.
+    sync_every (int): The number of entries per sync. Default value
+        is 256.
+    sync_interval (float): The maximum number of seconds between syncs.
+        Default value is 1.0.
+    """
+
+    def __init__(self, file_path: str,
+                 sync_every: int = _DEFAULT_SYNC_EVERY,
+                 sync_interval: float = _DEFAULT_SYNC_INTERVAL) -> None:
+        self.file_path = str(file_path)
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self._file = None
+        self._unsynced = 0
+        self._last_sync_time = time.monotonic()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def load_completed(self) -> set[str]:
+        """
+        Return the files recorded as completed in the journal.
+
+        Returns:
+        set[str]: The absolute paths of the completed files.
+        """
+        if not os.path.exists(self.file_path):
+            return set()
+        with open(self.file_path, encoding="utf-8") as f:
+            # A last line without a linefeed was cut off by a crash.
+            return {line[:-1] for line in f if line.endswith("\n")}
+
+    def record(self, file_path: str) -> None:
+        """
+        Record a file as completed.
+
+        Parameters:
+        file_path (str): The completed file.
+
+        Returns:
+        None
+        """
+        if self._file is None:
+            self._file = open(self.file_path, "a", encoding="utf-8")
+        self._file.write(f"{os.path.abspath(file_path)}\n")
+        self._unsynced += 1
+        if (self._unsynced >= self.sync_every
+                or time.monotonic() - self._last_sync_time
+                >= self.sync_interval):
+            self.sync()
+
+    def sync(self) -> None:
+        """
+        Write the recorded entries to disk.
+
+        Returns:
+        None
+        """
+        if self._file is None:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync_time = time.monotonic()
+
+    def close(self) -> None:
+        """
+        Sync and close the journal.
+
+        Returns:
+        None
+        """
+        if self._file is None:
+            return
+        self.sync()
+        self._file.close()
+        self._file = None
@@ -0,0 +1,141 @@
+# --- Imports ---
+import bisect
+
+from textformatter.fileutil import write_file_atomic
+
+
+# --- Private Constants ---
+# Upper bounds of the per-file latency histogram buckets, in seconds.
+_FILE_SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0,
+                         10.0, 60.0)
+_PREFIX = "textformatter"
+_COUNTERS = (
+    ("files_processed", "Files formatted, whether changed or not."),
+    ("files_changed", "Files changed by formatting."),
+    ("files_skipped", "Files skipped because a previous run completed"
+                      " them."),
+    ("files_failed", "Files that could not be formatted."),
+    ("bytes_read", "Bytes read from formatted files."),
+    ("bytes_written", "Bytes written to changed files."),
+)
+
+
+# --- Classes ---
+
+class Metrics:
+    """
+    Counters and histograms of a batch run, which can be written in the
+    OpenMetrics text format.
+
+    Recording only adds to numbers. Each worker process collects its own
+    metrics, and the parent merges them.
+    """
+
+    def __init__(self) -> None:
+        self.files_processed = 0
+        self.files_changed = 0
+        self.files_skipped = 0
+        self.files_failed = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.stage_seconds = {}
+        self.file_seconds_counts = [0] * (len(_FILE_SECONDS_BUCKETS) + 1)
+        self.file_seconds_sum = 0.0
+
+    def add_stage_time(self, stage: str, seconds: float) -> None:
+        """
+        Add the time spent in a formatting stage.
+
+        Parameters:
+        stage (str): The name of the stage.
+        seconds (float): The time spent.
+
+        Returns:
+        None
+        """
+        self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) \
+            + seconds
+
+    def observe_file_time(self, seconds: float) -> None:
+        """
+        Add the time a file took to the latency histogram.
+
+        Parameters:
+        seconds (float): The time the file took.
+
+        Returns:
+        None
+        """
+        index = bisect.bisect_left(_FILE_SECONDS_BUCKETS, seconds)
+        self.file_seconds_counts[index] += 1
+        self.file_seconds_sum += seconds
+
+    def merge(self, other: "Metrics") -> None:
+        """
+        Add the metrics of another run, e.g. of a worker process.
+
+        Parameters:
+        other (Metrics): The metrics to add.
+
+        Returns:
+        None
+        """
+        for name, _ in _COUNTERS:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        for stage, seconds in other.stage_seconds.items():
+            self.add_stage_time(stage, seconds)
+        for i, count in enumerate(other.file_seconds_counts):
+            self.file_seconds_counts[i] += count
+        self.file_seconds_sum += other.file_seconds_sum
+
+    def to_openmetrics(self) -> str:
+        """
+        Return the metrics in the OpenMetrics text format.
+
+        Returns:
+        str: The metrics text.
+        """
+        result = []
+        for name, description in _COUNTERS:
+            result.append(f"# TYPE {_PREFIX}_{name} counter")
+            result.append(f"# HELP {_PREFIX}_{name} {description}")
+            result.append(f"{_PREFIX}_{name}_total {getattr(self, name)}")
+        result.append(f"# TYPE {_PREFIX}_stage_seconds counter")
+        result.append(f"# HELP {_PREFIX}_stage_seconds Time spent in each"
+                      " formatting stage.")
+        for stage, seconds in sorted(self.stage_seconds.items()):
+            result.append(f"{_PREFIX}_stage_seconds_total"
+                          f"{{stage=\"{_escape_label(stage)}\"}} {seconds}")
+        result.append(f"# TYPE {_PREFIX}_file_seconds histogram")
+        result.append(f"# HELP {_PREFIX}_file_seconds Time to format each"
+                      " file.")
+        count = 0
+        for bound, bucket_count in zip(_FILE_SECONDS_BUCKETS + ("+Inf",),
+                                       self.file_seconds_counts):
+            count += bucket_count
+            result.append(f"{_PREFIX}_file_seconds_bucket{{le=\"{bound}\"}}"
+                          f" {count}")
+        result.append(f"{_PREFIX}_file_seconds_count {count}")
+        result.append(f"{_PREFIX}_file_seconds_sum {self.file_seconds_sum}")
+        result.append("# EOF")
+        return "\n".join(result) + "\n"
+
+    def write(self, file_path: str) -> None:
+        """
+        Write the metrics to a file atomically, so a scraper never reads
+        a partial file.
+
+        Parameters:
+        file_path (str): The file to write to.
+
+        Returns:
+        None
+        """
+        write_file_atomic(file_path, self.to_openmetrics().encode("utf-8"))
+
+
+# --- Private Helper Functions ---
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"") \
+        .replace("\n", "\\n")
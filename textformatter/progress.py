@@ -0,0 +1,137 @@
+# --- Imports ---
+import heapq
+import sys
+import time
+
+from typing import TextIO
+
+
+# --- Private Constants ---
+_DEFAULT_INTERVAL = 0.5
+_DEFAULT_NUM_SLOWEST = 5
+_MEGABYTE = 1024 * 1024
+
+
+# --- Classes ---
+
+class Progress:
+    """
+    Live progress output for a batch run, showing files/sec, MB/sec, the
+    estimated time left and the slowest files so far.
+
+    Updating only adds to counters and a small heap of the slowest
+    files. The status line is written at most once per interval.
+
+    Parameters:
+    total_files (int): The number of files in the run.
+    total_bytes (int): The total size of the files in bytes.
+    stream (TextIO): The stream to write to. Default value is stderr.
+    interval (float): The minimum number of seconds between status
+        lines. Default value is 0.5.
+    num_slowest (int): The number of slowest files to keep. Default
+        value is 5.
+    """
+
+    def __init__(self, total_files: int, total_bytes: int,
+                 stream: TextIO = None,
+                 interval: float = _DEFAULT_INTERVAL,
+                 num_slowest: int = _DEFAULT_NUM_SLOWEST) -> None:
+        self.total_files = total_files
+        self.total_bytes = total_bytes
+        self.stream = stream if stream is not None else sys.stderr
+        self.interval = interval
+        self.num_slowest = num_slowest
+        self.files_done = 0
+        self.bytes_done = 0
+        self._slowest = []
+        self._start_time = time.monotonic()
+        self._next_render_time = self._start_time + interval
+        self._is_tty = getattr(self.stream, "isatty", lambda: False)()
+
+    @property
+    def slowest_files(self) -> list[tuple[float, str]]:
+        """
+        The slowest files so far as (seconds, file) pairs, slowest first.
+        """
+        return sorted(self._slowest, reverse=True)
+
+    def update(self, file_path: str, size: int, seconds: float) -> None:
+        """
+        Record a completed file and write the status line if the
+        interval has passed.
+
+        Parameters:
+        file_path (str): The completed file.
+        size (int): The size of the file in bytes.
+        seconds (float): The time the file took.
+
+        Returns:
+        None
+        """
+        self.files_done += 1
+        self.bytes_done += size
+        if len(self._slowest) < self.num_slowest:
+            heapq.heappush(self._slowest, (seconds, str(file_path)))
+        elif seconds > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, (seconds, str(file_path)))
+        now = time.monotonic()
+        if now >= self._next_render_time:
+            self._next_render_time = now + self.interval
+            self._write(self.format_status(now))
+
+    def finish(self) -> None:
+        """
+        Write the final status line and the slowest files.
+
+        Returns:
+        None
+        """
+        self._write(self.format_status())
+        if self._is_tty:
+            self.stream.write("\n")
+        for seconds, file_path in self.slowest_files:
+            self.stream.write(f"  {seconds:8.3f}s  {file_path}\n")
+        self.stream.flush()
+
+    def format_status(self, now: float = None) -> str:
+        """
+        Return the status line.
+
+        Parameters:
+        now (float): The current time.monotonic() value. Default value
+            is None, which means the current time.
+
+        Returns:
+        str: The status line.
+        """
+        if now is None:
+            now = time.monotonic()
+        elapsed = max(now - self._start_time, 1e-9)
+        files_rate = self.files_done / elapsed
+        bytes_rate = self.bytes_done / elapsed
+        if self.total_bytes and bytes_rate:
+            eta = (self.total_bytes - self.bytes_done) / bytes_rate
+        elif files_rate:
+            eta = (self.total_files - self.files_done) / files_rate
+        else:
+            eta = None
+        return (f"{self.files_done}/{self.total_files} files"
+                f"  {files_rate:.1f} files/s"
+                f"  {bytes_rate / _MEGABYTE:.2f} MB/s"
+                f"  ETA {_format_duration(eta)}")
+
+    def _write(self, status: str) -> None:
+        if self._is_tty:
+            self.stream.write(f"\r\x1b[K{status}")
+        else:
+            self.stream.write(f"{status}\n")
+        self.stream.flush()
+
+
+# --- Private Helper Functions ---
+
+def _format_duration(seconds: float | None) -> str:
+    if seconds is None:
+        return "--:--:--"
+    seconds = max(0, int(seconds))
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
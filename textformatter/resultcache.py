@@ -0,0 +1,177 @@
+# --- Imports ---
+import hashlib
+import json
+import os
+import time
+
+from collections.abc import Iterator
+from typing import Tuple
+
+from textformatter import __version__
+from textformatter.fileutil import write_file_atomic
+
+
+# --- Private Constants ---
+_FORMATTED = b"F"
+_LINE_INDEX_DIR = "line-index"
+_OBJECTS_DIR = "objects"
+# The prefix of the temporary files of fileutil.write_file_atomic().
+_TEMP_PREFIX = ".tmp-"
+# Temporary files older than this are left over from a crashed writer.
+_TEMP_MAX_AGE = 3600.0
+_UNCHANGED = b"U"
+# Evict after writing this fraction of the size limit, so the cache
+# directory is not scanned on every write.
+_EVICT_FRACTION = 0.1
+
+
+# --- Classes ---
+
+class ResultCache:
+    """
+    A cache of formatting results keyed by the hash of the input
+    contents, the hash of the configuration and the tool version, so
+    identical contents are formatted only once. Each entry holds either
+    the formatted contents or a marker that formatting does not change
+    them.
+
+    Entries are written atomically, so several processes can share the
+    same cache directory. When the cache grows over its size limit, the
+    least recently used entries are evicted. Saved line indexes go to a
+    subdirectory, and are small enough to be left out of the size limit.
+    """
+
+    def __init__(self, root_dir: str, max_bytes: int = None) -> None:
+        if max_bytes is not None and max_bytes < 1:
+            raise ValueError("The cache size must be a positive integer:"
+                             f" ({max_bytes}).")
+        self.root_dir = str(root_dir)
+        self.max_bytes = max_bytes
+        self._written_bytes = 0
+
+    @property
+    def line_index_dir(self) -> str:
+        return os.path.join(self.root_dir, _LINE_INDEX_DIR)
+
+    def make_key(self, data: bytes, config: object) -> str:
+        """
+        Return the cache key of file contents formatted with a
+        configuration.
+
+        Parameters:
+        data (bytes): The file contents.
+        config (TextFormatterConfig): The text-formatter configuration
+            object.
+
+        Returns:
+        str: The SHA-256 hex digest of the key.
+        """
+        config_text = json.dumps(config.to_dict(), sort_keys=True,
+                                 default=str)
+        key = "\0".join([
+            hashlib.sha256(data).hexdigest(),
+            hashlib.sha256(config_text.encode()).hexdigest(),
+            __version__,
+        ])
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def get(self, key: str) -> Tuple[bool, bytes | None]:
+        """
+        Return the cached result of a key and mark it as recently used.
+
+        Parameters:
+        key (str): The cache key.
+
+        Returns:
+        Tuple[bool, bytes | None]: Whether the key is cached, and the
+            formatted contents, or None if formatting does not change
+            them.
+        """
+        object_path = self._object_path(key)
+        try:
+            with open(object_path, "rb") as f:
+                entry = f.read()
+            os.utime(object_path)
+        except OSError:
+            # Missing, or evicted by another process.
+            return (False, None)
+        if entry[:1] == _FORMATTED:
+            return (True, entry[1:])
+        if entry == _UNCHANGED:
+            return (True, None)
+        return (False, None)
+
+    def put(self, key: str, new_data: bytes | None) -> None:
+        """
+        Store the result of a key, evicting old entries if the cache
+        has grown over its size limit.
+
+        Parameters:
+        key (str): The cache key.
+        new_data (bytes | None): The formatted contents, or None if
+            formatting does not change them.
+
+        Returns:
+        None
+        """
+        entry = _UNCHANGED if new_data is None else _FORMATTED + new_data
+        write_file_atomic(self._object_path(key), entry)
+        if self.max_bytes is None:
+            return
+        self._written_bytes += len(entry)
+        if self._written_bytes >= self.max_bytes * _EVICT_FRACTION:
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        Remove the least recently used entries until the cache is within
+        its size limit.
+
+        Returns:
+        int: The number of entries removed.
+        """
+        self._written_bytes = 0
+        entries = []
+        total_bytes = 0
+        now = time.time()
+        for object_path in self._iter_files():
+            try:
+                stat = os.stat(object_path)
+            except OSError:
+                continue
+            if os.path.basename(object_path).startswith(_TEMP_PREFIX):
+                if now - stat.st_mtime > _TEMP_MAX_AGE:
+                    _remove_file(object_path)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, object_path))
+            total_bytes += stat.st_size
+        if self.max_bytes is None or total_bytes <= self.max_bytes:
+            return 0
+        entries.sort()
+        removed = 0
+        for _, size, object_path in entries:
+            if total_bytes <= self.max_bytes:
+                break
+            _remove_file(object_path)
+            total_bytes -= size
+            removed += 1
+        return removed
+
+    def _iter_files(self) -> Iterator[str]:
+        objects_dir = os.path.join(self.root_dir, _OBJECTS_DIR)
+        for dir_path, _, file_names in os.walk(objects_dir):
+            for file_name in file_names:
+                yield os.path.join(dir_path, file_name)
+
+    def _object_path(self, key: str) -> str:
+        return os.path.join(self.root_dir, _OBJECTS_DIR, key[:2], key)
+
+
+# --- Private Helper Functions ---
+
+def _remove_file(file_path: str) -> None:
+    try:
+        os.remove(file_path)
+    except OSError:
+        # Already removed by another process.
+        pass
@@ -0,0 +1,174 @@
+# --- Imports ---
+import collections
+import os
+import time
+
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    wait,
+)
+
+
+# --- Private Constants ---
+_SIZE_UNITS = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+
+# --- Classes ---
+
+class FileResult:
+    """
+    The result of running a task on a file.
+
+    Parameters:
+    file_path (str): The file.
+    size (int): The size of the file in bytes when it was scheduled.
+    value (object): The value returned by the task, or None if it failed.
+    error (Exception): The exception raised by the task, or None.
+    seconds (float): The time the task took.
+    """
+
+    def __init__(self, file_path: str, size: int, value: object = None,
+                 error: Exception = None, seconds: float = 0.0) -> None:
+        self.file_path = file_path
+        self.size = size
+        self.value = value
+        self.error = error
+        self.seconds = seconds
+
+
+# --- Public Scheduling Functions ---
+
+def schedule_files(files: Sequence[str], function: Callable,
+                   args: tuple = (), *,
+                   max_workers: int = None,
+                   max_inflight_bytes: int = None,
+                   executor: Executor = None) -> Iterator[FileResult]:
+    """
+    Run a task on each file in worker processes, admitting files by their
+    size on disk so that the files being processed at the same time stay
+    within a byte budget.
+
+    Files are admitted largest first. A file larger than the budget runs
+    alone, and the remaining budget next to a large file is filled with
+    the smallest files. No new file is admitted until running files have
+    freed enough of the budget.
+
+    The function is called as function(file_path, *args) and must be
+    picklable, e.g. a module-level function such as process_file.
+
+    Parameters:
+    files (Sequence[str]): The files to process.
+    function (Callable): The task to run on each file.
+    args (tuple): The extra arguments for the task.
+    max_workers (int): The number of worker processes. Default value is
+        None, which means the number of CPUs. With 1, the tasks run in
+        this process one at a time.
+    max_inflight_bytes (int): The byte budget. Default value is None,
+        which means no limit.
+    executor (Executor): The executor to run the tasks in. Default value
+        is None, which means a new process pool.
+
+    Returns:
+    Iterator[FileResult]: The result of each file, in completion order.
+    """
+    if max_inflight_bytes is not None and max_inflight_bytes < 1:
+        raise ValueError("The byte budget must be a positive integer:"
+                         f" ({max_inflight_bytes}).")
+    sized_files = sorted(((_get_file_size(f), f) for f in files),
+                         reverse=True)
+    if executor is None and max_workers == 1:
+        for size, file_path in sized_files:
+            yield _run_task(function, file_path, size, args)
+        return
+    owns_executor = executor is None
+    if owns_executor:
+        executor = ProcessPoolExecutor(max_workers=max_workers)
+    max_running = max_workers or os.cpu_count() or 1
+    try:
+        yield from _schedule(executor, collections.deque(sized_files),
+                             function, args, max_running,
+                             max_inflight_bytes)
+    finally:
+        if owns_executor:
+            executor.shutdown(cancel_futures=True)
+
+
+def parse_size(text: str) -> int:
+    """
+    Parse a size such as "512K", "64M" or "2G" into a number of bytes.
+
+    Parameters:
+    text (str): The size text.
+
+    Returns:
+    int: The number of bytes.
+    """
+    text = str(text).strip().upper()
+    multiplier = 1
+    if text[-1:] in _SIZE_UNITS:
+        multiplier = _SIZE_UNITS[text[-1]]
+        text = text[:-1]
+    try:
+        return int(float(text) * multiplier)
+    except ValueError:
+        raise ValueError(f"Invalid size: ({text}).") from None
+
+
+# --- Private Helper Functions ---
+
+def _schedule(executor: Executor, pending: collections.deque,
+              function: Callable, args: tuple, max_running: int,
+              max_inflight_bytes: int | None) -> Iterator[FileResult]:
+    running: dict[Future, int] = {}
+    inflight_bytes = 0
+    while pending or running:
+        while pending and len(running) < max_running:
+            # Largest file first; fill any leftover budget with the
+            # smallest files.
+            size, file_path = pending[0]
+            if not _fits(size, inflight_bytes, running, max_inflight_bytes):
+                size, file_path = pending[-1]
+                if not _fits(size, inflight_bytes, running,
+                             max_inflight_bytes):
+                    break
+                pending.pop()
+            else:
+                pending.popleft()
+            future = executor.submit(_run_task, function, file_path, size,
+                                     args)
+            running[future] = size
+            inflight_bytes += size
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            inflight_bytes -= running.pop(future)
+            yield future.result()
+
+
+def _fits(size: int, inflight_bytes: int, running: dict,
+          max_inflight_bytes: int | None) -> bool:
+    if max_inflight_bytes is None or not running:
+        return True
+    return inflight_bytes + size <= max_inflight_bytes
+
+
+def _get_file_size(file_path: str) -> int:
+    try:
+        return os.path.getsize(file_path)
+    except OSError:
+        return 0
+
+
+def _run_task(function: Callable, file_path: str, size: int,
+              args: tuple) -> FileResult:
+    start_time = time.perf_counter()
+    try:
+        value = function(file_path, *args)
+    except Exception as e:
+        return FileResult(file_path, size, error=e,
+                          seconds=time.perf_counter() - start_time)
+    return FileResult(file_path, size, value,
+                      seconds=time.perf_counter() - start_time)
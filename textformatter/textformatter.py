@@ -1,20 +1,81 @@
 # --- Imports ---
+import bisect
+import codecs
+import functools
+import hashlib
+import itertools
+import mmap
 import os
+import re
 import shutil
+import struct
+import time
 
-from collections.abc import Sequence
+from array import array
+from collections.abc import Callable, Iterator, Sequence
 from enum import Enum
 from typing import Self, Tuple
 
+import textformatter
+from textformatter import backupstore
+from textformatter.backupstore import BackupRun
+from textformatter.fileutil import write_file_atomic
+from textformatter.metrics import Metrics
+from textformatter.resultcache import ResultCache
+
 
 # --- Private Constants ---
+_BACKUP_COMPRESS = "backup-compress"
+_BACKUP_DIR = "backup-dir"
 _BACKUP_FILE = "backup-file"
 _BLANK_LINES = "blank-lines"
+_ENCODING = "encoding"
+_ENCODING_AUTO = "auto"
 _LETTER_CASE = "letter-case"
 _NEWLINE = "newline"
+_REGEX_REPLACE = "regex-replace"
 _TAB = "tab"
 _TRIM = "trim"
 _WHITESPACE = "whitespace"
+_WRITE_MODE = "write-mode"
+
+# A letter following an apostrophe inside a word, e.g. the "t" of "Don'T"
+# after str.title().
+_APOSTROPHE_LETTER_PATTERN = re.compile(r"(?<=[^\W\d_]['\u2019])[^\W\d_]")
+_ASCII_APOSTROPHE_LETTER_PATTERN = re.compile(rb"(?<=[A-Za-z]')[A-Z]")
+
+# Byte order marks and the encodings they stand for. UTF-32 LE comes
+# before UTF-16 LE because its byte order mark starts with the other one.
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32-le"),
+    (codecs.BOM_UTF32_BE, "utf-32-be"),
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
+# Contents are decoded and encoded in chunks of this size, so that an
+# error is raised as soon as it is reached.
+_CODEC_CHUNK_SIZE = 1 << 20
+_DEFAULT_ENCODING = "utf-8"
+_ENCODING_SAMPLE_SIZE = 1 << 16
+# Decodes any bytes and encodes them back unchanged.
+
+# Files are compared in blocks of this size when updated in place. An
+# update that would rewrite more than the fraction of the file is written
+# as a whole instead.
+_IN_PLACE_BLOCK_SIZE = 1 << 16
+_IN_PLACE_MAX_REWRITE_FRACTION = 0.5
+
+# Splits after each newline, keeping CR LF together.
+_NEWLINE_SPLIT_PATTERN = re.compile(rb"(?<=\n)|(?<=\r)(?!\n)")
+_LINE_INDEX_CHUNK_SIZE = 1 << 22
+_LINE_INDEX_HEADER = struct.Struct("<4sQqQQQQ")
+_LINE_INDEX_MAGIC = b"TFLI"
+_LINE_INDEX_SUFFIX = ".lineindex"
+
+# Registered transforms by name, and generated fused line functions.
+_TRANSFORMS = {}
+_FUSED_LINE_FUNCTIONS = {}
 
 
 # --- Classes ---
@@ -27,7 +88,8 @@ class BlankLineType(Enum):
 class CaseType(Enum):
     LOWER = "lower"
     UPPER = "upper"
-#    TITLE = "title"  # TODO later due to complexity
+    TITLE = "title"
+    CASEFOLD = "casefold"
 
 
 class NewlineType(Enum):
@@ -56,6 +118,16 @@ class NewlineType(Enum):
             return NewlineType.REMOVE
         return None
 
+    @classmethod
+    def from_line_ending(cls, line: str) -> Self:
+        if line.endswith("\r\n"):
+            return NewlineType.CRLF
+        if line.endswith("\n"):
+            return NewlineType.LF
+        if line.endswith("\r"):
+            return NewlineType.CR
+        return None
+
     def to_text(self) -> str:
         if self == NewlineType.LF:
             return "\\n"
@@ -73,6 +145,8 @@ class NewlineType(Enum):
 class TabType(Enum):
     SPACES_TO_TAB = "spaces-to-tab"
     TAB_TO_SPACES = "tab-to-spaces"
+    EXPAND = "expand"
+    UNEXPAND = "unexpand"
 
 
 class TrimType(Enum):
@@ -81,110 +155,1107 @@ class TrimType(Enum):
     ALL = "all"
 
 
+class WriteMode(Enum):
+    REWRITE = "rewrite"
+    ATOMIC = "atomic"
+    IN_PLACE = "in-place"
+
+
+class StageKind(Enum):
+    PER_LINE = "per-line"          # str -> str, called for each line
+    WHOLE_BUFFER = "whole-buffer"  # str -> str, called on the joined lines
+    STATEFUL = "stateful"          # str -> str | None, with per-file state
+    OUTPUT = "output"              # Applied when the lines are joined
+
+
+class Transform:
+    """
+    A formatting transform that can be enabled in the configuration.
+
+    Parameters:
+    name (str): The unique name of the transform.
+    config_key (Tuple[str, ...]): The path of keys to the transform value
+        in the configuration dictionary, e.g. ("whitespace", "trim").
+    order (int): The stage order. Transforms run in ascending order.
+    kind (StageKind): How the function returned by build is applied.
+    parse (Callable[[object], object]): Convert a configuration value to
+        the transform value. Raise ValueError for invalid values.
+    dump (Callable[[object], object]): Convert a transform value back to
+        a configuration value.
+    build (Callable[[object], Callable]): Return the function applying
+        the transform value. For a PER_LINE transform the function takes
+        and returns a line. For a WHOLE_BUFFER transform it takes and
+        returns the lines joined with linefeed characters, and must keep
+        the number of lines. For a STATEFUL transform it is a factory,
+        called once per document, returning a function that takes a line
+        and returns the new line or None to remove it. OUTPUT transforms
+        are applied by the writer and build is not called.
+    attribute (str): The TextFormatterConfig attribute holding the value.
+        Default value is None, which means the value is stored in the
+        options dictionary under the transform name.
+    """
+
+    def __init__(self, *,
+                 name: str,
+                 config_key: Tuple[str, ...],
+                 order: int,
+                 kind: StageKind,
+                 parse: Callable[[object], object],
+                 dump: Callable[[object], object],
+                 build: Callable[[object], Callable] = None,
+                 attribute: str = None) -> None:
+        self.name = name
+        self.config_key = tuple(config_key)
+        self.order = order
+        self.kind = kind
+        self.parse = parse
+        self.dump = dump
+        self.build = build
+        self.attribute = attribute
+
+    def get_value(self, config: "TextFormatterConfig") -> object:
+        if self.attribute is None:
+            return config.options.get(self.name)
+        return getattr(config, self.attribute)
+
+    def set_value(self, config: "TextFormatterConfig",
+                  value: object) -> None:
+        if self.attribute is None:
+            config.options[self.name] = value
+        else:
+            setattr(config, self.attribute, value)
+
+
+class ConfigError(ValueError):
+    """
+    An invalid configuration, with every error found in it.
+
+    Parameters:
+    errors (list[str]): The description of each error.
+    """
+
+    def __init__(self, errors: list[str]) -> None:
+        super().__init__("Invalid configuration:\n"
+                         + "\n".join(f"  {error}" for error in errors))
+        self.errors = list(errors)
+
+
 class TextFormatterConfig:
     def __init__(self, *,
                  backup_file: bool=True,
+                 backup_dir: str=None,
+                 backup_compress: bool=False,
+                 encoding: str=None,
+                 write_mode: WriteMode=None,
                  blank_line_type: BlankLineType=None,
                  case_type: CaseType=None,
                  newline_type: NewlineType=None,
                  tab_type: Tuple[TabType, int] = None,
-                 trim_type: TrimType=None) -> None:
+                 trim_type: TrimType=None,
+                 options: dict=None) -> None:
         self.backup_file = backup_file
+        self.backup_dir = backup_dir
+        self.backup_compress = backup_compress
+        self.encoding = encoding
+        self.write_mode = write_mode
         self.blank_line_type = blank_line_type
         self.case_type = case_type
         self.newline_type = newline_type
         self.tab_type = tab_type
         self.trim_type = trim_type
+        self.options = dict(options) if options else {}
 
     @classmethod
-    def from_dict(cls, data: dict) -> Self:
+    def from_dict(cls, data: dict, strict: bool = False) -> Self:
+        """
+        Create a configuration from a dictionary, e.g. a YAML file.
+
+        Invalid values are ignored, unless strict is True. Then every
+        unknown key and invalid value is collected, and reported in a
+        single ConfigError.
+
+        Parameters:
+        data (dict): The configuration data.
+        strict (bool): Whether to raise an error for unknown keys and
+            invalid values. Default value is False.
+
+        Returns:
+        TextFormatterConfig: The text-formatter configuration object.
+        """
+        errors = []
+        if strict and not isinstance(data, dict):
+            raise ConfigError(["The configuration must be a mapping."])
         config = TextFormatterConfig()
-        try:
-            value = data.get(_BACKUP_FILE)
-            if value is not None:
-                value = str(value).lower()
-                if value == "true":
-                    config.backup_file = True
-                elif value == "false":
-                    config.backup_file = False
-        except ValueError:
-            pass
-        try:
-            config.case_type = CaseType(data.get(_LETTER_CASE))
-        except ValueError:
-            pass
-        try:
-            config.newline_type = NewlineType.from_text(data.get(_NEWLINE))
-        except ValueError:
-            pass
-        whitespace_dict = data.get(_WHITESPACE)
-        if whitespace_dict:
-            try:
-                config.blank_line_type = BlankLineType(
-                    whitespace_dict.get(_BLANK_LINES)
-                )
-            except ValueError:
-                pass
+        value = _parse_bool(data.get(_BACKUP_FILE))
+        if value is not None:
+            config.backup_file = value
+        elif data.get(_BACKUP_FILE) is not None:
+            errors.append(_format_config_error((_BACKUP_FILE,),
+                                               data.get(_BACKUP_FILE)))
+        value = data.get(_BACKUP_DIR)
+        if value is not None:
+            config.backup_dir = str(value)
+        value = _parse_bool(data.get(_BACKUP_COMPRESS))
+        if value is not None:
+            config.backup_compress = value
+        elif data.get(_BACKUP_COMPRESS) is not None:
+            errors.append(_format_config_error((_BACKUP_COMPRESS,),
+                                               data.get(_BACKUP_COMPRESS)))
+        config.encoding = _parse_encoding(data.get(_ENCODING))
+        if config.encoding is None and data.get(_ENCODING) is not None \
+                and str(data.get(_ENCODING)).lower() != _ENCODING_AUTO:
+            errors.append(_format_config_error((_ENCODING,),
+                                               data.get(_ENCODING)))
+        value = data.get(_WRITE_MODE)
+        if value is not None:
             try:
-                values = whitespace_dict.get(_TAB)
-                if values is not None and len(values) >= 2:
-                    tab_type = TabType(values[0])
-                    value = int(values[1])
-                    config.tab_type = (tab_type, value)
+                config.write_mode = WriteMode(str(value))
             except ValueError:
-                pass
+                errors.append(_format_config_error((_WRITE_MODE,), value))
+        for transform in get_transforms():
+            value = _get_nested(data, transform.config_key)
+            if value is None:
+                continue
             try:
-                config.trim_type = TrimType(whitespace_dict.get(_TRIM))
-            except ValueError:
-                pass
+                parsed_value = transform.parse(value)
+                if strict and parsed_value is None:
+                    raise ValueError
+                if strict and transform.build is not None:
+                    # Building checks the value, e.g. a tab size.
+                    transform.build(parsed_value)
+                transform.set_value(config, parsed_value)
+            except (TypeError, ValueError) as e:
+                errors.append(_format_config_error(transform.config_key,
+                                                   value, e))
+        if strict:
+            errors.extend(f"{'.'.join(key)}: unknown key."
+                          for key in _find_unknown_keys(data))
+            if errors:
+                raise ConfigError(errors)
         return config
 
     def to_dict(self) -> dict:
-        whitespace_dict = {}
-        if self.blank_line_type is not None:
-            whitespace_dict[_BLANK_LINES] = self.blank_line_type.value
-        if self.tab_type is not None:
-            whitespace_dict[_TAB] = (self.tab_type[0].value, self.tab_type[1])
-        if self.trim_type is not None:
-            whitespace_dict[_TRIM] = self.trim_type.value
         result = {}
         if self.backup_file is not None:
             result[_BACKUP_FILE] = str(self.backup_file).lower()
-        if self.case_type is not None:
-            result[_LETTER_CASE] = self.case_type.value
-        if self.newline_type is not None:
-            result[_NEWLINE] = self.newline_type.to_text()
-        if whitespace_dict:
-            result[_WHITESPACE] = whitespace_dict
+        if self.backup_dir is not None:
+            result[_BACKUP_DIR] = self.backup_dir
+        if self.backup_compress:
+            result[_BACKUP_COMPRESS] = "true"
+        if self.encoding is not None:
+            result[_ENCODING] = self.encoding
+        if self.write_mode is not None:
+            result[_WRITE_MODE] = self.write_mode.value
+        for transform in get_transforms():
+            value = transform.get_value(self)
+            if value is not None:
+                _set_nested(result, transform.config_key,
+                            transform.dump(value))
+        return result
+
+
+class PipelineStage:
+    """
+    A stage of a compiled pipeline, running one or more fused transforms
+    of compatible kinds in a single pass.
+    """
+
+    def __init__(self, kind: StageKind, transforms: Sequence[Transform],
+                 functions: Sequence[Callable]) -> None:
+        self.kind = kind
+        self.transforms = list(transforms)
+        self.functions = list(functions)
+        self.may_remove_lines = any(t.kind == StageKind.STATEFUL
+                                    for t in self.transforms)
+
+    @property
+    def name(self) -> str:
+        return "+".join(transform.name for transform in self.transforms)
+
+    def run(self, lines: list[str | None],
+            has_removed: bool) -> list[str | None]:
+        """
+        Run the stage on aligned lines and return the new aligned lines.
+
+        Parameters:
+        lines (list[str | None]): The aligned lines, with None for each
+            removed line.
+        has_removed (bool): Whether any line has been removed.
+
+        Returns:
+        list[str | None]: The new aligned lines.
+        """
+        if self.kind == StageKind.WHOLE_BUFFER:
+            return self._run_whole_buffer(lines, has_removed)
+        return self._run_lines(lines, has_removed)
+
+    def _run_lines(self, lines: list[str | None],
+                   has_removed: bool) -> list[str | None]:
+        # Stateful functions are created once per document.
+        functions = [function() if transform.kind == StageKind.STATEFUL
+                     else function
+                     for transform, function in zip(self.transforms,
+                                                    self.functions)]
+        fused_function = _get_fused_line_function(
+            tuple(transform.kind for transform in self.transforms),
+            has_removed,
+        )
+        return fused_function(lines, *functions)
+
+    def _run_whole_buffer(self, lines: list[str | None],
+                          has_removed: bool) -> list[str | None]:
+        kept_lines = ([line for line in lines if line is not None]
+                      if has_removed else lines)
+        if not kept_lines:
+            return list(lines)
+        text = "\n".join(kept_lines)
+        for function in self.functions:
+            text = function(text)
+        new_lines = text.split("\n")
+        if len(new_lines) != len(kept_lines):
+            raise ValueError("A whole-buffer transform changed the number"
+                             " of lines.")
+        if not has_removed:
+            return new_lines
+        new_lines_iter = iter(new_lines)
+        return [None if line is None else next(new_lines_iter)
+                for line in lines]
+
+
+class Pipeline:
+    """
+    The compiled formatting stages of a configuration.
+
+    Consecutive PER_LINE and STATEFUL transforms are fused into one pass
+    over the lines, and consecutive WHOLE_BUFFER transforms share one
+    join and split of the lines.
+    """
+
+    def __init__(self, stages: Sequence[PipelineStage],
+                 output_transforms: Sequence[Transform]) -> None:
+        self.stages = list(stages)
+        self.output_transforms = list(output_transforms)
+
+    def run(self, lines: Sequence[str],
+            metrics: Metrics = None) -> list[str]:
+        """
+        Run the pipeline on lines of text and return the result.
+
+        Parameters:
+        lines (Sequence[str]): The list of text lines to format.
+        metrics (Metrics): The metrics to add the time of each stage to.
+            Default value is None.
+
+        Returns:
+        list[str]: The list of formatted text lines.
+        """
+        return [line for line in self.run_aligned(lines, metrics)
+                if line is not None]
+
+    def run_aligned(self, lines: Sequence[str],
+                    metrics: Metrics = None) -> list[str | None]:
+        """
+        Run the pipeline on lines of text, keeping the result aligned with
+        the original lines.
+
+        Parameters:
+        lines (Sequence[str]): The list of text lines to format.
+        metrics (Metrics): The metrics to add the time of each stage to.
+            Default value is None.
+
+        Returns:
+        list[str | None]: The list of formatted text lines, with None for
+            each removed line.
+        """
+        result = list(lines)
+        has_removed = False
+        for stage in self.stages:
+            if metrics is None:
+                result = stage.run(result, has_removed)
+            else:
+                start_time = time.perf_counter()
+                result = stage.run(result, has_removed)
+                metrics.add_stage_time(stage.name,
+                                       time.perf_counter() - start_time)
+            if stage.may_remove_lines and not has_removed:
+                has_removed = None in result
         return result
 
 
+class LineIndex:
+    """
+    The byte offsets of the lines of a file, found without decoding it.
+
+    Lines end with CR, LF or CR LF, so the index is only valid for
+    encodings where those bytes always mean newline characters, such as
+    ASCII, UTF-8 and Latin-1.
+
+    Parameters:
+    offsets (array): The start offset of each line, followed by the size
+        of the file, as an array('Q').
+    newline_counts (dict[NewlineType, int]): The number of lines ending
+        with each newline type.
+    size (int): The size of the indexed file in bytes.
+    mtime_ns (int): The modification time of the indexed file.
+    """
+
+    def __init__(self, offsets: array, newline_counts: dict,
+                 size: int, mtime_ns: int = 0) -> None:
+        self.offsets = offsets
+        self.newline_counts = newline_counts
+        self.size = size
+        self.mtime_ns = mtime_ns
+
+    @property
+    def num_lines(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def newline_types(self) -> set[NewlineType]:
+        return {newline_type
+                for newline_type, count in self.newline_counts.items()
+                if count}
+
+    @property
+    def is_mixed(self) -> bool:
+        return len(self.newline_types) > 1
+
+    @classmethod
+    def build(cls, file_path: str) -> Self:
+        """
+        Build the line index of a file in a single scan of its bytes.
+
+        Parameters:
+        file_path (str): The file to index.
+
+        Returns:
+        LineIndex: The line index.
+        """
+        with open(file_path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            if stat.st_size == 0:
+                return cls._from_chunks([], 0, stat.st_mtime_ns)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return cls._from_chunks(_iter_line_chunks(mm), len(mm),
+                                        stat.st_mtime_ns)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Self:
+        """
+        Build the line index of the contents of a file.
+
+        Parameters:
+        data (bytes): The file contents.
+
+        Returns:
+        LineIndex: The line index.
+        """
+        return cls._from_chunks(_iter_line_chunks(data), len(data))
+
+    @classmethod
+    def load_or_build(cls, file_path: str, index_dir: str = None,
+                      cache: ResultCache = None) -> Self:
+        """
+        Load the saved line index of a file if it is still up to date, or
+        build it and save it.
+
+        Parameters:
+        file_path (str): The file to index.
+        index_dir (str): The directory for saved line indexes. Default
+            value is None, which means the line index directory of the
+            result cache.
+        cache (ResultCache): The result cache to save line indexes in if
+            no directory is given. Default value is None, which means the
+            index is not saved without a directory.
+
+        Returns:
+        LineIndex: The line index.
+        """
+        if index_dir is None and cache is not None:
+            index_dir = cache.line_index_dir
+        if index_dir is None:
+            return cls.build(file_path)
+        index_path = os.path.join(
+            index_dir,
+            hashlib.sha256(os.path.abspath(file_path).encode()).hexdigest()
+            + _LINE_INDEX_SUFFIX,
+        )
+        stat = os.stat(file_path)
+        index = cls.load(index_path)
+        if (index is not None and index.size == stat.st_size
+                and index.mtime_ns == stat.st_mtime_ns):
+            return index
+        index = cls.build(file_path)
+        os.makedirs(index_dir, exist_ok=True)
+        index.save(index_path)
+        return index
+
+    @classmethod
+    def load(cls, index_path: str) -> Self | None:
+        """
+        Load a line index saved with save().
+
+        Parameters:
+        index_path (str): The saved line index file.
+
+        Returns:
+        LineIndex | None: The line index, or None if the file does not
+            exist or is not a valid line index.
+        """
+        try:
+            with open(index_path, "rb") as f:
+                header = f.read(_LINE_INDEX_HEADER.size)
+                if len(header) != _LINE_INDEX_HEADER.size:
+                    return None
+                (magic, size, mtime_ns, lf_count, crlf_count, cr_count,
+                 num_offsets) = _LINE_INDEX_HEADER.unpack(header)
+                if magic != _LINE_INDEX_MAGIC:
+                    return None
+                offsets = array("Q")
+                offsets.fromfile(f, num_offsets)
+        except (OSError, EOFError):
+            return None
+        newline_counts = {NewlineType.LF: lf_count,
+                          NewlineType.CRLF: crlf_count,
+                          NewlineType.CR: cr_count}
+        return cls(offsets, newline_counts, size, mtime_ns)
+
+    def save(self, index_path: str) -> None:
+        """
+        Save the line index to a file.
+
+        Parameters:
+        index_path (str): The file to save the line index to.
+
+        Returns:
+        None
+        """
+        header = _LINE_INDEX_HEADER.pack(
+            _LINE_INDEX_MAGIC, self.size, self.mtime_ns,
+            self.newline_counts[NewlineType.LF],
+            self.newline_counts[NewlineType.CRLF],
+            self.newline_counts[NewlineType.CR],
+            len(self.offsets),
+        )
+        write_file_atomic(index_path, header + self.offsets.tobytes())
+
+    def get_byte_range(self, start: int, stop: int) -> Tuple[int, int]:
+        """
+        Return the byte range of a range of lines, including the newline
+        characters.
+
+        Parameters:
+        start (int): The index of the first line.
+        stop (int): The index after the last line.
+
+        Returns:
+        Tuple[int, int]: The start and end byte offsets.
+        """
+        start, stop, _ = slice(start, stop).indices(self.num_lines)
+        stop = max(start, stop)
+        return (self.offsets[start], self.offsets[stop])
+
+    def split(self, num_parts: int) -> list[Tuple[int, int]]:
+        """
+        Split the lines into ranges with roughly the same number of bytes.
+
+        Parameters:
+        num_parts (int): The maximum number of ranges.
+
+        Returns:
+        list[Tuple[int, int]]: The start and stop line index of each
+            non-empty range.
+        """
+        if num_parts < 1:
+            raise ValueError("The number of parts must be a positive"
+                             f" integer: ({num_parts}).")
+        ranges = []
+        start = 0
+        for part in range(1, num_parts + 1):
+            target = self.size * part // num_parts
+            stop = min(bisect.bisect_left(self.offsets, target),
+                       self.num_lines)
+            if part == num_parts:
+                stop = self.num_lines
+            if stop > start:
+                ranges.append((start, stop))
+                start = stop
+        return ranges
+
+    @classmethod
+    def _from_chunks(cls, chunks: Iterator[Tuple[int, bytes]], size: int,
+                     mtime_ns: int = 0) -> Self:
+        offsets = array("Q", [0])
+        lf_count = crlf_count = cr_count = 0
+        for position, chunk in chunks:
+            chunk_lf_count = chunk.count(b"\n")
+            chunk_cr_count = chunk.count(b"\r")
+            chunk_crlf_count = chunk.count(b"\r\n") if chunk_cr_count else 0
+            lf_count += chunk_lf_count - chunk_crlf_count
+            crlf_count += chunk_crlf_count
+            cr_count += chunk_cr_count - chunk_crlf_count
+            if chunk_cr_count == chunk_crlf_count:
+                # Every line ends with LF, so the lines are the parts
+                # between LF characters plus one byte each.
+                lengths = map(_add_one, map(len, chunk.split(b"\n")[:-1]))
+            else:
+                lengths = map(len, _NEWLINE_SPLIT_PATTERN.split(chunk)[:-1])
+            offsets.extend(itertools.islice(
+                itertools.accumulate(lengths, initial=position), 1, None))
+        if offsets[-1] != size:
+            offsets.append(size)
+        newline_counts = {NewlineType.LF: lf_count,
+                          NewlineType.CRLF: crlf_count,
+                          NewlineType.CR: cr_count}
+        return cls(offsets, newline_counts, size, mtime_ns)
+
+
+# --- Public Transform Registry Functions ---
+
+def register_transform(transform: Transform) -> None:
+    """
+    Register a transform so that it is read from and written to the
+    configuration and run by the pipeline.
+
+    Files formatted in worker processes, e.g. by
+    asyncformatter.process_files(), use the transforms registered in
+    those processes. A plugin has to register its transforms when its
+    module is imported, and the workers have to import it, e.g. from an
+    executor initializer.
+
+    Parameters:
+    transform (Transform): The transform to register.
+
+    Returns:
+    None
+    """
+    if transform.name in _TRANSFORMS:
+        raise ValueError(f"Transform already registered: ({transform.name}).")
+    if transform.kind != StageKind.OUTPUT and transform.build is None:
+        raise ValueError(f"Transform has no build function:"
+                         f" ({transform.name}).")
+    _TRANSFORMS[transform.name] = transform
+
+
+def unregister_transform(name: str) -> None:
+    """
+    Remove a registered transform.
+
+    Parameters:
+    name (str): The name of the transform.
+
+    Returns:
+    None
+    """
+    del _TRANSFORMS[name]
+
+
+def get_transforms() -> list[Transform]:
+    """
+    Return the registered transforms in stage order.
+
+    Returns:
+    list[Transform]: The list of transforms.
+    """
+    return sorted(_TRANSFORMS.values(), key=lambda t: t.order)
+
+
+def get_enabled_transforms(
+        config: TextFormatterConfig) -> list[Tuple[Transform, object]]:
+    """
+    Return the transforms enabled in the configuration, in stage order,
+    with their values.
+
+    Parameters:
+    config (TextFormatterConfig): The text-formatter configuration object.
+
+    Returns:
+    list[Tuple[Transform, object]]: The list of transforms and values.
+
+    Raises:
+    ValueError: If the options have a value for a transform that is not
+        registered, e.g. a plugin not imported by a worker process.
+    """
+    for name in config.options:
+        if name not in _TRANSFORMS:
+            raise ValueError(f"Transform not registered: ({name}).")
+    result = []
+    for transform in get_transforms():
+        value = transform.get_value(config)
+        if value is not None:
+            result.append((transform, value))
+    return result
+
+
+def compile_pipeline(config: TextFormatterConfig) -> Pipeline:
+    """
+    Compile the transforms enabled in the configuration into a pipeline.
+
+    Parameters:
+    config (TextFormatterConfig): The text-formatter configuration object.
+
+    Returns:
+    Pipeline: The compiled pipeline.
+    """
+    return compile_transforms(get_enabled_transforms(config))
+
+
+def compile_transforms(
+        transform_values: Sequence[Tuple[Transform, object]]) -> Pipeline:
+    """
+    Compile transforms and their values into a pipeline.
+
+    Parameters:
+    transform_values (Sequence[Tuple[Transform, object]]): The transforms
+        and their values, in stage order.
+
+    Returns:
+    Pipeline: The compiled pipeline.
+    """
+    stages = []
+    output_transforms = []
+    group_kind = None
+    group_transforms = []
+    group_functions = []
+    for transform, value in transform_values:
+        if transform.kind == StageKind.OUTPUT:
+            output_transforms.append(transform)
+            continue
+        kind = (StageKind.WHOLE_BUFFER
+                if transform.kind == StageKind.WHOLE_BUFFER
+                else StageKind.PER_LINE)
+        if group_transforms and kind != group_kind:
+            stages.append(PipelineStage(group_kind, group_transforms,
+                                        group_functions))
+            group_transforms = []
+            group_functions = []
+        group_kind = kind
+        group_transforms.append(transform)
+        group_functions.append(transform.build(value))
+    if group_transforms:
+        stages.append(PipelineStage(group_kind, group_transforms,
+                                    group_functions))
+    return Pipeline(stages, output_transforms)
+
+
 # --- Public Document Formatting Functions ---
 
-def process_file(file_path: str, config: TextFormatterConfig) -> None:
+def process_file(file_path: str, config: TextFormatterConfig,
+                 backup_run: BackupRun = None,
+                 cache: ResultCache = None,
+                 metrics: Metrics = None) -> bool:
+    """
+    Format a text file in place using the specified configuration.
+
+    The file is only written if formatting changes its contents, and
+    only backed up if the configuration enables backups. The original
+    contents then go to the backup run if one is given, otherwise to a
+    ".bak" file next to the file. With a configured backup directory, a
+    backup run of its store must be given, so that a whole run can be
+    undone.
+
+    If a result cache is given, contents that were already formatted
+    with the same configuration are not formatted again.
+
+    Parameters:
+    file_path (str): The file to format.
+    config (TextFormatterConfig): The text-formatter configuration object.
+    backup_run (BackupRun): The backup run to record the original
+        contents in. Default value is None.
+    cache (ResultCache): The cache of formatting results. Default value
+        is None.
+    metrics (Metrics): The metrics to record the file in. Default value
+        is None.
+
+    Returns:
+    bool: True if the file was changed, False otherwise.
+    """
+    start_time = time.perf_counter()
     if not os.path.exists(file_path):
         raise ValueError("Input file does not exist.")
-    if config.backup_file:
-        shutil.copy(file_path, f"{file_path}.bak")
-    lines = read_lines_from_file(file_path)
-    for i, line in enumerate(lines):
-        if config.trim_type:
-            line = trim_line(line, config.trim_type)
-        if config.tab_type:
-            tab_type, num_spaces = config.tab_type
-            if tab_type == TabType.TAB_TO_SPACES:
-                line = replace_tab_with_spaces(line, num_spaces)
-            elif tab_type == TabType.SPACES_TO_TAB:
-                line = replace_spaces_with_tab(line, num_spaces)
-        if config.case_type:
-            line = convert_case(line, config.case_type)
-        lines[i] = line
-    if config.blank_line_type:
-        lines = remove_blank_lines(config.blank_line_type)
-    if config.newline_type:
-        write_lines_to_file(file_path, lines, config.newline_type)
+    with open(file_path, "rb") as f:
+        data = f.read()
+    if metrics is not None:
+        metrics.bytes_read += len(data)
+        metrics.add_stage_time("read", time.perf_counter() - start_time)
+    try:
+        if cache is None:
+            new_data = format_file_data(data, config, metrics)
+        else:
+            key = cache.make_key(data, config)
+            is_cached, new_data = cache.get(key)
+            if not is_cached:
+                new_data = format_file_data(data, config, metrics)
+                cache.put(key, new_data)
+    except (UnicodeDecodeError, UnicodeEncodeError) as e:
+        raise _add_file_path(e, file_path) from None
+    if new_data is not None:
+        write_start_time = time.perf_counter()
+        write_formatted_file(file_path, data, new_data, config, backup_run)
+        if metrics is not None:
+            metrics.bytes_written += len(new_data)
+            metrics.add_stage_time("write",
+                                   time.perf_counter() - write_start_time)
+    if metrics is not None:
+        metrics.files_processed += 1
+        metrics.files_changed += new_data is not None
+        metrics.observe_file_time(time.perf_counter() - start_time)
+    return new_data is not None
+
+
+def process_file_with_metrics(
+        file_path: str, config: TextFormatterConfig,
+        backup_run: BackupRun = None,
+        cache: ResultCache = None) -> Tuple[bool, Metrics]:
+    """
+    Format a text file in place like process_file, and return the
+    metrics of the file, e.g. to merge them from worker processes.
+
+    Parameters:
+    file_path (str): The file to format.
+    config (TextFormatterConfig): The text-formatter configuration object.
+    backup_run (BackupRun): The backup run to record the original
+        contents in. Default value is None.
+    cache (ResultCache): The cache of formatting results. Default value
+        is None.
+
+    Returns:
+    Tuple[bool, Metrics]: True if the file was changed, False otherwise,
+        and the metrics of the file.
+    """
+    metrics = Metrics()
+    is_changed = process_file(file_path, config, backup_run, cache, metrics)
+    return (is_changed, metrics)
+
+
+def format_file_data(data: bytes, config: TextFormatterConfig,
+                     metrics: Metrics = None) -> bytes | None:
+    """
+    Format the contents of a file using the specified configuration.
+
+    Parameters:
+    data (bytes): The file contents.
+    config (TextFormatterConfig): The text-formatter configuration object.
+    metrics (Metrics): The metrics to add the time of each stage to.
+        Default value is None.
+
+    Returns:
+    bytes | None: The formatted file contents, or None if formatting does
+        not change them.
+    """
+    if metrics is None:
+        text, encoding, bom = decode_file_data(data, config.encoding)
+        new_data = encode_file_text(format_text(text, config), encoding, bom)
     else:
-        write_lines_to_file(file_path, lines)
+        start_time = time.perf_counter()
+        text, encoding, bom = decode_file_data(data, config.encoding)
+        metrics.add_stage_time("decode", time.perf_counter() - start_time)
+        text = format_text(text, config, metrics)
+        start_time = time.perf_counter()
+        new_data = encode_file_text(text, encoding, bom)
+        metrics.add_stage_time("encode", time.perf_counter() - start_time)
+    if new_data == data:
+        return None
+    return new_data
+
+
+def write_formatted_file(file_path: str, data: bytes, new_data: bytes,
+                         config: TextFormatterConfig,
+                         backup_run: BackupRun = None) -> None:
+    """
+    Back up the original contents of a file as configured and write its
+    formatted contents.
+
+    With a configured backup directory, a backup run must be given if
+    backups are enabled.
+
+    Parameters:
+    file_path (str): The file to write to.
+    data (bytes): The original file contents.
+    new_data (bytes): The formatted file contents.
+    config (TextFormatterConfig): The text-formatter configuration object.
+    backup_run (BackupRun): The backup run to record the original
+        contents in. Default value is None.
+
+    Returns:
+    None
+    """
+    if config.backup_file:
+        if backup_run is not None:
+            backup_run.backup_file(file_path, data)
+        elif config.backup_dir:
+            raise ValueError("A backup run is required to back up to the"
+                             f" backup directory: ({config.backup_dir}).")
+        else:
+            shutil.copy(file_path, f"{file_path}.bak")
+    write_file_data(file_path, data, new_data, config.write_mode)
+
+
+def write_file_data(file_path: str, data: bytes, new_data: bytes,
+                    write_mode: WriteMode = None) -> None:
+    """
+    Replace the contents of a file with new contents.
+
+    In place, only the bytes that differ are written. If the length is
+    unchanged, each differing block is patched; otherwise the file is
+    rewritten from the first differing byte and truncated. If that would
+    rewrite most of the file, it is written atomically instead. An
+    in-place update is not atomic, so the file should be backed up.
+
+    Parameters:
+    file_path (str): The file to write to.
+    data (bytes): The current file contents.
+    new_data (bytes): The new file contents.
+    write_mode (WriteMode): How to write the file. Default value is None,
+        which means to rewrite it.
+
+    Returns:
+    None
+    """
+    if write_mode is None or write_mode == WriteMode.REWRITE:
+        with open(file_path, "wb") as f:
+            f.write(new_data)
+        return
+    if write_mode == WriteMode.IN_PLACE:
+        if _write_file_in_place(file_path, data, new_data):
+            return
+    elif write_mode != WriteMode.ATOMIC:
+        raise ValueError("Invalid WriteMode")
+    write_file_atomic(file_path, new_data)
+
+
+def format_text(text: str, config: TextFormatterConfig,
+                metrics: Metrics = None) -> str:
+    """
+    Format the text of a document using the specified configuration and
+    return the text to write.
+
+    Parameters:
+    text (str): The text to format.
+    config (TextFormatterConfig): The text-formatter configuration object.
+    metrics (Metrics): The metrics to add the time of each stage to.
+        Default value is None.
+
+    Returns:
+    str: The formatted text, with the configured newline characters.
+    """
+    lines = format_lines(split_text_to_lines(text), config, metrics)
+    return join_lines_to_text(lines, config.newline_type or NewlineType.LF)
+
+
+def format_lines(lines: Sequence[str], config: TextFormatterConfig,
+                 metrics: Metrics = None) -> list[str]:
+    """
+    Apply the line formatting options of the configuration to lines of
+    text and return the result.
+
+    Parameters:
+    lines (Sequence[str]): The list of text lines to format.
+    config (TextFormatterConfig): The text-formatter configuration object.
+    metrics (Metrics): The metrics to add the time of each stage to.
+        Default value is None.
+
+    Returns:
+    list[str]: The list of formatted text lines.
+    """
+    return compile_pipeline(config).run(lines, metrics)
+
+
+def align_formatted_lines(lines: Sequence[str],
+                          config: TextFormatterConfig) -> list[str | None]:
+    """
+    Apply the line formatting options of the configuration to lines of
+    text, keeping the result aligned with the original lines.
+
+    Each entry of the result holds the formatted version of the line at
+    the same index, or None if the line is removed. This lets callers
+    tell which lines changed without having to match the lines again.
+
+    Parameters:
+    lines (Sequence[str]): The list of text lines to format.
+    config (TextFormatterConfig): The text-formatter configuration object.
+
+    Returns:
+    list[str | None]: The list of formatted text lines, with None for
+        each removed line.
+    """
+    return compile_pipeline(config).run_aligned(lines)
+
+
+def detect_encoding(data: bytes, encoding: str = None) -> Tuple[str, bytes]:
+    """
+    Detect the encoding of file contents from their byte order mark, or
+    otherwise from a sample of their first bytes.
+
+    Without a byte order mark, contents with many zero bytes are taken
+    as UTF-32 or UTF-16, and contents whose sample is valid UTF-8 as UTF-8.
+    Anything else has to be given its encoding, since guessing one would
+    silently rewrite its text. Only the sample is checked, so decoding
+    contents detected as UTF-8 can still fail after it.
+
+    Parameters:
+    data (bytes): The file contents, or their first bytes.
+    encoding (str): The encoding of the contents. Default value is None,
+        which means to detect it. If given, only its byte order mark is
+        detected. "utf-8-sig" means UTF-8 with a byte order mark.
+
+    Returns:
+    Tuple[str, bytes]: The encoding and the byte order mark, which is
+        empty if there is none.
+
+    Raises:
+    UnicodeDecodeError: If no encoding is given and the sample is not
+        valid UTF-8.
+    """
+    if encoding is not None:
+        name = codecs.lookup(encoding).name
+        if name == "utf-8-sig":
+            return ("utf-8", codecs.BOM_UTF8)
+        for bom, bom_encoding in _BOMS:
+            if data.startswith(bom) and bom_encoding.startswith(name):
+                return (bom_encoding, bom)
+        if name in ("utf-16", "utf-32"):
+            return (f"{name}-le", b"")
+        return (name, b"")
+    for bom, bom_encoding in _BOMS:
+        if data.startswith(bom):
+            return (bom_encoding, bom)
+    sample = data[:_ENCODING_SAMPLE_SIZE]
+    if b"\0" in sample:
+        # ASCII text in UTF-32 has three zero bytes in every four, and in
+        # UTF-16 a zero byte in every other byte.
+        quarter = len(sample) // 4
+        if len(sample) % 4 == 0:
+            if (sample[3::4].count(0) == quarter
+                    and sample[2::4].count(0) > quarter // 2):
+                return ("utf-32-le", b"")
+            if (sample[0::4].count(0) == quarter
+                    and sample[1::4].count(0) > quarter // 2):
+                return ("utf-32-be", b"")
+        if sample[1::2].count(0) > quarter:
+            return ("utf-16-le", b"")
+        if sample[0::2].count(0) > quarter:
+            return ("utf-16-be", b"")
+    if sample.isascii():
+        return (_DEFAULT_ENCODING, b"")
+    try:
+        # The sample may end in the middle of a character.
+        codecs.getincrementaldecoder(_DEFAULT_ENCODING)().decode(
+            sample, final=len(data) <= _ENCODING_SAMPLE_SIZE)
+    except UnicodeDecodeError as e:
+        raise UnicodeDecodeError(
+            e.encoding, e.object, e.start, e.end,
+            f"{e.reason} at byte offset {e.start}",
+        ) from None
+    return (_DEFAULT_ENCODING, b"")
+
+
+def detect_file_encoding(file_path: str,
+                         encoding: str = None) -> Tuple[str, bytes]:
+    """
+    Detect the encoding of a file from a sample of its first bytes.
+
+    Parameters:
+    file_path (str): The file to read.
+    encoding (str): The encoding of the file. Default value is None,
+        which means to detect it.
+
+    Returns:
+    Tuple[str, bytes]: The encoding and the byte order mark, which is
+        empty if there is none.
+
+    Raises:
+    UnicodeDecodeError: If no encoding is given and the sample is not
+        valid UTF-8.
+    """
+    with open(file_path, "rb") as f:
+        sample = f.read(_ENCODING_SAMPLE_SIZE + 1)
+    try:
+        return detect_encoding(sample, encoding)
+    except UnicodeDecodeError as e:
+        raise _add_file_path(e, file_path) from None
+
+
+def iter_file_text(file_path: str,
+                   encoding: str = None) -> Tuple[str, bytes, Iterator[str]]:
+    """
+    Detect the encoding of a file and return an iterator that reads and
+    decodes its text in chunks, without the byte order mark.
+
+    A decoding error is raised as soon as the iterator reaches it, with
+    its byte offset and the file in the message.
+
+    Parameters:
+    file_path (str): The file to read.
+    encoding (str): The encoding of the file. Default value is None,
+        which means to detect it.
+
+    Returns:
+    Tuple[str, bytes, Iterator[str]]: The encoding, the byte order mark,
+        which is empty if there is none, and the iterator of text chunks.
+    """
+    detected_encoding, bom = detect_file_encoding(file_path, encoding)
+    return (detected_encoding, bom,
+            _iter_file_text(file_path, detected_encoding, bom))
+
+
+def decode_file_data(data: bytes,
+                     encoding: str = None) -> Tuple[str, str, bytes]:
+    """
+    Decode the contents of a file into text, without the byte order
+    mark.
+
+    The contents are decoded in chunks, and a decoding error has the byte
+    offset in the contents in its message.
+
+    Parameters:
+    data (bytes): The file contents.
+    encoding (str): The encoding of the contents. Default value is None,
+        which means to detect it.
+
+    Returns:
+    Tuple[str, str, bytes]: The decoded text, the encoding and the byte
+        order mark, which is empty if there is none.
+    """
+    detected_encoding, bom = detect_encoding(data, encoding)
+    view = memoryview(data)
+    chunks = (view[start:start + _CODEC_CHUNK_SIZE] for start
+              in range(len(bom), len(data), _CODEC_CHUNK_SIZE))
+    text = "".join(_iter_decoded(chunks, detected_encoding, len(bom)))
+    return (text, detected_encoding, bom)
+
+
+def encode_file_text(text: str, encoding: str = _DEFAULT_ENCODING,
+                     bom: bytes = b"") -> bytes:
+    """
+    Encode text into the contents of a file.
+
+    Parameters:
+    text (str): The text to encode.
+    encoding (str): The encoding of the contents. Default value is UTF-8.
+    bom (bytes): The byte order mark to start the contents with. Default
+        value is none.
+
+    Returns:
+    bytes: The encoded file contents.
+
+    Raises:
+    UnicodeEncodeError: If the encoding cannot represent a character of
+        the text.
+    """
+    encoder = codecs.getincrementalencoder(encoding)()
+    chunks = [bom]
+    for start in range(0, len(text), _CODEC_CHUNK_SIZE):
+        try:
+            chunks.append(
+                encoder.encode(text[start:start + _CODEC_CHUNK_SIZE]))
+        except UnicodeEncodeError as e:
+            raise UnicodeEncodeError(
+                e.encoding, e.object, e.start, e.end,
+                f"{e.reason} at character offset {start + e.start}",
+            ) from None
+    chunks.append(encoder.encode("", final=True))
+    return b"".join(chunks)
 
 
 def split_text_to_lines(text: str) -> list[str]:
@@ -218,24 +1289,32 @@ def join_lines_to_text(lines: Sequence[str],
     return str(newline_type.value).join(lines)
 
 
-def read_lines_from_file(file_path: str) -> list[str]:
+def read_lines_from_file(file_path: str,
+                         encoding: str = None) -> list[str]:
     """
     Read a file and then split its text into lines of text using the
     newline characters.
 
+    The encoding is detected from the first bytes of the file, and the
+    rest is decoded in chunks as it is read, so a decoding error is
+    raised as soon as it is reached, without reading the rest.
+
     Parameters:
     file_path (str): The file to read.
+    encoding (str): The encoding of the file. Default value is None,
+        which means to detect it.
 
     Returns:
     list[str]: The list of text lines.
     """
-    with open(file_path) as f:
-        text = f.read()
-    return split_text_to_lines(text)
+    _, _, chunks = iter_file_text(file_path, encoding)
+    return split_text_to_lines("".join(chunks))
 
 
 def write_lines_to_file(file_path: str, lines: Sequence[str],
-                        newline_type: NewlineType = NewlineType.LF) -> None:
+                        newline_type: NewlineType = NewlineType.LF,
+                        encoding: str = _DEFAULT_ENCODING,
+                        bom: bytes = b"") -> None:
     """
     Join lines of text using the specified newline character and write
     the text to a file.
@@ -245,6 +1324,9 @@ def write_lines_to_file(file_path: str, lines: Sequence[str],
     lines (Sequence[str]): The list of text lines to join.
     newline_type (NewlineType): The newline character(s) to use. Default
         value is the linefeed character only.
+    encoding (str): The encoding of the file. Default value is UTF-8.
+    bom (bytes): The byte order mark to start the file with. Default
+        value is none.
 
     Returns:
     None
@@ -259,10 +1341,38 @@ def write_lines_to_file(file_path: str, lines: Sequence[str],
     else:
         # Join as a single line.
         text = join_lines_to_text(lines, newline_type)
-    with open(file_path, "w", newline=newline_value) as f:
+    with open(file_path, "w", encoding=encoding,
+              newline=newline_value) as f:
+        if bom:
+            f.buffer.write(bom)
         f.write(text)
 
 
+def read_line_range(file_path: str, line_index: LineIndex,
+                    start: int, stop: int,
+                    encoding: str = None) -> list[str]:
+    """
+    Read a range of lines of a file using its line index, without
+    reading the rest of the file.
+
+    Parameters:
+    file_path (str): The file to read.
+    line_index (LineIndex): The line index of the file.
+    start (int): The index of the first line.
+    stop (int): The index after the last line.
+    encoding (str): The encoding of the file. Default value is None,
+        which means to detect it from the lines read.
+
+    Returns:
+    list[str]: The list of text lines.
+    """
+    start_offset, end_offset = line_index.get_byte_range(start, stop)
+    with open(file_path, "rb") as f:
+        f.seek(start_offset)
+        data = f.read(end_offset - start_offset)
+    return split_text_to_lines(decode_file_data(data, encoding)[0])
+
+
 def remove_blank_lines(lines: Sequence[str],
                        blank_line_type: BlankLineType = None) -> list[str]:
     """
@@ -328,11 +1438,67 @@ def replace_tab_with_spaces(line: str, num_spaces: int) -> str:
     str: The line of text with the tab characters replaced.
     """
     if num_spaces < 0:
-        raise ValueError("The number of spaces must be a non-zero"
+        raise ValueError("The number of spaces must be a non-negative"
                          f" integer: ({num_spaces}).")
     return line.replace("\t", " " * num_spaces)
 
 
+def expand_tabs(line: str, tab_size: int) -> str:
+    """
+    Replace the tab characters in a line of text with spaces up to the
+    next tab stop and return the result.
+
+    Parameters:
+    line (str): The line of text to replace tabs.
+    tab_size (int): The number of columns between tab stops.
+
+    Returns:
+    str: The line of text with the tab characters replaced.
+    """
+    if tab_size < 0:
+        raise ValueError("The tab size must be a non-negative"
+                         f" integer: ({tab_size}).")
+    return line.expandtabs(tab_size)
+
+
+def unexpand_indentation(line: str, tab_size: int) -> str:
+    """
+    Replace the indentation of a line of text with as many tabs as fit
+    its width, followed by the remaining spaces, and return the result.
+    Spaces after the indentation are left unchanged.
+
+    Parameters:
+    line (str): The line of text to replace spaces.
+    tab_size (int): The number of columns between tab stops.
+
+    Returns:
+    str: The line of text with the indentation replaced.
+    """
+    if tab_size < 1:
+        raise ValueError("The tab size must be a positive"
+                         f" integer: ({tab_size}).")
+    rest = line.lstrip(" \t")
+    if len(rest) == len(line):
+        return line
+    width = len(line[:len(line) - len(rest)].expandtabs(tab_size))
+    num_tabs, num_spaces = divmod(width, tab_size)
+    return "\t" * num_tabs + " " * num_spaces + rest
+
+
+def split_indentation(line: str) -> Tuple[str, str]:
+    """
+    Split a line of text into its leading whitespace and the rest.
+
+    Parameters:
+    line (str): The line of text to split.
+
+    Returns:
+    Tuple[str, str]: The leading whitespace and the rest of the line.
+    """
+    rest = trim_line(line, TrimType.LEADING)
+    return (line[:len(line) - len(rest)], rest)
+
+
 def trim_line(line: str, trim_type: TrimType = None) -> str:
     """
     Trim the leading and/or trailing whitespace of a line of text and
@@ -348,13 +1514,7 @@ def trim_line(line: str, trim_type: TrimType = None) -> str:
     """
     if trim_type is None:
         return line
-    if trim_type == TrimType.LEADING:
-        return line.lstrip()
-    if trim_type == TrimType.TRAILING:
-        return line.rstrip()
-    if trim_type == TrimType.ALL:
-        return line.strip()
-    raise ValueError("Invalid TrimType")
+    return _get_trim_function(trim_type)(line)
 
 
 # --- Public Line Text Formatting Functions ---
@@ -373,9 +1533,400 @@ def convert_case(line: str, case_type: CaseType=None) -> str:
     """
     if case_type is None:
         return line
+    return _convert_case_text(line, case_type)
+
+
+def convert_case_lines(lines: Sequence[str],
+                       case_type: CaseType=None) -> list[str]:
+    """
+    Convert the letter case of lines of text and return the result.
+
+    The lines are converted as a single buffer, which is much faster than
+    converting them one by one. Text that is pure ASCII takes a faster
+    path than text that needs the full Unicode rules.
+
+    Parameters:
+    lines (Sequence[str]): The list of text lines to convert.
+    case_type (CaseType): The letter case option. Defaults to None,
+        which means no conversion.
+
+    Returns:
+    list[str]: The list of text lines with the letter case converted.
+    """
+    if case_type is None or not lines:
+        return list(lines)
+    # No case mapping produces a linefeed, so the line count is kept.
+    return _convert_case_text("\n".join(lines), case_type).split("\n")
+
+
+# --- Private Helper Functions ---
+
+def _convert_case_text(text: str, case_type: CaseType) -> str:
+    # str.lower() and str.upper() already have an ASCII fast path.
     if case_type == CaseType.LOWER:
-        return line.lower()
+        return text.lower()
     if case_type == CaseType.UPPER:
-        return line.upper()
+        return text.upper()
+    if case_type == CaseType.CASEFOLD:
+        if text.isascii():
+            return text.lower()
+        return text.casefold()
+    if case_type == CaseType.TITLE:
+        if text.isascii():
+            # bytes.title() only handles ASCII and is several times
+            # faster than str.title().
+            data = text.encode("ascii").title()
+            data = _ASCII_APOSTROPHE_LETTER_PATTERN.sub(_lower_match, data)
+            return data.decode("ascii")
+        return _APOSTROPHE_LETTER_PATTERN.sub(_lower_match, text.title())
     raise ValueError("Invalid CaseType")
 
+
+def _get_trim_function(trim_type: TrimType) -> Callable[[str], str]:
+    if trim_type == TrimType.LEADING:
+        return str.lstrip
+    if trim_type == TrimType.TRAILING:
+        return str.rstrip
+    if trim_type == TrimType.ALL:
+        return str.strip
+    raise ValueError("Invalid TrimType")
+
+
+def _lower_match(match: re.Match) -> str | bytes:
+    return match[0].lower()
+
+
+def _format_config_error(key: Tuple[str, ...], value: object,
+                         error: Exception = None) -> str:
+    message = f"{'.'.join(key)}: invalid value ({value!r})."
+    if error is not None and str(error):
+        message += f" {error}"
+    return message
+
+
+def _find_unknown_keys(data: dict,
+                       prefix: Tuple[str, ...] = ()) -> list[Tuple[str, ...]]:
+    known_keys = {(_BACKUP_COMPRESS,), (_BACKUP_DIR,), (_BACKUP_FILE,),
+                  (_ENCODING,), (_WRITE_MODE,)}
+    known_keys.update(transform.config_key for transform in get_transforms())
+    unknown_keys = []
+    for key, value in data.items():
+        key_path = prefix + (str(key),)
+        if key_path in known_keys:
+            continue
+        is_section = any(known_key[:len(key_path)] == key_path
+                         for known_key in known_keys)
+        if is_section and isinstance(value, dict):
+            unknown_keys.extend(_find_unknown_keys(value, key_path))
+        else:
+            unknown_keys.append(key_path)
+    return unknown_keys
+
+
+def _parse_encoding(value: object) -> str | None:
+    if value is None or str(value).lower() == _ENCODING_AUTO:
+        return None
+    try:
+        codecs.lookup(str(value))
+    except LookupError:
+        return None
+    return str(value)
+
+
+def _parse_bool(value: object) -> bool | None:
+    if value is None:
+        return None
+    value = str(value).lower()
+    if value == "true":
+        return True
+    if value == "false":
+        return False
+    return None
+
+
+def _iter_file_text(file_path: str, encoding: str,
+                    bom: bytes) -> Iterator[str]:
+    with open(file_path, "rb") as f:
+        f.seek(len(bom))
+        chunks = iter(functools.partial(f.read, _CODEC_CHUNK_SIZE), b"")
+        try:
+            yield from _iter_decoded(chunks, encoding, len(bom))
+        except UnicodeDecodeError as e:
+            raise _add_file_path(e, file_path) from None
+
+
+def _iter_decoded(chunks: Iterator[bytes], encoding: str,
+                  offset: int) -> Iterator[str]:
+    decoder = codecs.getincrementaldecoder(encoding)()
+    for chunk in itertools.chain(chunks, [None]):
+        is_final = chunk is None
+        # The decoder keeps the bytes of an incomplete character, and an
+        # error position counts from them.
+        num_pending = len(decoder.getstate()[0])
+        try:
+            text = decoder.decode(b"" if is_final else chunk, is_final)
+        except UnicodeDecodeError as e:
+            position = offset - num_pending + e.start
+            raise UnicodeDecodeError(
+                e.encoding, e.object, e.start, e.end,
+                f"{e.reason} at byte offset {position}",
+            ) from None
+        if not is_final:
+            offset += len(chunk)
+        yield text
+
+
+def _add_file_path(error: UnicodeError, file_path: str) -> UnicodeError:
+    return type(error)(error.encoding, error.object, error.start,
+                       error.end, f"{error.reason} of {file_path}")
+
+
+def _find_first_difference(data: bytes, new_data: bytes) -> int:
+    size = min(len(data), len(new_data))
+    start = 0
+    # Compare whole blocks, then bisect the first block that differs.
+    while start < size:
+        end = min(start + _IN_PLACE_BLOCK_SIZE, size)
+        if data[start:end] != new_data[start:end]:
+            break
+        start = end
+    else:
+        return size
+    while end - start > 1:
+        middle = (start + end) // 2
+        if data[start:middle] == new_data[start:middle]:
+            start = middle
+        else:
+            end = middle
+    return start
+
+
+def _write_file_in_place(file_path: str, data: bytes,
+                         new_data: bytes) -> bool:
+    offset = _find_first_difference(data, new_data)
+    max_rewrite = len(new_data) * _IN_PLACE_MAX_REWRITE_FRACTION
+    if len(new_data) != len(data) and len(new_data) - offset > max_rewrite:
+        return False
+    with open(file_path, "r+b") as f:
+        if len(new_data) == len(data):
+            block_start = offset - offset % _IN_PLACE_BLOCK_SIZE
+            for start in range(block_start, len(data), _IN_PLACE_BLOCK_SIZE):
+                end = start + _IN_PLACE_BLOCK_SIZE
+                block = new_data[start:end]
+                if block != data[start:end]:
+                    f.seek(start)
+                    f.write(block)
+        else:
+            f.seek(offset)
+            f.write(memoryview(new_data)[offset:])
+            f.flush()
+            os.ftruncate(f.fileno(), len(new_data))
+    return True
+
+
+def _add_one(value: int) -> int:
+    return value + 1
+
+
+def _iter_line_chunks(data: bytes | mmap.mmap) -> Iterator[Tuple[int, bytes]]:
+    # Yield chunks of the data, never splitting a CR LF pair.
+    size = len(data)
+    position = 0
+    while position < size:
+        end = min(position + _LINE_INDEX_CHUNK_SIZE, size)
+        if data[end - 1:end] == b"\r" and data[end:end + 1] == b"\n":
+            end += 1
+        yield (position, data[position:end])
+        position = end
+
+
+def _get_nested(data: dict, keys: Tuple[str, ...]) -> object:
+    for key in keys:
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+
+def _set_nested(data: dict, keys: Tuple[str, ...], value: object) -> None:
+    for key in keys[:-1]:
+        data = data.setdefault(key, {})
+    data[keys[-1]] = value
+
+
+def _get_fused_line_function(kinds: Tuple[StageKind, ...],
+                             has_removed: bool) -> Callable:
+    key = (kinds, has_removed)
+    function = _FUSED_LINE_FUNCTIONS.get(key)
+    if function is None:
+        function = _generate_fused_line_function(kinds, has_removed)
+        _FUSED_LINE_FUNCTIONS[key] = function
+    return function
+
+
+def _generate_fused_line_function(kinds: Tuple[StageKind, ...],
+                                  has_removed: bool) -> Callable:
+    # Generate a single loop with the stage functions as nested calls,
+    # e.g. "[f1(f0(line)) for line in lines]". This is faster than one
+    # pass per stage or an inner loop over the functions, so registered
+    # transforms run as fast as hand-written code.
+    names = [f"f{i}" for i in range(len(kinds))]
+    source = [f"def _fused_lines(lines, {', '.join(names)}):"]
+    if StageKind.STATEFUL not in kinds:
+        expression = "line"
+        for name in names:
+            expression = f"{name}({expression})"
+        if has_removed:
+            expression = f"None if line is None else {expression}"
+        source.append(f"    return [{expression} for line in lines]")
+    else:
+        source.append("    result = []")
+        source.append("    append = result.append")
+        source.append("    for line in lines:")
+        indent = " " * 8
+        if has_removed:
+            source.append(f"{indent}if line is not None:")
+            indent += " " * 4
+        expression = "line"
+        for i, (name, kind) in enumerate(zip(names, kinds)):
+            expression = f"{name}({expression})"
+            if kind != StageKind.STATEFUL:
+                continue
+            source.append(f"{indent}line = {expression}")
+            expression = "line"
+            if i < len(kinds) - 1:
+                source.append(f"{indent}if line is not None:")
+                indent += " " * 4
+        if expression != "line":
+            source.append(f"{indent}line = {expression}")
+        source.append("        append(line)")
+        source.append("    return result")
+    namespace = {}
+    exec("\n".join(source), namespace)
+    return namespace["_fused_lines"]
+
+
+# --- Built-in Transforms ---
+
+def _parse_regex_replace(value: object) -> Tuple[Tuple[str, str], ...]:
+    rules = tuple((str(pattern), str(replacement))
+                  for pattern, replacement in value)
+    for pattern, replacement in rules:
+        if "\n" in replacement or "\r" in replacement:
+            raise ValueError("The replacement must not contain newline"
+                             f" characters: ({replacement!r}).")
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            raise ValueError(f"Invalid regular expression: ({pattern}).") \
+                from e
+    return rules
+
+
+def _build_regex_replace(rules: Tuple[Tuple[str, str], ...]) -> Callable:
+    compiled_rules = [(re.compile(pattern), replacement)
+                      for pattern, replacement in rules]
+    if len(compiled_rules) == 1:
+        pattern, replacement = compiled_rules[0]
+        return functools.partial(pattern.sub, replacement)
+
+    def replace(line: str) -> str:
+        for pattern, replacement in compiled_rules:
+            line = pattern.sub(replacement, line)
+        return line
+    return replace
+
+
+def _parse_tab(value: object) -> Tuple[TabType, int] | None:
+    if len(value) < 2:
+        return None
+    return (TabType(value[0]), int(value[1]))
+
+
+def _build_tab(value: Tuple[TabType, int]) -> Callable:
+    tab_type, num_spaces = value
+    if tab_type == TabType.TAB_TO_SPACES:
+        function = replace_tab_with_spaces
+    elif tab_type == TabType.SPACES_TO_TAB:
+        function = replace_spaces_with_tab
+    elif tab_type == TabType.EXPAND:
+        function = expand_tabs
+    elif tab_type == TabType.UNEXPAND:
+        function = unexpand_indentation
+    else:
+        raise ValueError("Invalid TabType")
+    # Check the number once, so an invalid value fails when the pipeline
+    # is compiled rather than on the first line.
+    function("", num_spaces)
+    return lambda line: function(line, num_spaces)
+
+
+def _build_trim(trim_type: TrimType) -> Callable:
+    return _get_trim_function(trim_type)
+
+
+def _build_letter_case(case_type: CaseType) -> Callable:
+    if not isinstance(case_type, CaseType):
+        raise ValueError("Invalid CaseType")
+    return lambda text: _convert_case_text(text, case_type)
+
+
+def _build_blank_lines(blank_line_type: BlankLineType) -> Callable:
+    if blank_line_type == BlankLineType.REMOVE:
+        return lambda: _remove_blank_line
+    if blank_line_type == BlankLineType.COLLAPSE:
+        return _make_collapse_blank_lines
+    raise ValueError("Invalid BlankLineType")
+
+
+def _remove_blank_line(line: str) -> str | None:
+    return line if line else None
+
+
+def _make_collapse_blank_lines() -> Callable:
+    is_last_line_empty = False
+
+    def collapse(line: str) -> str | None:
+        nonlocal is_last_line_empty
+        if line:
+            is_last_line_empty = False
+            return line
+        if is_last_line_empty:
+            return None
+        is_last_line_empty = True
+        return line
+    return collapse
+
+
+register_transform(Transform(
+    name=_TRIM, config_key=(_WHITESPACE, _TRIM), order=10,
+    kind=StageKind.PER_LINE, parse=TrimType, dump=lambda v: v.value,
+    build=_build_trim, attribute="trim_type",
+))
+register_transform(Transform(
+    name=_TAB, config_key=(_WHITESPACE, _TAB), order=20,
+    kind=StageKind.PER_LINE, parse=_parse_tab,
+    dump=lambda v: (v[0].value, v[1]),
+    build=_build_tab, attribute="tab_type",
+))
+register_transform(Transform(
+    name=_REGEX_REPLACE, config_key=(_REGEX_REPLACE,), order=25,
+    kind=StageKind.PER_LINE, parse=_parse_regex_replace,
+    dump=lambda v: [list(rule) for rule in v],
+    build=_build_regex_replace,
+))
+register_transform(Transform(
+    name=_LETTER_CASE, config_key=(_LETTER_CASE,), order=30,
+    kind=StageKind.WHOLE_BUFFER, parse=CaseType, dump=lambda v: v.value,
+    build=_build_letter_case, attribute="case_type",
+))
+register_transform(Transform(
+    name=_BLANK_LINES, config_key=(_WHITESPACE, _BLANK_LINES), order=40,
+    kind=StageKind.STATEFUL, parse=BlankLineType, dump=lambda v: v.value,
+    build=_build_blank_lines, attribute="blank_line_type",
+))
+register_transform(Transform(
+    name=_NEWLINE, config_key=(_NEWLINE,), order=90,
+    kind=StageKind.OUTPUT, parse=NewlineType.from_text,
+    dump=NewlineType.to_text, attribute="newline_type",
+))
@@ -0,0 +1,227 @@
+# --- Imports ---
+from collections.abc import Iterator, Sequence
+
+import textformatter
+from textformatter import textformatter
+from textformatter.textformatter import (
+    NewlineType,
+    TextFormatterConfig,
+    align_formatted_lines,
+    decode_file_data,
+    encode_file_text,
+    join_lines_to_text,
+    split_text_to_lines,
+)
+
+
+# --- Private Constants ---
+_DEFAULT_CONTEXT = 3
+_NO_NEWLINE_MARKER = "\\ No newline at end of file\n"
+# The line boundaries of str.splitlines() other than CR, LF and CR LF.
+_OTHER_LINE_BOUNDARIES = "\v\f\x1c\x1d\x1e\x85\u2028\u2029"
+
+
+# --- Public Unified Diff Functions ---
+
+def diff_file(file_path: str, config: TextFormatterConfig,
+              context: int = _DEFAULT_CONTEXT) -> str:
+    """
+    Return a unified diff of the changes that formatting a file with the
+    specified configuration would make. The file is not modified.
+
+    Changes to the text of the lines are shown as hunks, and a change
+    of the newline at the end of the file with a "\\ No newline at end
+    of file" marker. If the line endings change, a line before the diff
+    names the old and new ones, since a diff of lines cannot show them.
+
+    Parameters:
+    file_path (str): The file to compare.
+    config (TextFormatterConfig): The text-formatter configuration object.
+    context (int): The number of unchanged lines to show around each
+        change. Default value is 3.
+
+    Returns:
+    str: The unified diff, or an empty string if nothing would change.
+    """
+    with open(file_path, "rb") as f:
+        data = f.read()
+    text, encoding, bom = decode_file_data(data, config.encoding)
+    lines = split_text_to_lines(text)
+    aligned_lines = align_formatted_lines(lines, config)
+    # The same contents as format_file_data() writes.
+    newline_type = config.newline_type or NewlineType.LF
+    new_text = join_lines_to_text(
+        [line for line in aligned_lines if line is not None], newline_type)
+    if encode_file_text(new_text, encoding, bom) == data:
+        return ""
+    old_eol = bool(lines) and text[-1] in "\r\n" + _OTHER_LINE_BOUNDARIES
+    new_eol = False
+    header = ""
+    if newline_type.to_file_eol() is None:
+        if len(aligned_lines) > 1:
+            # The whole file is written as a single line.
+            aligned_lines = [new_text] + [None] * (len(aligned_lines) - 1)
+    else:
+        kept = [i for i, line in enumerate(aligned_lines) if line is not None]
+        if kept and aligned_lines[kept[-1]] == "":
+            # The lines are joined without a final newline, so a last empty
+            # line only leaves the newline of the line before it.
+            aligned_lines[kept[-1]] = None
+            new_eol = len(kept) > 1
+        old_endings = _find_line_endings(text)
+        if old_endings and old_endings != [newline_type.value]:
+            old_names = ", ".join(_format_line_ending(ending)
+                                  for ending in old_endings)
+            header = (f"Line endings of {file_path}: {old_names}"
+                      f" -> {newline_type.to_text()}\n")
+    return header + "".join(unified_diff_aligned(
+        lines, aligned_lines, str(file_path), str(file_path), context,
+        old_eol, new_eol))
+
+
+def unified_diff_aligned(old_lines: Sequence[str],
+                         aligned_lines: Sequence[str | None],
+                         from_file: str, to_file: str,
+                         context: int = _DEFAULT_CONTEXT,
+                         old_eol: bool = True,
+                         new_eol: bool = True) -> Iterator[str]:
+    """
+    Generate a unified diff from lines of text and their aligned
+    formatted lines in a single linear pass.
+
+    Unlike difflib, no matching of the two sequences is needed, because
+    each formatted line is already paired with its original line.
+
+    Parameters:
+    old_lines (Sequence[str]): The list of original text lines.
+    aligned_lines (Sequence[str | None]): The formatted text lines, as
+        returned by align_formatted_lines(), with None for removed lines.
+    from_file (str): The file name for the original text.
+    to_file (str): The file name for the formatted text.
+    context (int): The number of unchanged lines to show around each
+        change. Default value is 3.
+    old_eol (bool): Whether the original text ends with a newline.
+        Default value is True.
+    new_eol (bool): Whether the formatted text ends with a newline.
+        Default value is True.
+
+    Returns:
+    Iterator[str]: The lines of the unified diff, each ending with a
+        linefeed character.
+    """
+    if len(old_lines) != len(aligned_lines):
+        raise ValueError("The aligned lines do not match the original"
+                         " lines.")
+    if context < 0:
+        raise ValueError("The number of context lines must be a"
+                         f" non-negative integer: ({context}).")
+    changed = [i for i, line in enumerate(aligned_lines)
+               if line != old_lines[i]]
+    last_kept = next((i for i in range(len(aligned_lines) - 1, -1, -1)
+                      if aligned_lines[i] is not None), None)
+    if old_lines and old_eol != new_eol:
+        # The last lines differ in their newline, even with the same text.
+        changed = sorted(set(changed).union(
+            i for i in (len(old_lines) - 1, last_kept) if i is not None))
+    if not changed:
+        return
+    # The last line of each side without a newline gets a marker.
+    old_last = None if old_eol else len(old_lines) - 1
+    new_last = None if new_eol else last_kept
+    changed_set = set(changed)
+    yield f"--- {from_file}\n"
+    yield f"+++ {to_file}\n"
+    num_lines = len(old_lines)
+    # Number of formatted lines before old line index "position".
+    position = 0
+    new_position = 0
+    group_start = 0
+    for k in range(1, len(changed) + 1):
+        # Hunks separated by at most 2 * context unchanged lines merge.
+        if (k < len(changed)
+                and changed[k] - changed[k - 1] <= 2 * context + 1):
+            continue
+        start = max(0, changed[group_start] - context)
+        end = min(num_lines, changed[k - 1] + context + 1)
+        new_position += _count_kept(aligned_lines, position, start)
+        yield from _format_hunk(old_lines, aligned_lines, start, end,
+                                new_position, changed_set, old_last,
+                                new_last)
+        new_position += _count_kept(aligned_lines, start, end)
+        position = end
+        group_start = k
+
+
+# --- Private Helper Functions ---
+
+def _count_kept(aligned_lines: Sequence[str | None],
+                start: int, end: int) -> int:
+    return sum(1 for i in range(start, end) if aligned_lines[i] is not None)
+
+
+def _format_range(start: int, length: int) -> str:
+    # Same convention as difflib.unified_diff.
+    if length == 1:
+        return f"{start + 1}"
+    if length == 0:
+        return f"{start},0"
+    return f"{start + 1},{length}"
+
+
+def _format_hunk(old_lines: Sequence[str],
+                 aligned_lines: Sequence[str | None],
+                 start: int, end: int, new_start: int,
+                 changed: set[int], old_last: int | None,
+                 new_last: int | None) -> Iterator[str]:
+    body = []
+    removed = []
+    added = []
+    new_length = 0
+    for i in range(start, end):
+        old_line = old_lines[i]
+        new_line = aligned_lines[i]
+        if i not in changed:
+            body.extend(removed)
+            body.extend(added)
+            removed.clear()
+            added.clear()
+            body.append(f" {old_line}\n")
+            if i == old_last:
+                body.append(_NO_NEWLINE_MARKER)
+            new_length += 1
+            continue
+        removed.append(f"-{old_line}\n")
+        if i == old_last:
+            removed.append(_NO_NEWLINE_MARKER)
+        if new_line is not None:
+            added.append(f"+{new_line}\n")
+            if i == new_last:
+                added.append(_NO_NEWLINE_MARKER)
+            new_length += 1
+    body.extend(removed)
+    body.extend(added)
+    old_range = _format_range(start, end - start)
+    new_range = _format_range(new_start, new_length)
+    yield f"@@ -{old_range} +{new_range} @@\n"
+    yield from body
+
+
+def _find_line_endings(text: str) -> list[str]:
+    # Counting is linear and needs no list of all the line endings.
+    num_crlf = text.count("\r\n")
+    endings = []
+    if text.count("\r") > num_crlf:
+        endings.append("\r")
+    if num_crlf:
+        endings.append("\r\n")
+    if text.count("\n") > num_crlf:
+        endings.append("\n")
+    endings.extend(c for c in _OTHER_LINE_BOUNDARIES if c in text)
+    return endings
+
+
+def _format_line_ending(ending: str) -> str:
+    try:
+        return NewlineType(ending).to_text()
+    except ValueError:
+        return ending.encode("unicode_escape").decode("ascii")